@@ -0,0 +1,186 @@
+'''
+Created on Oct 18, 2026
+
+Batch mode of the command line controller: performs the command line request (such as validation)
+for each of many filings, given by a list file, a file name pattern, or an RSS feed, in a pool of
+worker processes.
+
+Each worker process keeps one warm controller (with its model manager, web cache, plug-ins, and
+any shared taxonomy layer) for all of the filings it is given.  Log entries of each
+filing are buffered in the worker and returned to the main process, which logs them, filing by
+filing, in input order, so that the batch log does not depend on the number of workers or on
+their scheduling.
+
+@author: Mark V Systems Limited
+(c) Copyright 2026 Mark V Systems Limited, All rights reserved.
+'''
+from arelle import PythonUtil # define 2.x or 3.x string types
+import os, io, sys, glob, time, traceback, multiprocessing, logging
+from arelle import FileSource, ModelXbrl, ModelDocument
+from arelle.Locale import format_string
+from arelle.UrlUtil import isHttpUrl
+
+workerCntlr = None # controller of a worker process, kept for all filings it is given
+
+def batchEntrypoints(cntlr, batchFile):
+    """Returns the entry point files of a batch, in batch order
+
+    :param batchFile: file name pattern (with * ? or [ ]), RSS feed file or url, or text file listing
+    one entry point file or url per line (blank lines and lines starting with # are ignored, relative
+    file names are relative to the list file's directory)
+    :type batchFile: str
+    :returns: [str] -- list of entry point files
+    """
+    if not isHttpUrl(batchFile) and any(c in batchFile for c in "*?["):
+        return sorted(glob.glob(batchFile))
+    if isHttpUrl(batchFile):
+        filepath = cntlr.webCache.getfilename(batchFile)
+    else:
+        filepath = batchFile
+    with io.open(filepath, 'rt', encoding='utf-8') as fh:
+        text = fh.read()
+    if text.lstrip().startswith("<"): # xml, must be an RSS feed
+        modelXbrl = ModelXbrl.load(cntlr.modelManager,
+                                   FileSource.openFileSource(batchFile, cntlr),
+                                   _("loading batch RSS feed"))
+        try:
+            if modelXbrl.modelDocument is None or modelXbrl.modelDocument.type != ModelDocument.Type.RSSFEED:
+                raise IOError(_("Batch file is neither an RSS feed nor a list of entry point files: {0}").format(batchFile))
+            return [rssItem.zippedUrl
+                    for rssItem in modelXbrl.modelDocument.rssItems
+                    if rssItem.zippedUrl]
+        finally:
+            modelXbrl.close()
+    listDir = os.path.dirname(batchFile)
+    entrypoints = []
+    for line in text.splitlines():
+        entrypoint = line.strip()
+        if entrypoint and not entrypoint.startswith("#"):
+            if not isHttpUrl(entrypoint) and not os.path.isabs(entrypoint):
+                entrypoint = os.path.join(listDir, entrypoint)
+            entrypoints.append(entrypoint)
+    return entrypoints
+
+def runBatch(cntlr, options):
+    """Performs the command line request, per options, for each entry point of options.batchFile
+
+    :param cntlr: Command line controller of main process, whose log receives the merged per-filing log entries
+    :type cntlr: CntlrCmdLine
+    :param options: OptionParser options, with batchFile and optional batchWorkers
+    :type options: optparse.Values
+    :returns: bool -- True if the request was successful for every filing of the batch
+    """
+    startedAt = time.time()
+    try:
+        entrypoints = batchEntrypoints(cntlr, options.batchFile)
+    except Exception as err:
+        cntlr.addToLog(_("[Exception] Failed to load batch file: \n{0} \n{1}").format(
+                       err,
+                       traceback.format_tb(sys.exc_info()[2])),
+                       messageCode="arelle:batchFile", file=options.batchFile, level=logging.ERROR)
+        return False
+    numWorkers = max(1, min(options.batchWorkers or multiprocessing.cpu_count(), len(entrypoints)))
+    cntlr.addToLog(_("batch of {0} filings, {1} worker processes").format(len(entrypoints), numWorkers),
+                   messageCode="info", file=options.batchFile)
+    options.keepOpen = False
+    tasks = [(i, entrypoint) for i, entrypoint in enumerate(entrypoints)]
+    numUnsuccessful = 0
+    if numWorkers == 1: # run in this process, with its own controller and logger
+        for i, entrypoint in tasks:
+            logFilingStart(cntlr, i, entrypoint, len(entrypoints))
+            options.entrypointFile = entrypoint
+            try:
+                if not cntlr.run(options):
+                    numUnsuccessful += 1
+            except Exception as err:
+                cntlr.addToLog(_("[Exception] Failed to complete request: \n{0} \n{1}").format(
+                               err,
+                               traceback.format_tb(sys.exc_info()[2])),
+                               messageCode="arelle:batchFiling", file=entrypoint, level=logging.ERROR)
+                numUnsuccessful += 1
+    else:
+        pool = multiprocessing.Pool(numWorkers, initWorker, (options,))
+        try:
+            # imap returns results in task order, as each becomes available, while later tasks proceed
+            for i, entrypoint, success, logEntries in pool.imap(runWorkerTask, tasks):
+                logFilingStart(cntlr, i, entrypoint, len(entrypoints))
+                logWorkerEntries(cntlr, logEntries)
+                if not success:
+                    numUnsuccessful += 1
+            pool.close()
+        except BaseException: # including KeyboardInterrupt, don't leave worker processes running
+            pool.terminate()
+            raise
+        finally:
+            pool.join()
+    cntlr.addToLog(format_string(cntlr.modelManager.locale,
+                                 _("batch of %s filings completed in %.2f secs, %s unsuccessful"),
+                                 (len(entrypoints), time.time() - startedAt, numUnsuccessful)),
+                   messageCode="info", file=options.batchFile)
+    return numUnsuccessful == 0
+
+def logFilingStart(cntlr, i, entrypoint, numEntrypoints):
+    cntlr.addToLog(_("batch filing {0} of {1}").format(i + 1, numEntrypoints),
+                   messageCode="info", file=entrypoint)
+
+def startWorkerCntlr(logLevel=None):
+    """Returns a command line controller for a worker process, whose log entries are buffered, 
+    to be returned to the main process by workerLogEntries
+
+    :param logLevel: name of minimum level of log entries to buffer (default is DEBUG)
+    :type logLevel: str
+    """
+    from arelle import CntlrCmdLine
+    # a forked worker inherits the main process's log handlers, entries are only to be buffered here
+    logger = logging.getLogger("arelle")
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    cntlr = CntlrCmdLine.CntlrCmdLine()
+    cntlr.startLogging(logFileName="logToBuffer",
+                       logFormat="%(message)s",
+                       logLevel=(logLevel or "DEBUG"))
+    return cntlr
+
+def workerLogEntries(cntlr):
+    """Returns and clears the buffered log entries of a worker controller
+
+    :returns: [tuple] -- list of (level, messageCode, message, refs) of each log entry
+    """
+    logHandler = cntlr.logHandler
+    logEntries = [(logRec.levelno, logRec.messageCode, logHandler.format(logRec), logRec.refs)
+                  for logRec in logHandler.logRecordBuffer]
+    logHandler.logRecordBuffer = []
+    return logEntries
+
+def logWorkerEntries(cntlr, logEntries):
+    """Logs, to the main process's controller, log entries returned from a worker process"""
+    for level, messageCode, message, refs in logEntries:
+        if cntlr.logger is not None:
+            cntlr.logger.log(level, message, extra={"messageCode":messageCode, "refs":refs})
+        else:
+            print(message)
+
+def initWorker(options):
+    """Worker process initializer, sets up the worker's controller, which is kept for all of its filings"""
+    global workerCntlr
+    workerCntlr = startWorkerCntlr(options.logLevel)
+    workerCntlr.batchOptions = options
+
+def runWorkerTask(task):
+    """Performs the request for one filing in a worker process
+
+    :returns: tuple -- (index, entrypoint, success, [(level, messageCode, message, refs)])
+    """
+    i, entrypoint = task
+    cntlr = workerCntlr
+    options = cntlr.batchOptions
+    options.entrypointFile = entrypoint
+    try:
+        success = cntlr.run(options)
+    except Exception as err:
+        cntlr.addToLog(_("[Exception] Failed to complete request: \n{0} \n{1}").format(
+                       err,
+                       traceback.format_tb(sys.exc_info()[2])),
+                       messageCode="arelle:batchFiling", file=entrypoint, level=logging.ERROR)
+        success = False
+    return (i, entrypoint, success, workerLogEntries(cntlr))
@@ -56,6 +56,15 @@ def parseAndRun(args):
                              "inline XBRL instance, testcase file, "
                              "testcase index file.  FILENAME may be "
                              "a local file or a URI to a web located file."))
+    parser.add_option("--batch", dest="batchFile",
+                      help=_("BATCHFILE lists the entry points of a batch of filings, each of which is "
+                             "processed per the other options, in a pool of worker processes.  "
+                             "BATCHFILE may be a text file with one entry point file or url per line, "
+                             "a file name pattern (such as 'filings/*.zip'), or an RSS feed file or url.  "
+                             "Log entries are reported per filing, in batch order."))
+    parser.add_option("--batchWorkers", type="int", dest="batchWorkers",
+                      help=_("Specify the number of batch worker processes (default is the number of processors)."))
+    parser.add_option("--batchworkers", type="int", dest="batchWorkers", help=SUPPRESS_HELP)
     parser.add_option("--username", dest="username",
                       help=_("user name if needed (with password) for web file retrieval"))
     parser.add_option("--password", dest="password",
@@ -89,6 +98,11 @@ def parseAndRun(args):
     parser.add_option("--calcPrecision", action="store_true", dest="calcPrecision",
                       help=_("Specify calculation linkbase validation inferring precision."))
     parser.add_option("--calcprecision", action="store_true", dest="calcPrecision", help=SUPPRESS_HELP)
+    parser.add_option("--calcByNetwork", action="store_true", dest="calcByNetwork",
+                      help=_("Perform calculation linkbase validation one network (extended link role) at a time, "
+                             "binding only facts of that network's concepts and releasing them before the next network, "
+                             "to bound memory and report inconsistencies sooner on large instances."))
+    parser.add_option("--calcbynetwork", action="store_true", dest="calcByNetwork", help=SUPPRESS_HELP)
     parser.add_option("--efm", action="store_true", dest="validateEFM",
                       help=_("Select Edgar Filer Manual (U.S. SEC) disclosure system validation (strict)."))
     parser.add_option("--gfm", action="store", dest="disclosureSystemName", help=SUPPRESS_HELP)
@@ -142,6 +156,20 @@ def parseAndRun(args):
     parser.add_option("--testReportCols", action="store", dest="testReportCols",
                       help=_("Columns for test report file"))
     parser.add_option("--testreportcols", action="store", dest="testReportCols", help=SUPPRESS_HELP)
+    parser.add_option("--testcaseWorkers", type="int", dest="testcaseWorkers",
+                      help=_("Specify a number of worker processes to validate the variations of a testcase or "
+                             "testcases index in parallel (the test report and log are in variation order as when validated serially)."))
+    parser.add_option("--testcaseworkers", type="int", dest="testcaseWorkers", help=SUPPRESS_HELP)
+    parser.add_option("--rssItemWorkers", type="int", dest="rssItemWorkers",
+                      help=_("Specify a number of worker processes to load and validate the filings of an RSS feed in parallel, "
+                             "each of which also performs the plug-in actions of its filings, such as storing into an XBRL database "
+                             "(the log is in RSS item order as when validated serially)."))
+    parser.add_option("--rssitemworkers", type="int", dest="rssItemWorkers", help=SUPPRESS_HELP)
+    parser.add_option("--testcaseRerunFailures", action="store", dest="testcaseRerunFailures",
+                      help=_("FILENAME is a prior test report (csv, xml or json), of the same testcases, "
+                             "whose passed variations are reported as passed without being validated again, "
+                             "so that only failed variations are rerun."))
+    parser.add_option("--testcasererunfailures", action="store", dest="testcaseRerunFailures", help=SUPPRESS_HELP)
     parser.add_option("--rssReport", action="store", dest="rssReport",
                       help=_("Write RSS report into FILE"))
     parser.add_option("--rssreport", action="store", dest="rssReport", help=SUPPRESS_HELP)
@@ -209,6 +237,23 @@ def parseAndRun(args):
     parser.add_option("--internetTimeout", type="int", dest="internetTimeout", 
                       help=_("Specify internet connection timeout in seconds (0 means unlimited)."))
     parser.add_option("--internettimeout", type="int", action="store", dest="internetTimeout", help=SUPPRESS_HELP)
+    parser.add_option("--internetPrefetchThreads", type="int", dest="internetPrefetchThreads", 
+                      help=_("Specify number of threads to retrieve, in the background, web-located files referenced "
+                             "by documents being discovered (such as schemaRef, linkbaseRef and import locations), "
+                             "so that discovery rarely waits on the network (0 or absent for no prefetching)."))
+    parser.add_option("--internetprefetchthreads", type="int", action="store", dest="internetPrefetchThreads", help=SUPPRESS_HELP)
+    parser.add_option("--xpathCache", action="store_true", dest="xpathCache", 
+                      help=_("Persist parsed formula XPath expressions (in the configuration directory) "
+                             "so repeated loads of unchanged formula linkbases skip parsing their expressions."))
+    parser.add_option("--xpathcache", action="store_true", dest="xpathCache", help=SUPPRESS_HELP)
+    parser.add_option("--dtsClosureCache", action="store_true", dest="dtsClosureCache", 
+                      help=_("Persist the referenced documents of discovered web-located taxonomy files (in the configuration directory) "
+                             "so a repeated load checks and retrieves a cached taxonomy's files concurrently, as soon as it is first referenced."))
+    parser.add_option("--dtsclosurecache", action="store_true", dest="dtsClosureCache", help=SUPPRESS_HELP)
+    parser.add_option("--sharedTaxonomies", action="store_true", dest="sharedTaxonomies", 
+                      help=_("Load web-located taxonomy files once per process, as a read-only layer shared by each "
+                             "subsequently loaded instance (for web server and batch use)."))
+    parser.add_option("--sharedtaxonomies", action="store_true", dest="sharedTaxonomies", help=SUPPRESS_HELP)
     parser.add_option("--xdgConfigHome", action="store", dest="xdgConfigHome", 
                       help=_("Specify non-standard location for configuration and cache files (overrides environment parameter XDG_CONFIG_HOME)."))
     parser.add_option("--plugins", action="store", dest="plugins",
@@ -290,14 +335,14 @@ def parseAndRun(args):
             print(text)
         except UnicodeEncodeError:
             print(text.encode("ascii", "replace").decode("ascii"))
-    elif len(leftoverArgs) != 0 or (options.entrypointFile is None and 
+    elif len(leftoverArgs) != 0 or (options.entrypointFile is None and options.batchFile is None and 
                                     ((not options.proxy) and (not options.plugins) and
                                      (not any(pluginOption for pluginOption in parser.option_list[pluginOptionsIndex:pluginLastOptionIndex])) and
                                      (not hasWebServer or options.webserver is None))):
         parser.error(_("incorrect arguments, please try\n  python CntlrCmdLine.py --help"))
     elif hasWebServer and options.webserver:
         # webserver incompatible with file operations
-        if any((options.entrypointFile, options.importFiles, options.diffFile, options.versReportFile,
+        if any((options.entrypointFile, options.batchFile, options.importFiles, options.diffFile, options.versReportFile,
                 options.factsFile, options.factListCols, options.factTableFile,
                 options.conceptsFile, options.preFile, options.calFile, options.dimFile, options.formulaeFile, options.viewArcrole, options.viewFile,
                 )):
@@ -306,6 +351,20 @@ def parseAndRun(args):
             cntlr.startLogging(logFileName='logToBuffer')
             from arelle import CntlrWebMain
             CntlrWebMain.startWebserver(cntlr, options)
+    elif options.batchFile:
+        # each filing's views and reports would overwrite the same output files
+        if any((options.entrypointFile, options.importFiles, options.diffFile, options.versReportFile,
+                options.DTSFile, options.factsFile, options.factTableFile, options.conceptsFile, 
+                options.preFile, options.calFile, options.dimFile, options.formulaeFile, options.viewFile,
+                options.testReport, options.rssReport)):
+            parser.error(_("incorrect arguments with --batch, please try\n  python CntlrCmdLine.py --help"))
+        else:
+            cntlr.startLogging(logFileName=(options.logFile or "logToPrint"),
+                               logFormat=(options.logFormat or "[%(messageCode)s] %(message)s - %(file)s"),
+                               logLevel=(options.logLevel or "DEBUG"))
+            from arelle import CntlrBatch
+            CntlrBatch.runBatch(cntlr, options)
+            return cntlr
     else:
         # parse and run the FILENAME
         cntlr.startLogging(logFileName=(options.logFile or "logToPrint"),
@@ -465,6 +524,8 @@ class CntlrCmdLine(Cntlr.Cntlr):
         elif options.calcPrecision:
             self.modelManager.validateInferDecimals = False
             self.modelManager.validateCalcLB = True
+        if options.calcByNetwork:
+            self.modelManager.validateCalcsByNetwork = True
         if options.utrValidate:
             self.modelManager.validateUtr = True
         if options.infosetValidate:
@@ -473,12 +534,26 @@ class CntlrCmdLine(Cntlr.Cntlr):
             self.modelManager.abortOnMajorError = True
         if options.collectProfileStats:
             self.modelManager.collectProfileStats = True
+        self.modelManager.testcaseWorkers = options.testcaseWorkers
+        self.modelManager.testcaseRerunFailures = options.testcaseRerunFailures
+        self.modelManager.rssItemWorkers = options.rssItemWorkers
+        if options.xpathCache and self.modelManager.xpathProgCache is None:
+            from arelle.XPathProgCache import XPathProgCache
+            self.modelManager.xpathProgCache = XPathProgCache(self.modelManager)
+        if options.dtsClosureCache and self.modelManager.dtsClosureCache is None:
+            from arelle.DtsClosureCache import DtsClosureCache
+            self.modelManager.dtsClosureCache = DtsClosureCache(self.modelManager)
+        if options.sharedTaxonomies and self.modelManager.sharedTaxonomies is None:
+            from arelle.SharedTaxonomies import SharedTaxonomies
+            self.modelManager.sharedTaxonomies = SharedTaxonomies(self.modelManager)
         if options.internetConnectivity == "offline":
             self.webCache.workOffline = True
         elif options.internetConnectivity == "online":
             self.webCache.workOffline = False
         if options.internetTimeout is not None:
             self.webCache.timeout = (options.internetTimeout or None)  # use None if zero specified to disable timeout
+        if options.internetPrefetchThreads is not None:
+            self.webCache.prefetchThreads = (options.internetPrefetchThreads or None)
         fo = FormulaOptions()
         if options.parameters:
             parameterSeparator = (options.parameterSeparator or ',')
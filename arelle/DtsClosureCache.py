@@ -0,0 +1,155 @@
+'''
+Created on Oct 18, 2026
+
+Persistent cache of the discovery closure of web-located taxonomy documents.
+
+Model objects are lxml proxies bound to their parsed tree and owning modelXbrl, so a discovered DTS
+is not itself persisted.  What is persisted, for each web-located document discovered by a load, is
+the list of web-located documents it references (schemaRef, linkbaseRef, import, include and
+schemaLocation targets).  When a later load first discovers a cached document, its whole closure is
+known before discovery walks it, so expired web cache files of the closure are checked for freshness
+concurrently, in one batch, and uncached files of the closure are retrieved in the background (with
+--internetPrefetchThreads), instead of level by level as discovery reaches each referencing document.
+
+Entries are versioned and validated by the modification time and size of the document's web cache
+file, so the entry of a document that was retrieved again (or found changed on the web) is dropped.
+Entries only direct checking and retrieval ahead of discovery, which itself is always performed in full.
+
+@author: Mark V Systems Limited
+(c) Copyright 2026 Mark V Systems Limited, All rights reserved.
+'''
+import os, io, json, time
+from arelle.UrlUtil import isHttpUrl
+
+DTS_CLOSURE_CACHE_VERSION = 1
+
+class DtsClosureCache:
+    """
+    .. class:: DtsClosureCache(modelManager)
+
+    Referenced web-located documents of web-located taxonomy documents, by url, persisted in
+    the user application directory as dtsClosureCache.json.
+
+        .. attribute:: documents
+
+        Dict by url of [referenced urls, web cache file mtime, web cache file size]
+    """
+    def __init__(self, modelManager):
+        self.modelManager = modelManager
+        cntlr = modelManager.cntlr
+        self.documents = {}
+        self.isModified = False
+        if cntlr.hasFileSystem:
+            self.cacheJsonFile = cntlr.userAppDir + os.sep + "dtsClosureCache.json"
+            try:
+                with io.open(self.cacheJsonFile, 'rt', encoding='utf-8') as f:
+                    cache = json.load(f)
+                if cache.get("version") == DTS_CLOSURE_CACHE_VERSION:
+                    self.documents = cache.get("documents", {})
+            except Exception:
+                pass # no cache or cache of an unreadable format, start a new one
+        else:
+            self.cacheJsonFile = None
+
+    def isValid(self, url):
+        """True if url has an entry and its web cache file is unchanged since the entry was made (or is
+        not cached now, when the entry is used only to retrieve the closure in the background)
+
+        :param url: mapped url of web-located document
+        :type url: str
+        """
+        entry = self.documents.get(url)
+        if entry is None:
+            return False
+        webCache = self.modelManager.cntlr.webCache
+        filepath = webCache.urlToCacheFilepath(url)
+        try:
+            if (url not in webCache.staleUrls and
+                os.path.getmtime(filepath) == entry[1] and os.path.getsize(filepath) == entry[2]):
+                return True
+        except EnvironmentError:
+            if url not in webCache.staleUrls:
+                return True # not cached, its entry may still name the documents to retrieve
+        del self.documents[url] # file changed
+        self.isModified = True
+        return False
+
+    def restore(self, modelXbrl, url):
+        """For a web-located document about to be discovered by modelXbrl, checks expired web cache files
+        of its cached closure for freshness, concurrently, and starts background retrieval of its uncached files
+
+        :param modelXbrl: modelXbrl discovering the document
+        :type modelXbrl: ModelXbrl
+        :param url: mapped url of web-located document
+        :type url: str
+        """
+        try:
+            restoredUrls = modelXbrl.dtsClosureRestoredUrls
+        except AttributeError:
+            restoredUrls = modelXbrl.dtsClosureRestoredUrls = set()
+        if url in restoredUrls or not self.isValid(url):
+            return
+        closureUrls = set()
+        pendingUrls = [url]
+        while pendingUrls:
+            closureUrl = pendingUrls.pop()
+            if closureUrl not in closureUrls and closureUrl not in restoredUrls:
+                closureUrls.add(closureUrl)
+                if self.isValid(closureUrl):
+                    pendingUrls.extend(self.documents[closureUrl][0])
+        restoredUrls |= closureUrls
+        webCache = self.modelManager.cntlr.webCache
+        if webCache.workOffline:
+            return
+        timeNow = time.time()
+        expiredUrls = []
+        for closureUrl in closureUrls:
+            entry = webCache.cachedUrlManifest.get(closureUrl)
+            if ((entry is None or timeNow - entry[0] > webCache.maxAgeSeconds) and
+                os.path.exists(webCache.urlToCacheFilepath(closureUrl))):
+                expiredUrls.append(closureUrl)
+        if expiredUrls:
+            modelXbrl.modelManager.showStatus(_("web cache checking {0} files of cached DTS").format(len(expiredUrls)))
+            webCache.revalidate(expiredUrls)
+        webCache.prefetch(closureUrls) # retrieves those which aren't cached
+
+    def add(self, modelXbrl):
+        """Adds or updates the entries of the web-located documents discovered by modelXbrl
+
+        :param modelXbrl: loaded modelXbrl
+        :type modelXbrl: ModelXbrl
+        """
+        for doc in set(modelXbrl.urlDocs.values()):
+            url = self.mappedUrl(modelXbrl, doc.uri)
+            if not isHttpUrl(url):
+                continue # local files, such as those of a filing, are always discovered
+            try:
+                entry = [sorted(refUrl
+                                for refDoc in doc.referencesDocument.keys()
+                                for refUrl in (self.mappedUrl(modelXbrl, refDoc.uri),)
+                                if isHttpUrl(refUrl)),
+                         os.path.getmtime(doc.filepath), os.path.getsize(doc.filepath)]
+            except (AttributeError, EnvironmentError):
+                continue # no local file, e.g., in archive
+            if self.documents.get(url) != entry:
+                self.documents[url] = entry
+                self.isModified = True
+
+    @staticmethod
+    def mappedUrl(modelXbrl, url):
+        # as mapped by ModelDocument.load to the url given to the web cache
+        if modelXbrl.fileSource.isMappedUrl(url):
+            return modelXbrl.fileSource.mappedUrl(url)
+        return modelXbrl.modelManager.disclosureSystem.mappedUrl(url)
+
+    def save(self):
+        if self.isModified and self.cacheJsonFile:
+            with io.open(self.cacheJsonFile, 'wt', encoding='utf-8') as f:
+                jsonStr = _STR_UNICODE(json.dumps({"version": DTS_CLOSURE_CACHE_VERSION, "documents": self.documents},
+                                                  ensure_ascii=False, indent=0)) # might not be unicode in 2.7
+                f.write(jsonStr)
+        self.isModified = False
+
+    def clear(self):
+        self.documents.clear()
+        self.isModified = True
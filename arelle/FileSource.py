@@ -4,7 +4,8 @@ Created on Oct 20, 2010
 @author: Mark V Systems Limited
 (c) Copyright 2010 Mark V Systems Limited, All rights reserved.
 '''
-import zipfile, os, io, base64, gzip, zlib, re, struct, random, time
+import zipfile, os, io, base64, gzip, zlib, re, struct, random, time, threading
+from collections import OrderedDict
 from lxml import etree
 from arelle import XmlUtil
 from arelle.UrlUtil import isHttpUrl
@@ -66,6 +67,38 @@ class ArchiveFileIOError(IOError):
     def __str__(self):
         return _("Archive does not contain file: {0}, archive: {1}").format(self.fileName, self.url)
             
+DECODED_MEMBERS_CACHE_SIZE = 32 * 1024 * 1024 # bytes of EIS and XFD members kept decoded
+
+# zip files (with their read central directory) shared by the file sources which have them open, and
+# closed when the last of those closes (so the archive file is not kept locked)
+openedZipFiles = {} # (file path, modified time, size): [ZipFile, number of file sources using it]
+openedZipFilesLock = threading.Lock() # file sources may be opened and closed by web server threads
+
+def openZipFile(cntlr, filepath):
+    # returns a ZipFile of filepath, sharing one already opened for an unchanged local file
+    try:
+        fileStat = os.stat(filepath)
+        key = (filepath, fileStat.st_mtime, fileStat.st_size)
+    except (EnvironmentError, TypeError, ValueError): # not a local file
+        return zipfile.ZipFile(openFileStream(cntlr, filepath, 'rb'), mode="r")
+    with openedZipFilesLock:
+        zipFileUse = openedZipFiles.get(key)
+        if zipFileUse is None:
+            zipFileUse = openedZipFiles[key] = [zipfile.ZipFile(openFileStream(cntlr, filepath, 'rb'), mode="r"), 0]
+        zipFileUse[1] += 1
+        return zipFileUse[0]
+
+def closeZipFile(zf):
+    with openedZipFilesLock:
+        for key, zipFileUse in openedZipFiles.items():
+            if zipFileUse[0] is zf:
+                zipFileUse[1] -= 1
+                if zipFileUse[1] > 0:
+                    return # still used by another file source
+                del openedZipFiles[key]
+                break
+    zf.close()
+
 class FileSource:
     def __init__(self, url, cntlr=None, checkIfXmlIsEis=False):
         self.url = str(url)  # allow either string or FileNamedStringIO
@@ -80,6 +113,9 @@ class FileSource:
         self.fs = None
         self.selection = None
         self.filesDir = None
+        self.archiveMembers = None # EIS or XFD archive file name: element with its base64 contents
+        self.decodedMembers = OrderedDict() # most recently used decoded bytes of EIS or XFD members
+        self.decodedMembersSize = 0
         self.referencedFileSources = {}  # archive file name, fileSource object
         self.mappedPaths = {}  # remappings of path segments may be loaded by taxonomyPackage manifest
         
@@ -113,7 +149,7 @@ class FileSource:
                 return  # an error should have been logged
             if self.isZip:
                 try:
-                    self.fs = zipfile.ZipFile(openFileStream(self.cntlr, self.basefile, 'rb'), mode="r")
+                    self.fs = openZipFile(self.cntlr, self.basefile)
                     self.isOpen = True
                 except EnvironmentError as err:
                     self.logError(err)
@@ -154,6 +190,7 @@ class FileSource:
                         parser = etree.XMLParser(recover=True, huge_tree=True)
                         self.eisDocument = etree.parse(file, parser=parser)
                         file.close()
+                        self.indexArchiveMembers()
                         self.isOpen = True
                     except EnvironmentError as err:
                         self.logError(err)
@@ -207,6 +244,7 @@ class FileSource:
                 try:
                     self.xfdDocument = etree.parse(file)
                     file.close()
+                    self.indexArchiveMembers()
                     self.isOpen = True
                 except EnvironmentError as err:
                     self.logError(err)
@@ -239,7 +277,7 @@ class FileSource:
                 referencedFileSource.close()
         self.referencedFileSources = None
         if self.isZip and self.isOpen:
-            self.fs.close()
+            closeZipFile(self.fs)
             self.isOpen = False
             self.isZip = False
         if self.isEis and self.isOpen:
@@ -255,6 +293,42 @@ class FileSource:
             self.rssDocument = None
             self.isRss = False
         self.filesDir = None
+        self.archiveMembers = None
+        self.decodedMembers.clear()
+        self.decodedMembersSize = 0
+        
+    def indexArchiveMembers(self):
+        # index EIS or XFD member contents elements by file name, once, when the archive is opened
+        self.archiveMembers = {}
+        if self.isEis:
+            for docElt in self.eisDocument.iter(tag="{http://www.sec.gov/edgar/common}document"):
+                outfn = docElt.findtext("{http://www.sec.gov/edgar/common}conformedName")
+                contentsElt = docElt.find("{http://www.sec.gov/edgar/common}contents")
+                if outfn and contentsElt is not None and contentsElt.text:
+                    self.archiveMembers.setdefault(outfn, contentsElt)
+        elif self.isXfd:
+            for data in self.xfdDocument.iter(tag="data"):
+                outfn = data.findtext("filename")
+                mimedataElt = data.find("mimedata")
+                if outfn and mimedataElt is not None and mimedataElt.text:
+                    self.archiveMembers.setdefault(outfn, mimedataElt)
+                    
+    def archiveMemberBytes(self, archiveFileName):
+        # decoded bytes of an EIS or XFD member (without byte order mark), or None if not in archive
+        b = self.decodedMembers.pop(archiveFileName, None)
+        if b is None:
+            contentsElt = self.archiveMembers.get(archiveFileName)
+            if contentsElt is None:
+                return None
+            b = base64.b64decode(contentsElt.text.encode("latin-1"))
+            # remove BOM codes if present
+            if b[0:3] == b'\xef\xbb\xbf':
+                b = b[3:]
+            self.decodedMembersSize += len(b)
+            while self.decodedMembers and self.decodedMembersSize > DECODED_MEMBERS_CACHE_SIZE:
+                self.decodedMembersSize -= len(self.decodedMembers.popitem(last=False)[1]) # least recently used
+        self.decodedMembers[archiveFileName] = b
+        return b
         
     @property
     def isArchive(self):
@@ -309,10 +383,12 @@ class FileSource:
                     self.referencedFileSources[referencedArchiveFile] = referencedFileSource
         return None
     
-    def file(self, filepath, binary=False):
+    def file(self, filepath, binary=False, xmlBytes=False):
         ''' 
             for text, return a tuple of (open file handle, encoding)
             for binary, return a tuple of (open file handle, )
+            for xmlBytes, return a tuple of (open binary file handle, encoding), for parsing undecoded
+              (a text file handle for EIS or XFD members without encoding declaration, decoded as latin-1)
         '''
         archiveFileSource = self.fileSourceContainingFilepath(filepath)
         if archiveFileSource is not None:
@@ -326,54 +402,32 @@ class FileSource:
                     if binary:
                         return (io.BytesIO(b), )
                     encoding = XmlUtil.encoding(b)
+                    if xmlBytes:
+                        return (io.BytesIO(b), encoding)
                     return (io.TextIOWrapper(io.BytesIO(b), encoding=encoding), 
                             encoding)
                 except KeyError:
                     raise ArchiveFileIOError(self, archiveFileName)
-            elif archiveFileSource.isEis:
-                for docElt in self.eisDocument.iter(tag="{http://www.sec.gov/edgar/common}document"):
-                    outfn = docElt.findtext("{http://www.sec.gov/edgar/common}conformedName")
-                    if outfn == archiveFileName:
-                        b64data = docElt.findtext("{http://www.sec.gov/edgar/common}contents")
-                        if b64data:
-                            b = base64.b64decode(b64data.encode("latin-1"))
-                            # remove BOM codes if present
-                            if len(b) > 3 and b[0] == 239 and b[1] == 187 and b[2] == 191:
-                                start = 3;
-                                length = len(b) - 3;
-                                b = b[start:start + length]
-                            else:
-                                start = 0;
-                                length = len(b);
-                            if binary:
-                                return (io.BytesIO(b), )
-                            encoding = XmlUtil.encoding(b, default="latin-1")
-                            return (io.TextIOWrapper(io.BytesIO(b), encoding=encoding), 
-                                    encoding)
-                raise ArchiveFileIOError(self, archiveFileName)
-            elif archiveFileSource.isXfd:
-                for data in archiveFileSource.xfdDocument.iter(tag="data"):
-                    outfn = data.findtext("filename")
-                    if outfn == archiveFileName:
-                        b64data = data.findtext("mimedata")
-                        if b64data:
-                            b = base64.b64decode(b64data.encode("latin-1"))
-                            # remove BOM codes if present
-                            if len(b) > 3 and b[0] == 239 and b[1] == 187 and b[2] == 191:
-                                start = 3;
-                                length = len(b) - 3;
-                                b = b[start:start + length]
-                            else:
-                                start = 0;
-                                length = len(b);
-                            if binary:
-                                return (io.BytesIO(b), )
-                            encoding = XmlUtil.encoding(b, default="latin-1")
-                            return (io.TextIOWrapper(io.BytesIO(b), encoding=encoding), 
-                                    encoding)
-                raise ArchiveFileIOError(self, archiveFileName)
+            elif archiveFileSource.isEis or archiveFileSource.isXfd:
+                b = archiveFileSource.archiveMemberBytes(archiveFileName)
+                if b is None:
+                    raise ArchiveFileIOError(self, archiveFileName)
+                if binary:
+                    return (io.BytesIO(b), )
+                encoding = XmlUtil.encoding(b, default=None)
+                if xmlBytes and encoding is not None:
+                    return (io.BytesIO(b), encoding)
+                # without an encoding declaration members are latin-1, which lxml wouldn't assume, so are decoded here
+                encoding = encoding or "latin-1"
+                return (io.TextIOWrapper(io.BytesIO(b), encoding=encoding), 
+                        encoding)
         if binary:
             return (openFileStream(self.cntlr, filepath, 'rb'), )
+        elif xmlBytes:
+            openedFileStream = openFileStream(self.cntlr, filepath, 'rb')
+            encoding = XmlUtil.encoding(openedFileStream.read(512))
+            openedFileStream.seek(0)
+            return (openedFileStream, encoding)
         else:
             return openXmlFileStream(self.cntlr, filepath)
 
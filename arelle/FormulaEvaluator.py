@@ -514,7 +514,58 @@ def aspectMatches(xpCtx, fact1, fact2, aspect):
                 # else if both are None, matches True for single and multiple instance
     return True
 
+def aspectPartitionKey(fact, aspect):
+    # key of fact's aspect value, equal for any facts of one instance that aspectMatches, and
+    # otherwise preferably different (aspects which can't be keyed cheaply, such as typed dimensions
+    # and segment or scenario nodes, have a constant key, leaving them for aspectMatches to compare)
+    if aspect == 1: # Aspect.LOCATION:
+        return fact.getparent()
+    elif aspect == 2: # Aspect.CONCEPT:
+        return fact.qname
+    elif aspect == 5: # Aspect.UNIT:
+        unit = fact.unit
+        return unit.hash if unit is not None else None
+    context = fact.context
+    if context is None:
+        return None
+    if aspect == 4: # Aspect.PERIOD:
+        return context.periodHash
+    elif aspect == 3: # Aspect.ENTITY_IDENTIFIER:
+        return context.entityIdentifierHash
+    elif isinstance(aspect, QName):
+        dimValue = context.dimValue(aspect)
+        if dimValue is None or isinstance(dimValue, QName): # absent or default
+            return dimValue
+        elif dimValue.isExplicit:
+            return dimValue.memberQname
+        return True # typed member
+    return None
+
 def factsPartitions(xpCtx, facts, aspects):
+    modelXbrl = None
+    for fact in facts:
+        if fact is None or fact.isTuple or (modelXbrl is not None and fact.modelXbrl != modelXbrl):
+            # fallback, tuple or multi-instance matching isn't transitive over aspect values, compare all partitions
+            return factsPartitionsByMatching(xpCtx, facts, aspects)
+        modelXbrl = fact.modelXbrl
+    # facts of one instance are partitioned by aspect key, comparing only to partitions of the same key,
+    # in order of partition creation, so that partitions are the same as by comparing to all partitions
+    aspects = list(aspects)
+    factsPartitions = []
+    keyPartitions = defaultdict(list)
+    for fact in facts:
+        partitions = keyPartitions[tuple(aspectPartitionKey(fact, aspect) for aspect in aspects)]
+        for partition in partitions:
+            if aspectsMatch(xpCtx, fact, partition[0], aspects):
+                partition.append(fact)
+                break
+        else:
+            partition = [fact,]
+            partitions.append(partition)
+            factsPartitions.append(partition)
+    return factsPartitions
+
+def factsPartitionsByMatching(xpCtx, facts, aspects):
     factsPartitions = []
     for fact in facts:
         matched = False
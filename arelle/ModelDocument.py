@@ -5,6 +5,7 @@ Created on Oct 3, 2010
 (c) Copyright 2010 Mark V Systems Limited, All rights reserved.
 '''
 import os, sys
+from collections import defaultdict
 from lxml import etree
 from xml.sax import SAXParseException
 from arelle import (XbrlConst, XmlUtil, UrlUtil, ValidateFilingText, XmlValidate, XmlValidateSchema)
@@ -56,6 +57,14 @@ def load(modelXbrl, uri, base=None, referringElement=None, isEntry=False, isDisc
             modelXbrl.urlUnloadableDocs.add(normalizedUri)
         if blocked:
             return None
+    sharedTaxonomies = modelXbrl.modelManager.sharedTaxonomies
+    if (sharedTaxonomies is not None and isDiscovered and not isIncluded and
+        sharedTaxonomies.isShareable(modelXbrl, normalizedUri)):
+        modelDocument = modelXbrl.urlDocs.get(normalizedUri)
+        if modelDocument is None:
+            modelDocument = sharedTaxonomies.attach(modelXbrl, normalizedUri)
+        if modelDocument is not None:
+            return modelDocument
     if modelXbrl.fileSource.isMappedUrl(normalizedUri):
         mappedUri = modelXbrl.fileSource.mappedUrl(normalizedUri)
     else:
@@ -69,6 +78,9 @@ def load(modelXbrl, uri, base=None, referringElement=None, isEntry=False, isDisc
     if modelXbrl.fileSource.isInArchive(mappedUri):
         filepath = mappedUri
     else:
+        dtsClosureCache = modelXbrl.modelManager.dtsClosureCache
+        if dtsClosureCache is not None and UrlUtil.isHttpUrl(mappedUri):
+            dtsClosureCache.restore(modelXbrl, mappedUri)
         filepath = modelXbrl.modelManager.cntlr.webCache.getfilename(mappedUri, reload=reloadCache)
         if filepath:
             uri = modelXbrl.modelManager.cntlr.webCache.normalizeUrl(filepath)
@@ -106,7 +118,7 @@ def load(modelXbrl, uri, base=None, referringElement=None, isEntry=False, isDisc
             modelXbrl.modelManager.disclosureSystem.validateFileText):
             file, _encoding = ValidateFilingText.checkfile(modelXbrl,filepath)
         else:
-            file, _encoding = modelXbrl.fileSource.file(filepath)
+            file, _encoding = modelXbrl.fileSource.file(filepath, xmlBytes=True) # lxml decodes
         _parser, _parserLookupName, _parserLookupClass = parser(modelXbrl,filepath)
         xmlDocument = None
         isPluginParserDocument = False
@@ -261,6 +273,10 @@ def load(modelXbrl, uri, base=None, referringElement=None, isEntry=False, isDisc
                 # discovery was performed by plug-in, we're done
                 return modelDocument
         
+        if modelXbrl.modelManager.cntlr.webCache.prefetchThreads and \
+           _type in (Type.SCHEMA, Type.LINKBASE, Type.INSTANCE, Type.INLINEXBRL):
+            modelDocument.prefetchHrefs(rootNode)
+        
         if _type == Type.SCHEMA:
             modelDocument.schemaDiscover(rootNode, isIncluded, namespace)
         elif _type == Type.LINKBASE:
@@ -285,6 +301,15 @@ def load(modelXbrl, uri, base=None, referringElement=None, isEntry=False, isDisc
             modelDocument.rssFeedDiscover(rootNode)
     return modelDocument
 
+# elements whose hrefs are prefetched when discovering a document
+prefetchHrefTags = ("{http://www.w3.org/2001/XMLSchema}import",
+                    "{http://www.w3.org/2001/XMLSchema}include",
+                    "{http://www.xbrl.org/2003/linkbase}schemaRef",
+                    "{http://www.xbrl.org/2003/linkbase}linkbaseRef",
+                    "{http://www.xbrl.org/2003/linkbase}roleRef",
+                    "{http://www.xbrl.org/2003/linkbase}arcroleRef",
+                    "{http://www.xbrl.org/2003/linkbase}loc")
+
 def loadSchemalocatedSchema(modelXbrl, element, relativeUrl, namespace, baseUrl):
     importSchemaLocation = modelXbrl.modelManager.cntlr.webCache.normalizeUrl(relativeUrl, baseUrl)
     doc = load(modelXbrl, importSchemaLocation, isIncluded=False, isDiscovered=False, namespace=namespace, referringElement=element)
@@ -582,7 +607,7 @@ class ModelDocument:
         visited.append(self)
         try:
             for referencedDocument, modelDocumentReference in self.referencesDocument.items():
-                if referencedDocument not in visited:
+                if referencedDocument not in visited and referencedDocument.modelXbrl is self.modelXbrl: # not a shared taxonomy document
                     referencedDocument.close(visited=visited,urlDocs=urlDocs)
                 modelDocumentReference.__dict__.clear() # dereference its contents
             self.referencesDocument.clear()
@@ -718,6 +743,28 @@ class ModelDocument:
                 return os.path.dirname(self.filepath) + "/" + base
         return self.filepath
             
+    def prefetchHrefs(self, rootElement):
+        # start background web cache retrieval of documents which discovery will load from this document
+        modelXbrl = self.modelXbrl
+        webCache = modelXbrl.modelManager.cntlr.webCache
+        urls = set()
+        for element in rootElement.iter(*prefetchHrefTags):
+            if element.namespaceURI == XbrlConst.xsd:
+                href = element.get("schemaLocation")
+            else:
+                href = element.get("{http://www.w3.org/1999/xlink}href")
+            if href:
+                url = UrlUtil.splitDecodeFragment(href)[0]
+                if url:
+                    url = webCache.normalizeUrl(url, element.base or self.filepath)
+                    if url not in modelXbrl.urlDocs:
+                        if modelXbrl.fileSource.isMappedUrl(url):
+                            url = modelXbrl.fileSource.mappedUrl(url)
+                        else:
+                            url = modelXbrl.modelManager.disclosureSystem.mappedUrl(url)
+                        urls.add(url)
+        webCache.prefetch(urls)
+            
     def importDiscover(self, element):
         schemaLocation = element.get("schemaLocation")
         if element.localName == "include":
@@ -957,30 +1004,34 @@ class ModelDocument:
         if htmlElement.namespaceURI == XbrlConst.xhtml:  # must validate xhtml
             #load(self.modelXbrl, "http://www.w3.org/2002/08/xhtml/xhtml1-strict.xsd")
             XmlValidate.xhtmlValidate(self.modelXbrl, htmlElement)  # fails on prefixed content
-        for inlineElement in htmlElement.iterdescendants(tag="{http://www.xbrl.org/2008/inlineXBRL}references"):
+        # classify inline elements in one traversal of the html tree (in document order)
+        ixElements = defaultdict(list)
+        for inlineElement in htmlElement.iterdescendants(tag="{http://www.xbrl.org/2008/inlineXBRL}*"):
+            if isinstance(inlineElement,ModelObject):
+                ixElements[inlineElement.localName].append(inlineElement)
+        for inlineElement in ixElements["references"]:
             self.schemaLinkbaseRefsDiscover(inlineElement)
             XmlValidate.validate(self.modelXbrl, inlineElement) # validate instance elements
-        for inlineElement in htmlElement.iterdescendants(tag="{http://www.xbrl.org/2008/inlineXBRL}resources"):
+        for inlineElement in ixElements["resources"]:
             self.instanceContentsDiscover(inlineElement)
             XmlValidate.validate(self.modelXbrl, inlineElement) # validate instance elements
             
-        tupleElements = []
+        tupleElements = ixElements["tuple"]
         tuplesByTupleID = {}
-        for modelInlineTuple in htmlElement.iterdescendants(tag="{http://www.xbrl.org/2008/inlineXBRL}tuple"):
-            if isinstance(modelInlineTuple,ModelObject):
-                modelInlineTuple.unorderedTupleFacts = []
-                if modelInlineTuple.tupleID:
-                    tuplesByTupleID[modelInlineTuple.tupleID] = modelInlineTuple
-                tupleElements.append(modelInlineTuple)
+        for modelInlineTuple in tupleElements:
+            modelInlineTuple.unorderedTupleFacts = []
+            if modelInlineTuple.tupleID:
+                tuplesByTupleID[modelInlineTuple.tupleID] = modelInlineTuple
+        # facts not in tuples of this document are appended to modelXbrl.facts, after those of prior documents
+        firstRootFactIndex = len(self.modelXbrl.facts)
         # hook up tuples to their container
         for tupleFact in tupleElements:
             self.inlineXbrlLocateFactInTuple(tupleFact, tuplesByTupleID)
 
-        for tag in ("{http://www.xbrl.org/2008/inlineXBRL}nonNumeric", "{http://www.xbrl.org/2008/inlineXBRL}nonFraction", "{http://www.xbrl.org/2008/inlineXBRL}fraction"):
-            for modelInlineFact in htmlElement.iterdescendants(tag=tag):
-                if isinstance(modelInlineFact,ModelObject):
-                    self.modelXbrl.factsInInstance.add( modelInlineFact )
-                    self.inlineXbrlLocateFactInTuple(modelInlineFact, tuplesByTupleID)
+        for localName in ("nonNumeric", "nonFraction", "fraction"):
+            for modelInlineFact in ixElements[localName]:
+                self.modelXbrl.factsInInstance.add( modelInlineFact )
+                self.inlineXbrlLocateFactInTuple(modelInlineFact, tuplesByTupleID)
         # order tuple facts
         for tupleFact in tupleElements:
             tupleFact.modelTupleFacts = [
@@ -988,7 +1039,8 @@ class ModelDocument:
                  for order,objectIndex in sorted(tupleFact.unorderedTupleFacts)]
             
         # validate particle structure of elements after transformations and established tuple structure
-        for rootModelFact in self.modelXbrl.facts:
+        # (facts of prior documents of an inline document set were validated by their own discovery)
+        for rootModelFact in self.modelXbrl.facts[firstRootFactIndex:]:
             XmlValidate.validate(self.modelXbrl, rootModelFact, ixFacts=True)
 
                 
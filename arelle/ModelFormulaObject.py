@@ -834,6 +834,24 @@ class ModelFilter(ModelFormulaResource):
     def filter(self, xpCtx, varBinding, facts, cmplmt):
         return facts
 
+    def hasFactIndependentExpressions(self, *progs):
+        """True if the filter's expressions do not depend on the fact being filtered (as context item), so
+        that they can be evaluated once per filtering and the filter applied by fact index lookup
+        """
+        try:
+            return self._hasFactIndependentExpressions
+        except AttributeError:
+            self._hasFactIndependentExpressions = all(XPathParser.isContextItemIndependent(prog)
+                                                      for prog in progs if prog)
+            return self._hasFactIndependentExpressions
+        
+    def filterByIndexedFacts(self, facts, indexedFactSets, cmplmt):
+        """Returns facts that are (or if cmplmt, are not) in the union of indexedFactSets"""
+        indexedFacts = set().union(*indexedFactSets)
+        if not isinstance(facts, set):
+            facts = set(facts)
+        return (facts - indexedFacts) if cmplmt else (facts & indexedFacts)
+        
     def hasNoFilterVariableDependencies(self, xpCtx):
         try:
             return self._hasNoVariableDependencies
@@ -1091,6 +1109,12 @@ class ModelConceptName(ModelFilter):
                                       for inst in varBinding.instances
                                       for qn in self.conceptQnames])
             return (facts - qnamedFacts) if cmplmt else (facts & qnamedFacts)            
+        if facts and self.hasFactIndependentExpressions(*self.qnameExpressionProgs):
+            return self.filterByIndexedFacts(facts,
+                                             [inst.factsByQname[qn]
+                                              for inst in varBinding.instances
+                                              for qn in self.conceptQnames | self.evalQnames(xpCtx, None)],
+                                             cmplmt)
         return set(fact for fact in facts 
                    if cmplmt ^ (fact.qname in self.conceptQnames | self.evalQnames(xpCtx,fact))) 
     
@@ -1567,6 +1591,13 @@ class ModelEntitySpecificIdentifier(ModelFilter):
             super(ModelEntitySpecificIdentifier, self).compile()
         
     def filter(self, xpCtx, varBinding, facts, cmplmt):
+        if facts and self.hasFactIndependentExpressions(self.schemeProg, self.valueProg):
+            scheme = xpCtx.evaluateAtomicValue(self.schemeProg, 'xs:string')
+            identifier = xpCtx.evaluateAtomicValue(self.valueProg, 'xs:string')
+            return self.filterByIndexedFacts(facts, 
+                                             [inst.factsByEntityIdentifier(scheme, identifier)
+                                              for inst in varBinding.instances], 
+                                             cmplmt)
         return set(fact for fact in facts 
                    if cmplmt ^ (fact.isItem and ( 
                                                  fact.context.entityIdentifier[0] == xpCtx.evaluateAtomicValue(self.schemeProg, 'xs:string', fact) and 
@@ -1606,6 +1637,12 @@ class ModelEntityScheme(ModelFilter):
             super(ModelEntityScheme, self).compile()
         
     def filter(self, xpCtx, varBinding, facts, cmplmt):
+        if facts and self.hasFactIndependentExpressions(self.schemeProg):
+            scheme = xpCtx.evaluateAtomicValue(self.schemeProg, 'xs:string')
+            return self.filterByIndexedFacts(facts, 
+                                             [inst.factsByEntityIdentifier(scheme)
+                                              for inst in varBinding.instances], 
+                                             cmplmt)
         return set(fact for fact in facts 
                    if cmplmt ^ (fact.isItem and 
                                 fact.context.entityIdentifier[0] == xpCtx.evaluateAtomicValue(self.schemeProg, 'xs:string', fact))) 
@@ -1792,6 +1829,16 @@ class ModelDateTimeFilter(ModelFilter):
             return date + datetime.timedelta(1)
         return date
     
+    def filterByPeriod(self, xpCtx, varBinding, facts, cmplmt, periodAspect, addOneDay):
+        """Returns facts filtered by period index, if date and time expressions do not depend on the fact, else None"""
+        if facts and self.hasFactIndependentExpressions(self.dateProg, getattr(self, "timeProg", None)):
+            dateTime = self.evalDatetime(xpCtx, None, addOneDay=addOneDay)
+            return self.filterByIndexedFacts(facts, 
+                                             [inst.factsByPeriod(periodAspect, dateTime)
+                                              for inst in varBinding.instances], 
+                                             cmplmt)
+        return None
+    
     @property
     def propertyView(self):
         return (("label", self.xlinkLabel),
@@ -1811,6 +1858,9 @@ class ModelPeriodStart(ModelDateTimeFilter):
         super(ModelPeriodStart, self).init(modelDocument)
 
     def filter(self, xpCtx, varBinding, facts, cmplmt):
+        indexedFacts = self.filterByPeriod(xpCtx, varBinding, facts, cmplmt, "start", addOneDay=False)
+        if indexedFacts is not None:
+            return indexedFacts
         return set(fact for fact in facts 
                    if cmplmt ^ (fact.isItem and 
                                 fact.context.startDatetime == self.evalDatetime(xpCtx, fact, addOneDay=False))) 
@@ -1820,6 +1870,9 @@ class ModelPeriodEnd(ModelDateTimeFilter):
         super(ModelPeriodEnd, self).init(modelDocument)
 
     def filter(self, xpCtx, varBinding, facts, cmplmt):
+        indexedFacts = self.filterByPeriod(xpCtx, varBinding, facts, cmplmt, "end", addOneDay=True)
+        if indexedFacts is not None:
+            return indexedFacts
         return [fact for fact in facts 
                 if cmplmt ^ (fact.isItem and (fact.context.isStartEndPeriod 
                              and fact.context.endDatetime == self.evalDatetime(xpCtx, fact, addOneDay=True)))] 
@@ -1829,6 +1882,9 @@ class ModelPeriodInstant(ModelDateTimeFilter):
         super(ModelPeriodInstant, self).init(modelDocument)
 
     def filter(self, xpCtx, varBinding, facts, cmplmt):
+        indexedFacts = self.filterByPeriod(xpCtx, varBinding, facts, cmplmt, "instant", addOneDay=True)
+        if indexedFacts is not None:
+            return indexedFacts
         return set(fact for fact in facts 
                    if cmplmt ^ (fact.isItem and 
                                 fact.context.instantDatetime == self.evalDatetime(xpCtx, fact, addOneDay=True))) 
@@ -1838,8 +1894,10 @@ class ModelForever(ModelFilter):
         super(ModelForever, self).init(modelDocument)
 
     def filter(self, xpCtx, varBinding, facts, cmplmt):
-        return set(fact for fact in facts 
-                   if cmplmt ^ (fact.isItem and fact.context.isForeverPeriod)) 
+        return self.filterByIndexedFacts(facts, 
+                                         [inst.factsByPeriod("forever")
+                                          for inst in varBinding.instances], 
+                                         cmplmt)
 
     def aspectsCovered(self, varBinding):
         return {Aspect.PERIOD}
@@ -1873,10 +1931,10 @@ class ModelInstantDuration(ModelFilter):
                 otherDatetime = otherFact.context.startDatetime
             else:
                 otherDatetime = otherFact.context.endDatetime
-            return set(fact for fact in facts 
-                       if cmplmt ^ (fact.isItem and (fact.context is not None and
-                                                     fact.context.isInstantPeriod and
-                                                     fact.context.instantDatetime == otherDatetime))) 
+            return self.filterByIndexedFacts(facts, 
+                                             [inst.factsByPeriod("instant", otherDatetime)
+                                              for inst in varBinding.instances], 
+                                             cmplmt)
         return facts # couldn't filter
 
     @property
@@ -2500,6 +2558,11 @@ class ModelSingleMeasure(ModelFilter):
             return None
     
     def filter(self, xpCtx, varBinding, facts, cmplmt):
+        if facts and self.hasFactIndependentExpressions(self.qnameExpressionProg):
+            return self.filterByIndexedFacts(facts, 
+                                             [inst.factsBySingleMeasure(self.evalQname(xpCtx, None))
+                                              for inst in varBinding.instances], 
+                                             cmplmt)
         return set(fact for fact in facts 
                    if cmplmt ^ (fact.isNumeric and 
                                 fact.unit.isSingleMeasure and
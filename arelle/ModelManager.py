@@ -37,6 +37,10 @@ class ModelManager:
         
         True for calculation linkbase validation to infer decimals (instead of precision)
         
+        .. attribute:: validateCalcsByNetwork
+        
+        True for calculation linkbase validation to bind facts one network (extended link role) at a time, releasing each network's bindings before the next, to bound memory on large instances
+        
         .. attribute:: validateUTR
         
         True for validation of unit type registry
@@ -44,6 +48,30 @@ class ModelManager:
         .. attribute:: defaultLang
         
         The default language code for labels selection and views (e.g. 'en-US'), set from the operating system defaults on startup.
+        
+        .. attribute:: xpathProgCache
+        
+        XPathProgCache of parsed formula XPath expressions, or None if not in use
+        
+        .. attribute:: dtsClosureCache
+        
+        DtsClosureCache of referenced documents of web-located taxonomy documents, or None if not in use
+        
+        .. attribute:: sharedTaxonomies
+        
+        SharedTaxonomies layer of web-located taxonomy documents loaded once and reused by each loaded instance, or None if not in use
+        
+        .. attribute:: testcaseWorkers
+        
+        Number of worker processes to validate testcase variations in parallel, or None to validate them in this process
+        
+        .. attribute:: testcaseRerunFailures
+        
+        File name of a prior test report (csv, xml or json), whose passed variations are not validated again, or None
+        
+        .. attribute:: rssItemWorkers
+        
+        Number of worker processes to validate the items of an RSS feed in parallel, or None to validate them in this process
     """
     
     def __init__(self, cntlr):
@@ -52,10 +80,17 @@ class ModelManager:
         self.disclosureSystem = DisclosureSystem.DisclosureSystem(self)
         self.validateCalcLB = False
         self.validateInferDecimals = False
+        self.validateCalcsByNetwork = False
         self.validateInfoset = False
         self.validateUtr = False
         self.abortOnMajorError = False
         self.collectProfileStats = False
+        self.xpathProgCache = None
+        self.dtsClosureCache = None
+        self.sharedTaxonomies = None
+        self.testcaseWorkers = None
+        self.testcaseRerunFailures = None
+        self.rssItemWorkers = None
         self.loadedModelXbrls = []
         from arelle import Locale
         self.locale = Locale.getUserLocale(cntlr.config.get("userInterfaceLocaleOverride",""))
@@ -84,7 +84,7 @@ def baseSetRelationship(arcElement):
 class ModelRelationshipSet:
     __slots__ = ("isChanged", "modelXbrl", "arcrole", "linkrole", "linkqname", "arcqname",
                  "modelRelationshipsFrom", "modelRelationshipsTo", "modelConceptRoots", "modellinkRoleUris",
-                 "modelRelationships", "_testHintedLabelLinkrole")
+                 "modelRelationships", "_testHintedLabelLinkrole", "modelLabelRelationships", "modelLabels")
     
     # arcrole can either be a single string or a tuple or frozenset of strings
     def __init__(self, modelXbrl, arcrole, linkrole=None, linkqname=None, arcqname=None, includeProhibits=False):
@@ -155,6 +155,8 @@ class ModelRelationshipSet:
         self.modelRelationshipsTo = None
         self.modelConceptRoots = None
         self.modellinkRoleUris = None
+        self.modelLabelRelationships = None
+        self.modelLabels = None
         orderRels = defaultdict(list)
         for modelRel in relationships.values():
             if includeProhibits or not modelRel.isProhibited:
@@ -174,6 +176,7 @@ class ModelRelationshipSet:
             self.modelRelationshipsFrom.clear()
         if self.modelConceptRoots is not None:
             del self.modelConceptRoots[:]
+        self.modelLabelRelationships = self.modelLabels = None
         self.linkqname = self.arcqname = None
         
     def __bool__(self):  # some modelRelationships exist
@@ -283,53 +286,79 @@ class ModelRelationshipSet:
         return False
     
     def label(self, modelFrom, role, lang, returnMultiple=False, returnText=True, linkroleHint=None):
-        shorterLangInLabel = longerLangInLabel = None
-        shorterLangLabels = longerLangLabels = None
-        langLabels = []
-        labels = self.fromModelObject(modelFrom)
         if linkroleHint:  # order of preference of linkroles to find label
             try:
                 testHintedLinkrole = self._testHintedLabelLinkrole
             except AttributeError:
                 self._testHintedLabelLinkrole = testHintedLinkrole = (len(self.linkRoleUris) > 1)
-            if testHintedLinkrole:
-                labelsHintedLink = []
-                labelsDefaultLink = []
-                labelsOtherLinks = []
-                for modelLabelRel in labels:
-                    label = modelLabelRel.toModelObject
-                    if role == label.role:
-                        linkrole = modelLabelRel.linkrole
-                        if linkrole == linkroleHint:
-                            labelsHintedLink.append(modelLabelRel)
-                        elif linkrole == XbrlConst.defaultLinkRole:
-                            labelsDefaultLink.append(modelLabelRel)
-                        else:
-                            labelsOtherLinks.append(modelLabelRel)
-                labels = (labelsHintedLink or labelsDefaultLink or labelsOtherLinks)
+            if not testHintedLinkrole:
+                linkroleHint = None # same labels as without hint
+        # label index of resolved labels (after language fallback) by resource, role, lang and linkrole hint
+        if self.modelLabels is None:
+            self.modelLabels = {}
+        labelKey = (modelFrom, role, lang, returnMultiple, returnText, linkroleHint)
+        try:
+            labels = self.modelLabels[labelKey]
+        except KeyError:
+            labels = self.modelLabels[labelKey] = self.resolveLabel(modelFrom, role, lang, returnMultiple, returnText, linkroleHint)
+        if returnMultiple and labels is not None:
+            return labels[:] # caller may modify its list
+        return labels
+    
+    def labelRelationships(self, modelFrom, role, linkroleHint=None):
+        # label relationships of role, of the hinted linkrole if any (else default or other linkroles), by priority
+        if self.modelLabelRelationships is None:
+            self.modelLabelRelationships = {}
+        labelRelsKey = (modelFrom, role, linkroleHint)
+        try:
+            return self.modelLabelRelationships[labelRelsKey]
+        except KeyError:
+            pass
+        labels = [modelLabelRel 
+                  for modelLabelRel in self.fromModelObject(modelFrom)
+                  if role == modelLabelRel.toModelObject.role]
+        if linkroleHint:
+            labelsHintedLink = []
+            labelsDefaultLink = []
+            labelsOtherLinks = []
+            for modelLabelRel in labels:
+                linkrole = modelLabelRel.linkrole
+                if linkrole == linkroleHint:
+                    labelsHintedLink.append(modelLabelRel)
+                elif linkrole == XbrlConst.defaultLinkRole:
+                    labelsDefaultLink.append(modelLabelRel)
+                else:
+                    labelsOtherLinks.append(modelLabelRel)
+            labels = (labelsHintedLink or labelsDefaultLink or labelsOtherLinks)
         if len(labels) > 1: # order by priority (ignoring equivalence of relationships)
             labels.sort(key=lambda rel: rel.priority, reverse=True)
-        for modelLabelRel in labels:
+        self.modelLabelRelationships[labelRelsKey] = labels
+        return labels
+    
+    def resolveLabel(self, modelFrom, role, lang, returnMultiple, returnText, linkroleHint):
+        shorterLangInLabel = longerLangInLabel = None
+        shorterLangLabels = longerLangLabels = None
+        langLabels = []
+        for modelLabelRel in self.labelRelationships(modelFrom, role, linkroleHint):
             label = modelLabelRel.toModelObject
-            if role == label.role:
-                labelLang = label.xmlLang
-                text = label.elementText if returnText else label
-                if lang is None or len(lang) == 0 or lang == labelLang:
-                    langLabels.append(text)
-                    if not returnMultiple:
-                        break
-                elif labelLang.startswith(lang):
-                    if not longerLangInLabel or len(longerLangInLabel) > len(labelLang):
-                        longerLangInLabel = labelLang
-                        longerLangLabels = [text,]
-                    else:
-                        longerLangLabels.append(text)
-                elif lang.startswith(labelLang):
-                    if not shorterLangInLabel or len(shorterLangInLabel) < len(labelLang):
-                        shorterLangInLabel = labelLang
-                        shorterLangLabels = [text,]
-                    else:
-                        shorterLangLabels.append(text)
+            labelLang = label.xmlLang
+            text = label.elementText if returnText else label
+            if lang is None or len(lang) == 0 or lang == labelLang:
+                langLabels.append(text)
+                if not returnMultiple:
+                    break
+            elif labelLang.startswith(lang):
+                if not longerLangInLabel or len(longerLangInLabel) > len(labelLang):
+                    longerLangInLabel = labelLang
+                    longerLangLabels = [text,]
+                else:
+                    longerLangLabels.append(text)
+            elif lang.startswith(labelLang):
+                if not shorterLangInLabel or len(shorterLangInLabel) < len(labelLang):
+                    shorterLangInLabel = labelLang
+                    shorterLangLabels = [text,]
+                else:
+                    shorterLangLabels.append(text)
         if langLabels:
             if returnMultiple: return langLabels
             else: return langLabels[0]
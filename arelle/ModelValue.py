@@ -4,9 +4,21 @@ Created on Jan 4, 2011
 @author: Mark V Systems Limited
 (c) Copyright 2011 Mark V Systems Limited, All rights reserved.
 '''
-import re, copy, datetime
+import re, copy, datetime, itertools, weakref
 XmlUtil = None
 
+# entries are weakly held, so they are dropped when no qname of that name remains in use
+qnameIds = weakref.WeakValueDictionary() # (namespaceURI, localName): QNameId of qnames of that expanded name
+qnameIdCounter = itertools.count()
+internedQNames = weakref.WeakValueDictionary() # (prefix, namespaceURI, localName): the QName returned by qname() for it
+
+def internedQName(prefix, namespaceURI, localName):
+    # equal qnames with same prefix are the same object
+    try:
+        return internedQNames[(prefix, namespaceURI, localName)]
+    except KeyError:
+        return internedQNames.setdefault((prefix, namespaceURI, localName), QName(prefix, namespaceURI, localName))
+
 def qname(value, name=None, noPrefixIsNoNamespace=False, castException=None, prefixException=None):
     # either value can be an etree ModelObject element: if no name then qname is element tag quanem
     #     if name provided qname uses element as xmlns reference and name as prefixed name
@@ -19,7 +31,7 @@ def qname(value, name=None, noPrefixIsNoNamespace=False, castException=None, pre
             value = name
             name = None
         else:
-            return QName(value.prefix, value.namespaceURI, value.localName)
+            return internedQName(value.prefix, value.namespaceURI, value.localName)
     elif isinstance(name, ModelObject):
         element = name
         name = None
@@ -59,11 +71,11 @@ def qname(value, name=None, noPrefixIsNoNamespace=False, castException=None, pre
             localName = prefix
             prefix = None
             if noPrefixIsNoNamespace:
-                return QName(None, None, localName)
+                return internedQName(None, None, localName)
     if namespaceURI:
-        return QName(prefix, namespaceURI, localName)
+        return internedQName(prefix, namespaceURI, localName)
     elif namespaceDict and prefix in namespaceDict:
-        return QName(prefix, namespaceDict[prefix], localName)
+        return internedQName(prefix, namespaceDict[prefix], localName)
     elif element is not None:
         global XmlUtil
         if XmlUtil is None:
@@ -75,17 +87,31 @@ def qname(value, name=None, noPrefixIsNoNamespace=False, castException=None, pre
             return None  # error, prefix not found
     if not namespaceURI:
         namespaceURI = None # cancel namespace if it is a zero length string
-    return QName(prefix, namespaceURI, localName)
+    return internedQName(prefix, namespaceURI, localName)
+
+class QNameId:
+    # integer id shared by the qnames of an expanded name, kept assigned while any of them is referenced
+    __slots__ = ("id", "__weakref__")
+    def __init__(self):
+        self.id = next(qnameIdCounter)
 
 class QName:
-    __slots__ = ("prefix", "namespaceURI", "localName", "qnameValueHash")
+    __slots__ = ("prefix", "namespaceURI", "localName", "qnameId", "_qnameIdRef", "__weakref__")
     def __init__(self,prefix,namespaceURI,localName):
         self.prefix = prefix
         self.namespaceURI = namespaceURI
         self.localName = localName
-        self.qnameValueHash = ((hash(namespaceURI) * 1000003) & 0xffffffff) ^ hash(localName)
+        # equal qnames (regardless of prefix) have the same id, which is their hash and equality
+        try:
+            _qnameIdRef = qnameIds[(namespaceURI, localName)]
+        except KeyError:
+            _qnameIdRef = qnameIds.setdefault((namespaceURI, localName), QNameId())
+        self._qnameIdRef = _qnameIdRef
+        self.qnameId = _qnameIdRef.id
     def __hash__(self):
-        return self.qnameValueHash
+        return self.qnameId
+    def __reduce__(self): # id is reassigned when unpickled (ids vary by process)
+        return (QName, (self.prefix, self.namespaceURI, self.localName))
     @property
     def clarkNotation(self):
         if self.namespaceURI:
@@ -111,8 +137,7 @@ class QName:
             return self.namespaceURI == other.namespaceURI and self.localName == other.localName
         '''
         try:
-            return (self.qnameValueHash == other.qnameValueHash and 
-                    self.namespaceURI == other.namespaceURI and self.localName == other.localName)
+            return self.qnameId == other.qnameId
         except AttributeError:  # other may be a model object and not a QName
             try:
                 return self.namespaceURI == other.namespaceURI and self.localName == other.localName
@@ -71,6 +71,9 @@ def load(modelManager, url, nextaction=None, base=None, useFileSource=None, erro
     #uncomment for trial use of lxml xml schema validation of entry document
     #XmlValidate.xmlValidate(modelXbrl.modelDocument)
     modelManager.cntlr.webCache.saveUrlCheckTimes()
+    if modelManager.dtsClosureCache is not None:
+        modelManager.dtsClosureCache.add(modelXbrl)
+        modelManager.dtsClosureCache.save()
     modelManager.showStatus(_("xbrl loading finished, {0}...").format(nextaction))
     return modelXbrl
 
@@ -280,6 +283,8 @@ class ModelXbrl:
                 self.formulaOutputInstance.close()
             if hasattr(self,"fileSource") and self.closeFileSource:
                 self.fileSource.close()
+            if self.modelManager.sharedTaxonomies is not None:
+                self.modelManager.sharedTaxonomies.detach(self)
             modelDocument = getattr(self,"modelDocument",None)
             urlDocs = getattr(self,"urlDocs",None)
             for relSet in self.relationshipSets.values():
@@ -701,6 +706,76 @@ class ModelXbrl:
         except KeyError:
             return set()  # no facts for this period type
         
+    def factsByPeriod(self, periodAspect, dateTime=None):
+        """Facts in the instance indexed by period, cached
+
+        :param periodAspect: "forever", "instant" (instant datetime), "start" or "end" (start or end datetime of startDate/endDate periods)
+        :type periodAspect: str
+        :param dateTime: datetime to match (end of day midnight adjusted for instant and end), None for forever
+        :type dateTime: datetime
+        :returns: set -- ModelFacts that have specified period
+        """
+        try:
+            return self._factsByPeriod[periodAspect, dateTime]
+        except AttributeError:
+            self._factsByPeriod = fbp = defaultdict(set)
+            for f in self.factsInInstance:
+                c = f.context
+                if f.isItem and c is not None:
+                    if c.isForeverPeriod:
+                        fbp["forever", None].add(f)
+                    elif c.isInstantPeriod:
+                        fbp["instant", c.instantDatetime].add(f)
+                    elif c.isStartEndPeriod:
+                        fbp["start", c.startDatetime].add(f)
+                        fbp["end", c.endDatetime].add(f)
+            return self.factsByPeriod(periodAspect, dateTime)
+        except KeyError:
+            return set()  # no facts for this period
+        
+    def factsByEntityIdentifier(self, scheme, identifier=None):
+        """Facts in the instance indexed by entity identifier, cached
+
+        :param scheme: entity identifier scheme
+        :type scheme: str
+        :param identifier: entity identifier value, or None for facts of any identifier of scheme
+        :type identifier: str
+        :returns: set -- ModelFacts that have specified entity identifier scheme and value
+        """
+        try:
+            return self._factsByEntityIdentifier[scheme, identifier]
+        except AttributeError:
+            self._factsByEntityIdentifier = fbei = defaultdict(set)
+            for f in self.factsInInstance:
+                c = f.context
+                if f.isItem and c is not None:
+                    factScheme, factIdentifier = c.entityIdentifier
+                    fbei[factScheme, factIdentifier].add(f)
+                    fbei[factScheme, None].add(f)
+            return self.factsByEntityIdentifier(scheme, identifier)
+        except KeyError:
+            return set()  # no facts for this entity identifier
+        
+    def factsBySingleMeasure(self, measureQname):
+        """Numeric facts in the instance, whose unit is a single measure, indexed by measure QName, cached
+
+        :param measureQname: measure
+        :type measureQname: QName
+        :returns: set -- ModelFacts that have specified single measure unit
+        """
+        try:
+            return self._factsBySingleMeasure[measureQname]
+        except AttributeError:
+            self._factsBySingleMeasure = fbsm = defaultdict(set)
+            for f in self.factsInInstance:
+                if f.isNumeric:
+                    u = f.unit
+                    if u is not None and u.isSingleMeasure:
+                        fbsm[u.measures[0][0]].add(f)
+            return self.factsBySingleMeasure(measureQname)
+        except KeyError:
+            return set()  # no facts for this measure
+        
     def factsByDimMemQname(self, dimQname, memQname=None): # indexed by fact (concept) qname
         """Facts in the instance indexed by their Dimension  and Member QName, cached
         
@@ -811,18 +886,12 @@ class ModelXbrl:
                             modelObject,
                             err, traceback.format_tb(sys.exc_info()[2])))
 
-    def logArguments(self, codes, msg, codedArgs):
-        """ Prepares arguments for logger function as per info() below.
+    def effectiveMessageCode(self, codes):
+        """Returns the message code to log, of codes, or None if none applies.
         
         If codes includes EFM, GFM, HMRC, or SBR-coded error then the code chosen (if a sequence)
         corresponds to whether EFM, GFM, HMRC, or SBR validation is in effect.
         """
-        def propValues(properties):
-            # deref objects in properties
-            return [(p[0],str(p[1])) if len(p) == 2 else (p[0],str(p[1]),propValues(p[2]))
-                    for p in properties if 2 <= len(p) <= 3]
-        # determine logCode
-        messageCode = None
         for argCode in codes if isinstance(codes,tuple) else (codes,):
             if (isinstance(argCode, ModelValue.QName) or
                 (self.modelManager.disclosureSystem.EFM and argCode.startswith("EFM")) or
@@ -830,8 +899,21 @@ class ModelXbrl:
                 (self.modelManager.disclosureSystem.HMRC and argCode.startswith("HMRC")) or
                 (self.modelManager.disclosureSystem.SBRNL and argCode.startswith("SBR.NL")) or
                 argCode[0:3] not in ("EFM", "GFM", "HMR", "SBR")):
-                messageCode = argCode
-                break
+                return argCode
+        return None
+        
+    def logArguments(self, codes, msg, codedArgs):
+        """ Prepares arguments for logger function as per info() below.
+        
+        If codes includes EFM, GFM, HMRC, or SBR-coded error then the code chosen (if a sequence)
+        corresponds to whether EFM, GFM, HMRC, or SBR validation is in effect.
+        """
+        def propValues(properties):
+            # deref objects in properties
+            return [(p[0],str(p[1])) if len(p) == 2 else (p[0],str(p[1]),propValues(p[2]))
+                    for p in properties if 2 <= len(p) <= 3]
+        # determine logCode
+        messageCode = self.effectiveMessageCode(codes)
         
         # determine message and extra arguments
         fmtArgs = {}
@@ -943,7 +1025,8 @@ class ModelXbrl:
         """Same as error(), but level passed in as argument
         """
         logger = self.logger
-        messageCode, logArgs, extras = self.logArguments(codes, msg, args)
+        # filter by code and level before preparing (formatting arguments and references of) the message
+        messageCode = self.effectiveMessageCode(codes)
         if messageCode == "asrtNoLog":
             self.errors.append(args["assertionResults"])
         elif (messageCode and
@@ -953,7 +1036,9 @@ class ModelXbrl:
             self.logCount[numericLevel] = self.logCount.get(numericLevel, 0) + 1
             if numericLevel >= self.errorCaptureLevel:
                 self.errors.append(messageCode)
-            logger.log(numericLevel, *logArgs, exc_info=args.get("exc_info"), extra=extras)
+            if logger.isEnabledFor(numericLevel):
+                messageCode, logArgs, extras = self.logArguments(codes, msg, args)
+                logger.log(numericLevel, *logArgs, exc_info=args.get("exc_info"), extra=extras)
                     
     def error(self, codes, msg, **args):
         """Logs a message as info, by code, logging-system message text (using %(name)s named arguments 
@@ -0,0 +1,221 @@
+'''
+Created on Oct 18, 2026
+
+Shared, read-only taxonomy layer reused by the instances loaded in one process.
+
+Web-located taxonomy documents (standard taxonomies, as opposed to filing extension documents)
+are loaded once into a single shared modelXbrl.  Each instance modelXbrl that discovers one of
+them attaches the discovered document and the documents it references, by reference, into its
+own indexes (urlDocs, namespaceDocs, qnameConcepts, roleTypes, baseSets, etc), and then only
+loads its own extension documents and facts.  Relationship sets are resolved per instance
+modelXbrl, so extension linkbases combine with the shared taxonomy linkbases as usual.
+
+Limitations: shared model objects report the shared modelXbrl as their modelXbrl (e.g., a
+standard concept's label() resolves from standard taxonomy label linkbases only), they are not
+addressable by objectId in the instance modelXbrl, and one instance at a time may be attached
+(as in the command line and web server controllers).
+
+@author: Mark V Systems Limited
+(c) Copyright 2026 Mark V Systems Limited, All rights reserved.
+'''
+import threading
+from arelle import XbrlConst
+from arelle.UrlUtil import isHttpUrl
+
+# modelXbrl indexes with single model object values, by key
+sharedObjectIndexes = ("qnameConcepts", "qnameAttributes", "qnameAttributeGroups", "qnameGroupDefinitions",
+                       "qnameTypes", "qnameParameters", "modelCustomFunctionSignatures")
+# modelXbrl indexes with lists of model object values, by key
+sharedListIndexes = ("nameConcepts", "roleTypes", "arcroleTypes", "baseSets")
+# modelXbrl sets of model objects
+sharedSetIndexes = ("modelVariableSets", "modelCustomFunctionImplementations", "modelRenderingTables")
+
+class SharedTaxonomies:
+    """
+    .. class:: SharedTaxonomies(modelManager)
+
+    Loads web-located taxonomy documents once, into a shared modelXbrl, and attaches them to
+    instance modelXbrls that discover them.
+
+        .. attribute:: modelXbrl
+
+        The shared modelXbrl, holding all shared taxonomy documents loaded so far (None until first use)
+
+        .. attribute:: lock
+
+        RLock serializing attaching to and detaching from the shared modelXbrl
+    """
+    def __init__(self, modelManager):
+        self.modelManager = modelManager
+        self.modelXbrl = None
+        self.isLoading = False
+        self.lock = threading.RLock()
+        self.docLabelLangsRoles = {} # shared document: (langs, labelroles) of its resources
+
+    def isShareable(self, modelXbrl, url):
+        """True if the document at url is to be loaded into (or found in) the shared taxonomy layer
+
+        :param modelXbrl: modelXbrl discovering the document
+        :type modelXbrl: ModelXbrl
+        :param url: normalized url of discovered document
+        :type url: str
+        """
+        return (not self.isLoading and
+                isHttpUrl(url) and
+                modelXbrl is not self.modelXbrl and
+                not url.startswith(modelXbrl.uriDir) and # not a web-located filing's own document
+                not modelXbrl.fileSource.isInArchive(url) and
+                not modelXbrl.fileSource.isMappedUrl(url))
+
+    def attach(self, modelXbrl, url):
+        """Returns the shared modelDocument for url (loading it into the shared layer if needed) after
+        attaching it, and all documents it references, to modelXbrl.
+
+        :param modelXbrl: instance (or extension DTS) modelXbrl discovering the document
+        :type modelXbrl: ModelXbrl
+        :param url: normalized url of discovered document
+        :type url: str
+        :returns: ModelDocument -- shared document, or None if it could not be loaded
+        """
+        with self.lock:
+            return self._attach(modelXbrl, url)
+
+    def _attach(self, modelXbrl, url):
+        from arelle import ModelXbrl, ModelDocument, FileSource
+        if self.modelXbrl is None:
+            self.modelXbrl = ModelXbrl.create(self.modelManager)
+            self.modelXbrl.fileSource = FileSource.FileSource(url, self.modelManager.cntlr)
+            self.modelXbrl.closeFileSource = True
+            self.modelXbrl.uri = self.modelXbrl.entryLoadingUrl = url
+            self.modelXbrl.uriDir = ""
+        sharedXbrl = self.modelXbrl
+        sharedDoc = sharedXbrl.urlDocs.get(url)
+        if sharedDoc is None:
+            self.isLoading = True
+            try:
+                priorDocs = set(sharedXbrl.urlDocs.values())
+                sharedDoc = ModelDocument.load(sharedXbrl, url, isDiscovered=True)
+                # as in ModelXbrl.load, schemaLocated schemas of newly loaded documents are needed for validation
+                schemaLocatedDocs = set()
+                while True:
+                    newDocs = set(sharedXbrl.urlDocs.values()) - priorDocs - schemaLocatedDocs
+                    if not newDocs:
+                        break
+                    newDoc = newDocs.pop()
+                    schemaLocatedDocs.add(newDoc)
+                    newDoc.loadSchemalocatedSchemas()
+            finally:
+                self.isLoading = False
+                self.modelManager.cntlr.webCache.saveUrlCheckTimes()
+            if sharedDoc is None:
+                return None
+        # documents referenced from the shared document, not yet attached
+        try:
+            attachedDocs = modelXbrl.sharedDocuments
+        except AttributeError:
+            attachedDocs = modelXbrl.sharedDocuments = {} # shared document: count of its modelObjects when attached
+            modelXbrl.sharedObjectsCount = len(sharedXbrl.modelObjects)
+        newDocs = set()
+        pendingDocs = [sharedDoc]
+        while pendingDocs:
+            doc = pendingDocs.pop()
+            if doc not in newDocs and doc not in attachedDocs:
+                newDocs.add(doc)
+                pendingDocs.extend(doc.referencesDocument.keys())
+        if newDocs:
+            self.attachDocuments(modelXbrl, newDocs)
+            for doc in newDocs:
+                attachedDocs[doc] = len(doc.modelObjects)
+        return sharedDoc
+
+    def attachDocuments(self, modelXbrl, docs):
+        sharedXbrl = self.modelXbrl
+        for docUrl, doc in sharedXbrl.urlDocs.items():
+            if doc in docs:
+                modelXbrl.urlDocs[docUrl] = doc
+        for ns, nsDocs in sharedXbrl.namespaceDocs.items():
+            modelXbrl.namespaceDocs[ns].extend(doc for doc in nsDocs if doc in docs)
+        for indexName in sharedObjectIndexes:
+            index = getattr(modelXbrl, indexName)
+            for key, modelObject in getattr(sharedXbrl, indexName).items():
+                if modelObject.modelDocument in docs and key not in index:
+                    index[key] = modelObject
+        for indexName in sharedListIndexes:
+            index = getattr(modelXbrl, indexName)
+            for key, modelObjects in getattr(sharedXbrl, indexName).items():
+                attachedObjects = [modelObject for modelObject in modelObjects if modelObject.modelDocument in docs]
+                if attachedObjects:
+                    index[key].extend(attachedObjects)
+        for indexName in sharedSetIndexes:
+            getattr(modelXbrl, indexName).update(modelObject
+                                                 for modelObject in getattr(sharedXbrl, indexName)
+                                                 if modelObject.modelDocument in docs)
+        for doc in docs:
+            langs, labelroles = self.labelLangsRoles(doc)
+            modelXbrl.langs |= langs
+            modelXbrl.labelroles |= labelroles
+        if any(doc.targetNamespace == XbrlConst.xbrldt for doc in docs):
+            modelXbrl.hasXDT = True
+        if any(baseSetKey[0] == "Table-rendering" for baseSetKey in modelXbrl.baseSets.keys()):
+            modelXbrl.hasTableRendering = True
+        if modelXbrl.modelVariableSets:
+            modelXbrl.hasFormulae = True
+
+    def labelLangsRoles(self, doc):
+        try:
+            return self.docLabelLangsRoles[doc]
+        except KeyError:
+            from arelle.ModelDtsObject import ModelResource
+            langs = set()
+            labelroles = set()
+            for modelObject in doc.modelObjects:
+                if isinstance(modelObject, ModelResource):
+                    if modelObject.xmlLang:
+                        langs.add(modelObject.xmlLang)
+                    if modelObject.localName == "label":
+                        labelroles.add(modelObject.role)
+            self.docLabelLangsRoles[doc] = langs, labelroles
+            return langs, labelroles
+
+    def detach(self, modelXbrl):
+        """Removes shared documents from a closing modelXbrl, and restores shared documents to their
+        state before being attached
+
+        :param modelXbrl: modelXbrl being closed
+        :type modelXbrl: ModelXbrl
+        """
+        with self.lock:
+            self._detach(modelXbrl)
+
+    def _detach(self, modelXbrl):
+        from arelle.ModelDtsObject import ModelRelationship
+        sharedDocs = getattr(modelXbrl, "sharedDocuments", None)
+        if not sharedDocs:
+            return
+        for docUrl, doc in list(modelXbrl.urlDocs.items()):
+            if doc in sharedDocs:
+                del modelXbrl.urlDocs[docUrl]
+        # relationships resolved for the attached modelXbrl are initialized into their link's shared modelDocument,
+        # their slots in the shared modelObjects are emptied so remaining objects keep their objectIndex position
+        sharedObjects = self.modelXbrl.modelObjects
+        for i in range(modelXbrl.sharedObjectsCount, len(sharedObjects)):
+            if isinstance(sharedObjects[i], ModelRelationship):
+                sharedObjects[i] = None
+        while sharedObjects and sharedObjects[-1] is None: # trailing slots may be reused
+            sharedObjects.pop()
+        for doc, objectsCount in sharedDocs.items():
+            # document modelObjects are in document order only (not addressed by position)
+            doc.modelObjects[objectsCount:] = [modelObject
+                                               for modelObject in doc.modelObjects[objectsCount:]
+                                               if not isinstance(modelObject, ModelRelationship)]
+            for id, modelObject in list(doc.idObjects.items()):
+                if isinstance(modelObject, ModelRelationship): # restore arc element registered by id
+                    doc.idObjects[id] = modelObject.arcElement
+        modelXbrl.sharedDocuments = {}
+
+    def close(self):
+        with self.lock:
+            self.docLabelLangsRoles.clear()
+            if self.modelXbrl is not None:
+                self.modelXbrl.close()
+                self.modelXbrl = None
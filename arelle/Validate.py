@@ -11,6 +11,7 @@ from arelle import (ModelXbrl, ModelVersReport, XbrlConst,
                ValidateInfoset, RenderingEvaluator, ViewFileRenderedGrid)
 from arelle.ModelDocument import Type, ModelDocumentReference, load as modelDocumentLoad
 from arelle.ModelValue import (qname, QName)
+from arelle import PluginManager
 from arelle.PluginManager import pluginClassMethods
 
 def validate(modelXbrl):
@@ -59,11 +60,27 @@ class Validate:
                 _("Validation skipped, document not successfully loaded: %(file)s"),
                 modelXbrl=self.modelXbrl, file=self.modelXbrl.modelDocument.basename)
         elif self.modelXbrl.modelDocument.type in (Type.TESTCASESINDEX, Type.REGISTRY):
-            for doc in sorted(self.modelXbrl.modelDocument.referencesDocument.keys(), key=lambda doc: doc.uri):
-                self.validateTestcase(doc)  # testcases doc's are sorted by their uri (file names), e.g., for formula
+            self.loadPriorTestResults()
+            testcases = sorted(self.modelXbrl.modelDocument.referencesDocument.keys(), key=lambda doc: doc.uri)
+            if (self.modelXbrl.modelManager.testcaseWorkers or 1) > 1:
+                try:
+                    self.validateTestcasesInWorkers(testcases)
+                except Exception as err:
+                    self.modelXbrl.error("exception",
+                        _("Testcases index validation exception: %(error)s, testcases index: %(testcasesIndex)s"),
+                        modelXbrl=self.modelXbrl,
+                        testcasesIndex=self.modelXbrl.modelDocument.basename, error=err,
+                        exc_info=True)
+            else:
+                for doc in testcases:
+                    self.validateTestcase(doc)  # testcases doc's are sorted by their uri (file names), e.g., for formula
         elif self.modelXbrl.modelDocument.type in (Type.TESTCASE, Type.REGISTRYTESTCASE):
+            self.loadPriorTestResults()
             try:
-                self.validateTestcase(self.modelXbrl.modelDocument)
+                if (self.modelXbrl.modelManager.testcaseWorkers or 1) > 1:
+                    self.validateTestcasesInWorkers([self.modelXbrl.modelDocument])
+                else:
+                    self.validateTestcase(self.modelXbrl.modelDocument)
             except Exception as err:
                 self.modelXbrl.error("exception",
                     _("Testcase validation exception: %(error)s, testcase: %(testcase)s"),
@@ -98,219 +115,337 @@ class Validate:
         
     def validateRssFeed(self):
         self.modelXbrl.info("info", "RSS Feed", modelDocument=self.modelXbrl)
+        if (self.modelXbrl.modelManager.rssItemWorkers or 1) > 1 and len(self.modelXbrl.modelDocument.rssItems) > 1:
+            self.validateRssItemsInWorkers()
+        else:
+            for rssItem in self.modelXbrl.modelDocument.rssItems:
+                self.validateRssItem(rssItem)
+            
+    def validateRssItem(self, rssItem):
         from arelle.FileSource import openFileSource
-        for rssItem in self.modelXbrl.modelDocument.rssItems:
-            self.modelXbrl.info("info", _("RSS Item %(accessionNumber)s %(formType)s %(companyName)s %(period)s"),
-                modelObject=rssItem, accessionNumber=rssItem.accessionNumber, formType=rssItem.formType, companyName=rssItem.companyName, period=rssItem.period)
-            modelXbrl = None
-            try:
-                modelXbrl = ModelXbrl.load(self.modelXbrl.modelManager, 
-                                           openFileSource(rssItem.zippedUrl, self.modelXbrl.modelManager.cntlr),
-                                           _("validating"))
-                self.instValidator.validate(modelXbrl, self.modelXbrl.modelManager.formulaOptions.typedParameters())
-                self.instValidator.close()
-                rssItem.setResults(modelXbrl)
-                self.modelXbrl.modelManager.viewModelObject(self.modelXbrl, rssItem.objectId())
-                for pluginXbrlMethod in pluginClassMethods("Validate.RssItem"):
-                    pluginXbrlMethod(self, modelXbrl, rssItem)
-                modelXbrl.close()
-                del modelXbrl  # completely dereference
-            except Exception as err:
-                self.modelXbrl.error("exception",
-                    _("RSS item validation exception: %(error)s, instance: %(instance)s"),
-                    modelXbrl=(self.modelXbrl, modelXbrl),
-                    instance=rssItem.zippedUrl, error=err,
-                    exc_info=True)
+        self.modelXbrl.info("info", _("RSS Item %(accessionNumber)s %(formType)s %(companyName)s %(period)s"),
+            modelObject=rssItem, accessionNumber=rssItem.accessionNumber, formType=rssItem.formType, companyName=rssItem.companyName, period=rssItem.period)
+        modelXbrl = None
+        try:
+            modelXbrl = ModelXbrl.load(self.modelXbrl.modelManager, 
+                                       openFileSource(rssItem.zippedUrl, self.modelXbrl.modelManager.cntlr),
+                                       _("validating"))
+            self.instValidator.validate(modelXbrl, self.modelXbrl.modelManager.formulaOptions.typedParameters())
+            self.instValidator.close()
+            rssItem.setResults(modelXbrl)
+            self.modelXbrl.modelManager.viewModelObject(self.modelXbrl, rssItem.objectId())
+            for pluginXbrlMethod in pluginClassMethods("Validate.RssItem"):
+                pluginXbrlMethod(self, modelXbrl, rssItem)
+            modelXbrl.close()
+            del modelXbrl  # completely dereference
+        except Exception as err:
+            self.modelXbrl.error("exception",
+                _("RSS item validation exception: %(error)s, instance: %(instance)s"),
+                modelXbrl=(self.modelXbrl, modelXbrl),
+                instance=rssItem.zippedUrl, error=err,
+                exc_info=True)
+                
+    def validateRssItemsInWorkers(self):
+        """Validates the items of an RSS feed in a pool of worker processes, each of which loads the
+        feed once, and then loads and validates its items (performing their Validate.RssItem plug-in 
+        actions, such as storing into a database, on a connection kept by the worker for its items).
+        Results are set on the items here, and their log entries logged, in item order.
+        
+        Attributes of the feed model needed by the workers' plug-in actions are provided by plug-in
+        methods of Validate.RssItem.WorkerAttributes, returning a dict of attribute values.
+        """
+        import multiprocessing
+        from arelle import CntlrBatch
+        modelManager = self.modelXbrl.modelManager
+        cntlr = modelManager.cntlr
+        rssItems = self.modelXbrl.modelDocument.rssItems
+        numWorkers = max(1, min(modelManager.rssItemWorkers, len(rssItems)))
+        self.modelXbrl.info("info", _("Validating %(count)s RSS items in %(workers)s worker processes"),
+                            modelObject=self.modelXbrl, count=len(rssItems), workers=numWorkers)
+        rssFeedAttributes = {}
+        for pluginXbrlMethod in pluginClassMethods("Validate.RssItem.WorkerAttributes"):
+            rssFeedAttributes.update(pluginXbrlMethod(self, self.modelXbrl) or {})
+        pool = multiprocessing.Pool(numWorkers, initRssItemWorker, 
+                                    (validationWorkerSettings(modelManager), self.modelXbrl.modelDocument.uri, rssFeedAttributes))
+        try:
+            # imap returns results in task order, as each becomes available, while later tasks proceed
+            for rssItem, (status, results, assertions, assertionUnsuccessful, logEntries) in zip(
+                    rssItems, pool.imap(validateRssItemInWorker, 
+                                        [(rssItem.accessionNumber, rssItem.zippedUrl) for rssItem in rssItems])):
+                CntlrBatch.logWorkerEntries(cntlr, logEntries)
+                if results is not None:
+                    rssItem.status = status
+                    rssItem.results = results
+                    rssItem.assertions = assertions
+                    rssItem.assertionUnsuccessful = assertionUnsuccessful
+                    modelManager.viewModelObject(self.modelXbrl, rssItem.objectId())
+            pool.close()
+        except BaseException: # including KeyboardInterrupt, don't leave worker processes running
+            pool.terminate()
+            raise
+        finally:
+            pool.join()
 
     def validateTestcase(self, testcase):
         self.modelXbrl.info("info", "Testcase", modelDocument=testcase)
         self.modelXbrl.viewModelObject(testcase.objectId())
         if hasattr(testcase, "testcaseVariations"):
             for modelTestcaseVariation in testcase.testcaseVariations:
-                # update ui thread via modelManager (running in background here)
-                self.modelXbrl.modelManager.viewModelObject(self.modelXbrl, modelTestcaseVariation.objectId())
-                # is this a versioning report?
-                resultIsVersioningReport = modelTestcaseVariation.resultIsVersioningReport
-                resultIsXbrlInstance = modelTestcaseVariation.resultIsXbrlInstance
-                formulaOutputInstance = None
-                inputDTSes = defaultdict(list)
-                baseForElement = testcase.baseForElement(modelTestcaseVariation)
-                # try to load instance document
-                self.modelXbrl.info("info", _("Variation %(id)s %(name)s: %(expected)s - %(description)s"),
-                                    modelObject=modelTestcaseVariation, 
-                                    id=modelTestcaseVariation.id, 
-                                    name=modelTestcaseVariation.name, 
-                                    expected=modelTestcaseVariation.expected, 
-                                    description=modelTestcaseVariation.description)
-                errorCaptureLevel = modelTestcaseVariation.severityLevel # default is INCONSISTENCY
-                for readMeFirstUri in modelTestcaseVariation.readMeFirstUris:
-                    if isinstance(readMeFirstUri,tuple):
-                        # dtsName is for formula instances, but is from/to dts if versioning
-                        dtsName, readMeFirstUri = readMeFirstUri
-                    elif resultIsVersioningReport:
-                        if inputDTSes: dtsName = "to"
-                        else: dtsName = "from"
-                    else:
-                        dtsName = None
-                    if resultIsVersioningReport and dtsName: # build multi-schemaRef containing document
-                        if dtsName in inputDTSes:
-                            dtsName = inputDTSes[dtsName]
-                        else:
-                            modelXbrl = ModelXbrl.create(self.modelXbrl.modelManager, 
-                                         Type.DTSENTRIES,
-                                         self.modelXbrl.modelManager.cntlr.webCache.normalizeUrl(readMeFirstUri[:-4] + ".dts", baseForElement),
-                                         isEntry=True,
-                                         errorCaptureLevel=errorCaptureLevel)
-                        DTSdoc = modelXbrl.modelDocument
-                        DTSdoc.inDTS = True
-                        doc = modelDocumentLoad(modelXbrl, readMeFirstUri, base=baseForElement)
-                        if doc is not None:
-                            DTSdoc.referencesDocument[doc] = ModelDocumentReference("import", DTSdoc.xmlRootElement)  #fake import
-                            doc.inDTS = True
-                    else: # not a multi-schemaRef versioning report
-                        modelXbrl = ModelXbrl.load(self.modelXbrl.modelManager, 
-                                                   readMeFirstUri,
-                                                   _("validating"), 
-                                                   base=baseForElement,
-                                                   useFileSource=self.useFileSource,
-                                                   errorCaptureLevel=errorCaptureLevel)
-                    if modelXbrl.modelDocument is None:
-                        self.modelXbrl.error("arelle:notLoaded",
-                             _("Testcase %(id)s %(name)s document not loaded: %(file)s"),
-                             modelXbrl=testcase, id=modelTestcaseVariation.id, name=modelTestcaseVariation.name, file=os.path.basename(readMeFirstUri))
-                        modelXbrl.close()
-                        self.determineNotLoadedTestStatus(modelTestcaseVariation)
-                    elif resultIsVersioningReport:
-                        inputDTSes[dtsName] = modelXbrl
-                    elif modelXbrl.modelDocument.type == Type.VERSIONINGREPORT:
-                        ValidateVersReport.ValidateVersReport(self.modelXbrl).validate(modelXbrl)
-                        self.determineTestStatus(modelTestcaseVariation, modelXbrl)
-                        modelXbrl.close()
-                    elif testcase.type == Type.REGISTRYTESTCASE:
-                        self.instValidator.validate(modelXbrl)  # required to set up dimensions, etc
-                        self.instValidator.executeCallTest(modelXbrl, modelTestcaseVariation.id, 
-                                   modelTestcaseVariation.cfcnCall, modelTestcaseVariation.cfcnTest)
-                        self.determineTestStatus(modelTestcaseVariation, modelXbrl)
-                        self.instValidator.close()
-                        modelXbrl.close()
-                    else:
-                        inputDTSes[dtsName].append(modelXbrl)
-                if resultIsVersioningReport and modelXbrl.modelDocument:
-                    versReportFile = modelXbrl.modelManager.cntlr.webCache.normalizeUrl(
-                        modelTestcaseVariation.versioningReportUri, baseForElement)
-                    if os.path.exists(versReportFile): #validate existing
-                        modelVersReport = ModelXbrl.load(self.modelXbrl.modelManager, versReportFile, _("validating existing version report"))
-                        if modelVersReport and modelVersReport.modelDocument and modelVersReport.modelDocument.type == Type.VERSIONINGREPORT:
-                            ValidateVersReport.ValidateVersReport(self.modelXbrl).validate(modelVersReport)
-                            self.determineTestStatus(modelTestcaseVariation, modelVersReport)
-                            modelVersReport.close()
-                    elif len(inputDTSes) == 2:
-                        ModelVersReport.ModelVersReport(self.modelXbrl).diffDTSes(
-                              versReportFile, inputDTSes["from"], inputDTSes["to"])
-                        modelTestcaseVariation.status = "generated"
-                    else:
-                        self.modelXbrl.error("arelle:notLoaded",
-                             _("Testcase %(id)s %(name)s DTSes not loaded, unable to generate versioning report: %(file)s"),
-                             modelXbrl=testcase, id=modelTestcaseVariation.id, name=modelTestcaseVariation.name, file=os.path.basename(readMeFirstUri))
-                        modelTestcaseVariation.status = "failed"
-                    for inputDTS in inputDTSes.values():
-                        inputDTS.close()
-                    del inputDTSes # dereference
-                elif inputDTSes:
-                    # validate schema, linkbase, or instance
-                    modelXbrl = inputDTSes[None][0]
-                    for pluginXbrlMethod in pluginClassMethods("TestcaseVariation.Xbrl.Loaded"):
-                        pluginXbrlMethod(self.modelXbrl, modelXbrl)
-                    parameters = modelTestcaseVariation.parameters.copy()
-                    for dtsName, inputDTS in inputDTSes.items():  # input instances are also parameters
-                        if dtsName: # named instance
-                            parameters[dtsName] = (None, inputDTS) #inputDTS is a list of modelXbrl's (instance DTSes)
-                        elif len(inputDTS) > 1: # standard-input-instance with multiple instance documents
-                            parameters[XbrlConst.qnStandardInputInstance] = (None, inputDTS) # allow error detection in validateFormula
-                    if modelTestcaseVariation.resultIsTable:
-                        RenderingEvaluator.init(modelXbrl)
-                    self.instValidator.validate(modelXbrl, parameters)
-                    if modelTestcaseVariation.resultIsInfoset and self.modelXbrl.modelManager.validateInfoset:
-                        for pluginXbrlMethod in pluginClassMethods("Validate.Infoset"):
-                            pluginXbrlMethod(modelXbrl, modelTestcaseVariation.resultInfosetUri)
-                        infoset = ModelXbrl.load(self.modelXbrl.modelManager, 
-                                                 modelTestcaseVariation.resultInfosetUri,
-                                                   _("loading result infoset"), 
-                                                   base=baseForElement,
-                                                   useFileSource=self.useFileSource,
-                                                   errorCaptureLevel=errorCaptureLevel)
-                        if infoset.modelDocument is None:
-                            self.modelXbrl.error("arelle:notLoaded",
-                                _("Testcase %(id)s %(name)s result infoset not loaded: %(file)s"),
-                                modelXbrl=testcase, id=modelTestcaseVariation.id, name=modelTestcaseVariation.name, 
-                                file=os.path.basename(modelTestcaseVariation.resultXbrlInstance))
-                            modelTestcaseVariation.status = "result infoset not loadable"
-                        else:   # check infoset
-                            ValidateInfoset.validate(self.instValidator, modelXbrl, infoset)
-                        infoset.close()
-                    if modelTestcaseVariation.resultIsTable: # and self.modelXbrl.modelManager.validateInfoset:
-                        # diff (or generate) table infoset
-                        resultTableUri = modelXbrl.modelManager.cntlr.webCache.normalizeUrl(modelTestcaseVariation.resultTableUri, baseForElement)
-                        if not any(alternativeValidation(modelXbrl, resultTableUri)
-                                   for alternativeValidation in pluginClassMethods("Validate.TableInfoset")):
-                            ViewFileRenderedGrid.viewRenderedGrid(modelXbrl, resultTableUri, diffToFile=True)  # false to save infoset files
-                    self.determineTestStatus(modelTestcaseVariation, modelXbrl) # include infoset errors in status
-                    self.instValidator.close()
-                    if modelXbrl.formulaOutputInstance and self.noErrorCodes(modelTestcaseVariation.actual): 
-                        # if an output instance is created, and no string error codes, ignoring dict of assertion results, validate it
-                        modelXbrl.formulaOutputInstance.hasFormulae = False #  block formulae on output instance (so assertion of input is not lost)
-                        self.instValidator.validate(modelXbrl.formulaOutputInstance, modelTestcaseVariation.parameters)
-                        self.determineTestStatus(modelTestcaseVariation, modelXbrl.formulaOutputInstance)
-                        if self.noErrorCodes(modelTestcaseVariation.actual): # if still 'clean' pass it forward for comparison to expected result instance
-                            formulaOutputInstance = modelXbrl.formulaOutputInstance
-                            modelXbrl.formulaOutputInstance = None # prevent it from being closed now
-                        self.instValidator.close()
-                    for inputDTSlist in inputDTSes.values():
-                        for inputDTS in inputDTSlist:
-                            inputDTS.close()
-                    del inputDTSes # dereference
-                    if resultIsXbrlInstance and formulaOutputInstance and formulaOutputInstance.modelDocument:
-                        expectedInstance = ModelXbrl.load(self.modelXbrl.modelManager, 
-                                                   modelTestcaseVariation.resultXbrlInstanceUri,
-                                                   _("loading expected result XBRL instance"), 
-                                                   base=baseForElement,
-                                                   useFileSource=self.useFileSource,
-                                                   errorCaptureLevel=errorCaptureLevel)
-                        if expectedInstance.modelDocument is None:
-                            self.modelXbrl.error("arelle:notLoaded",
-                                _("Testcase %(id)s %(name)s expected result instance not loaded: %(file)s"),
-                                modelXbrl=testcase, id=modelTestcaseVariation.id, name=modelTestcaseVariation.name, 
-                                file=os.path.basename(modelTestcaseVariation.resultXbrlInstance))
-                            modelTestcaseVariation.status = "result not loadable"
-                        else:   # compare facts
-                            if len(expectedInstance.facts) != len(formulaOutputInstance.facts):
-                                formulaOutputInstance.error("formula:resultFactCounts",
-                                    _("Formula output %(countFacts)s facts, expected %(expectedFacts)s facts"),
-                                    modelXbrl=modelXbrl, countFacts=len(formulaOutputInstance.facts),
-                                         expectedFacts=len(expectedInstance.facts))
-                            else:
-                                for fact in expectedInstance.facts:
-                                    unmatchedFactsStack = []
-                                    if formulaOutputInstance.matchFact(fact, unmatchedFactsStack) is None:
-                                        if unmatchedFactsStack: # get missing nested tuple fact, if possible
-                                            missingFact = unmatchedFactsStack[-1]
-                                        else:
-                                            missingFact = fact
-                                        formulaOutputInstance.error("formula:expectedFactMissing",
-                                            _("Formula output missing expected fact %(fact)s"),
-                                            modelXbrl=missingFact, fact=missingFact.qname)
-                            # for debugging uncomment next line to save generated instance document
-                            # formulaOutputInstance.saveInstance(r"c:\temp\test-out-inst.xml")
-                        expectedInstance.close()
-                        del expectedInstance # dereference
-                        self.determineTestStatus(modelTestcaseVariation, formulaOutputInstance)
-                        formulaOutputInstance.close()
-                        del formulaOutputInstance
-                # update ui thread via modelManager (running in background here)
-                self.modelXbrl.modelManager.viewModelObject(self.modelXbrl, modelTestcaseVariation.objectId())
-                    
+                if not self.priorTestResultPassed(testcase, modelTestcaseVariation):
+                    self.validateTestcaseVariation(testcase, modelTestcaseVariation)
             self.modelXbrl.modelManager.showStatus(_("ready"), 2000)
             
+    def validateTestcasesInWorkers(self, testcases):
+        """Validates the variations of testcases in a pool of worker processes, each of which loads
+        the variation's testcase and validates the variation, returning its status, actual results,
+        and log entries.  Results are set on the variations here, and their log entries logged, in 
+        variation order, so that log and test report are as if validated in this process.
+        """
+        import multiprocessing
+        from arelle import CntlrBatch
+        modelManager = self.modelXbrl.modelManager
+        cntlr = modelManager.cntlr
+        tasks = []
+        taskVariations = set()
+        for testcase in testcases:
+            for i, modelTestcaseVariation in enumerate(getattr(testcase, "testcaseVariations", ())):
+                if not self.priorTestResultPassed(testcase, modelTestcaseVariation):
+                    tasks.append((testcase.uri, i))
+                    taskVariations.add(modelTestcaseVariation)
+        numWorkers = max(1, min(modelManager.testcaseWorkers, len(tasks)))
+        self.modelXbrl.info("info", _("Validating %(count)s testcase variations in %(workers)s worker processes"),
+                            modelObject=self.modelXbrl, count=len(tasks), workers=numWorkers)
+        pool = multiprocessing.Pool(numWorkers, initValidationWorker, (validationWorkerSettings(modelManager),))
+        try:
+            # imap returns results in task order, as each becomes available, while later tasks proceed
+            results = pool.imap(validateTestcaseVariationInWorker, tasks)
+            for testcase in testcases:
+                self.modelXbrl.info("info", "Testcase", modelDocument=testcase)
+                self.modelXbrl.viewModelObject(testcase.objectId())
+                for modelTestcaseVariation in getattr(testcase, "testcaseVariations", ()):
+                    if modelTestcaseVariation not in taskVariations: # passed in prior test report
+                        continue
+                    status, actual, assertions, logEntries = next(results)
+                    CntlrBatch.logWorkerEntries(cntlr, logEntries)
+                    modelTestcaseVariation.status = status
+                    modelTestcaseVariation.actual = actual
+                    modelTestcaseVariation.assertions = assertions
+                    modelManager.viewModelObject(self.modelXbrl, modelTestcaseVariation.objectId())
+            pool.close()
+        except BaseException: # including KeyboardInterrupt, don't leave worker processes running
+            pool.terminate()
+            raise
+        finally:
+            pool.join()
+        modelManager.showStatus(_("ready"), 2000)
+        
+    def loadPriorTestResults(self):
+        rerunFailuresReport = self.modelXbrl.modelManager.testcaseRerunFailures
+        if rerunFailuresReport:
+            from arelle.ViewFileTests import priorTestResults
+            self.priorTestResults = priorTestResults(self.modelXbrl, rerunFailuresReport)
+        else:
+            self.priorTestResults = {}
+        
+    def priorTestResultPassed(self, testcase, modelTestcaseVariation):
+        """If the variation passed in the prior test report, being rerun for failures only, sets its 
+        status and actual results from that report and returns True.
+        """
+        priorTestResults = getattr(self, "priorTestResults", None)
+        if not priorTestResults:
+            return False
+        from arelle.ViewFileTests import testcaseReportUri
+        priorResult = priorTestResults.get(
+                            (testcaseReportUri(self.modelXbrl, testcase), modelTestcaseVariation.id or modelTestcaseVariation.name))
+        if priorResult is not None and priorResult[0] == "pass":
+            modelTestcaseVariation.status, actual = priorResult
+            modelTestcaseVariation.actual = [actual] if actual else []
+            return True
+        return False
+            
+    def validateTestcaseVariation(self, testcase, modelTestcaseVariation):
+        # update ui thread via modelManager (running in background here)
+        self.modelXbrl.modelManager.viewModelObject(self.modelXbrl, modelTestcaseVariation.objectId())
+        # is this a versioning report?
+        resultIsVersioningReport = modelTestcaseVariation.resultIsVersioningReport
+        resultIsXbrlInstance = modelTestcaseVariation.resultIsXbrlInstance
+        formulaOutputInstance = None
+        inputDTSes = defaultdict(list)
+        baseForElement = testcase.baseForElement(modelTestcaseVariation)
+        # try to load instance document
+        self.modelXbrl.info("info", _("Variation %(id)s %(name)s: %(expected)s - %(description)s"),
+                            modelObject=modelTestcaseVariation, 
+                            id=modelTestcaseVariation.id, 
+                            name=modelTestcaseVariation.name, 
+                            expected=modelTestcaseVariation.expected, 
+                            description=modelTestcaseVariation.description)
+        errorCaptureLevel = modelTestcaseVariation.severityLevel # default is INCONSISTENCY
+        for readMeFirstUri in modelTestcaseVariation.readMeFirstUris:
+            if isinstance(readMeFirstUri,tuple):
+                # dtsName is for formula instances, but is from/to dts if versioning
+                dtsName, readMeFirstUri = readMeFirstUri
+            elif resultIsVersioningReport:
+                if inputDTSes: dtsName = "to"
+                else: dtsName = "from"
+            else:
+                dtsName = None
+            if resultIsVersioningReport and dtsName: # build multi-schemaRef containing document
+                if dtsName in inputDTSes:
+                    dtsName = inputDTSes[dtsName]
+                else:
+                    modelXbrl = ModelXbrl.create(self.modelXbrl.modelManager, 
+                                 Type.DTSENTRIES,
+                                 self.modelXbrl.modelManager.cntlr.webCache.normalizeUrl(readMeFirstUri[:-4] + ".dts", baseForElement),
+                                 isEntry=True,
+                                 errorCaptureLevel=errorCaptureLevel)
+                DTSdoc = modelXbrl.modelDocument
+                DTSdoc.inDTS = True
+                doc = modelDocumentLoad(modelXbrl, readMeFirstUri, base=baseForElement)
+                if doc is not None:
+                    DTSdoc.referencesDocument[doc] = ModelDocumentReference("import", DTSdoc.xmlRootElement)  #fake import
+                    doc.inDTS = True
+            else: # not a multi-schemaRef versioning report
+                modelXbrl = ModelXbrl.load(self.modelXbrl.modelManager, 
+                                           readMeFirstUri,
+                                           _("validating"), 
+                                           base=baseForElement,
+                                           useFileSource=self.useFileSource,
+                                           errorCaptureLevel=errorCaptureLevel)
+            if modelXbrl.modelDocument is None:
+                self.modelXbrl.error("arelle:notLoaded",
+                     _("Testcase %(id)s %(name)s document not loaded: %(file)s"),
+                     modelXbrl=testcase, id=modelTestcaseVariation.id, name=modelTestcaseVariation.name, file=os.path.basename(readMeFirstUri))
+                modelXbrl.close()
+                self.determineNotLoadedTestStatus(modelTestcaseVariation)
+            elif resultIsVersioningReport:
+                inputDTSes[dtsName] = modelXbrl
+            elif modelXbrl.modelDocument.type == Type.VERSIONINGREPORT:
+                ValidateVersReport.ValidateVersReport(self.modelXbrl).validate(modelXbrl)
+                self.determineTestStatus(modelTestcaseVariation, modelXbrl)
+                modelXbrl.close()
+            elif testcase.type == Type.REGISTRYTESTCASE:
+                self.instValidator.validate(modelXbrl)  # required to set up dimensions, etc
+                self.instValidator.executeCallTest(modelXbrl, modelTestcaseVariation.id, 
+                           modelTestcaseVariation.cfcnCall, modelTestcaseVariation.cfcnTest)
+                self.determineTestStatus(modelTestcaseVariation, modelXbrl)
+                self.instValidator.close()
+                modelXbrl.close()
+            else:
+                inputDTSes[dtsName].append(modelXbrl)
+        if resultIsVersioningReport and modelXbrl.modelDocument:
+            versReportFile = modelXbrl.modelManager.cntlr.webCache.normalizeUrl(
+                modelTestcaseVariation.versioningReportUri, baseForElement)
+            if os.path.exists(versReportFile): #validate existing
+                modelVersReport = ModelXbrl.load(self.modelXbrl.modelManager, versReportFile, _("validating existing version report"))
+                if modelVersReport and modelVersReport.modelDocument and modelVersReport.modelDocument.type == Type.VERSIONINGREPORT:
+                    ValidateVersReport.ValidateVersReport(self.modelXbrl).validate(modelVersReport)
+                    self.determineTestStatus(modelTestcaseVariation, modelVersReport)
+                    modelVersReport.close()
+            elif len(inputDTSes) == 2:
+                ModelVersReport.ModelVersReport(self.modelXbrl).diffDTSes(
+                      versReportFile, inputDTSes["from"], inputDTSes["to"])
+                modelTestcaseVariation.status = "generated"
+            else:
+                self.modelXbrl.error("arelle:notLoaded",
+                     _("Testcase %(id)s %(name)s DTSes not loaded, unable to generate versioning report: %(file)s"),
+                     modelXbrl=testcase, id=modelTestcaseVariation.id, name=modelTestcaseVariation.name, file=os.path.basename(readMeFirstUri))
+                modelTestcaseVariation.status = "failed"
+            for inputDTS in inputDTSes.values():
+                inputDTS.close()
+            del inputDTSes # dereference
+        elif inputDTSes:
+            # validate schema, linkbase, or instance
+            modelXbrl = inputDTSes[None][0]
+            for pluginXbrlMethod in pluginClassMethods("TestcaseVariation.Xbrl.Loaded"):
+                pluginXbrlMethod(self.modelXbrl, modelXbrl)
+            parameters = modelTestcaseVariation.parameters.copy()
+            for dtsName, inputDTS in inputDTSes.items():  # input instances are also parameters
+                if dtsName: # named instance
+                    parameters[dtsName] = (None, inputDTS) #inputDTS is a list of modelXbrl's (instance DTSes)
+                elif len(inputDTS) > 1: # standard-input-instance with multiple instance documents
+                    parameters[XbrlConst.qnStandardInputInstance] = (None, inputDTS) # allow error detection in validateFormula
+            if modelTestcaseVariation.resultIsTable:
+                RenderingEvaluator.init(modelXbrl)
+            self.instValidator.validate(modelXbrl, parameters)
+            if modelTestcaseVariation.resultIsInfoset and self.modelXbrl.modelManager.validateInfoset:
+                for pluginXbrlMethod in pluginClassMethods("Validate.Infoset"):
+                    pluginXbrlMethod(modelXbrl, modelTestcaseVariation.resultInfosetUri)
+                infoset = ModelXbrl.load(self.modelXbrl.modelManager, 
+                                         modelTestcaseVariation.resultInfosetUri,
+                                           _("loading result infoset"), 
+                                           base=baseForElement,
+                                           useFileSource=self.useFileSource,
+                                           errorCaptureLevel=errorCaptureLevel)
+                if infoset.modelDocument is None:
+                    self.modelXbrl.error("arelle:notLoaded",
+                        _("Testcase %(id)s %(name)s result infoset not loaded: %(file)s"),
+                        modelXbrl=testcase, id=modelTestcaseVariation.id, name=modelTestcaseVariation.name, 
+                        file=os.path.basename(modelTestcaseVariation.resultXbrlInstance))
+                    modelTestcaseVariation.status = "result infoset not loadable"
+                else:   # check infoset
+                    ValidateInfoset.validate(self.instValidator, modelXbrl, infoset)
+                infoset.close()
+            if modelTestcaseVariation.resultIsTable: # and self.modelXbrl.modelManager.validateInfoset:
+                # diff (or generate) table infoset
+                resultTableUri = modelXbrl.modelManager.cntlr.webCache.normalizeUrl(modelTestcaseVariation.resultTableUri, baseForElement)
+                if not any(alternativeValidation(modelXbrl, resultTableUri)
+                           for alternativeValidation in pluginClassMethods("Validate.TableInfoset")):
+                    ViewFileRenderedGrid.viewRenderedGrid(modelXbrl, resultTableUri, diffToFile=True)  # false to save infoset files
+            self.determineTestStatus(modelTestcaseVariation, modelXbrl) # include infoset errors in status
+            self.instValidator.close()
+            if modelXbrl.formulaOutputInstance and self.noErrorCodes(modelTestcaseVariation.actual): 
+                # if an output instance is created, and no string error codes, ignoring dict of assertion results, validate it
+                modelXbrl.formulaOutputInstance.hasFormulae = False #  block formulae on output instance (so assertion of input is not lost)
+                self.instValidator.validate(modelXbrl.formulaOutputInstance, modelTestcaseVariation.parameters)
+                self.determineTestStatus(modelTestcaseVariation, modelXbrl.formulaOutputInstance)
+                if self.noErrorCodes(modelTestcaseVariation.actual): # if still 'clean' pass it forward for comparison to expected result instance
+                    formulaOutputInstance = modelXbrl.formulaOutputInstance
+                    modelXbrl.formulaOutputInstance = None # prevent it from being closed now
+                self.instValidator.close()
+            for inputDTSlist in inputDTSes.values():
+                for inputDTS in inputDTSlist:
+                    inputDTS.close()
+            del inputDTSes # dereference
+            if resultIsXbrlInstance and formulaOutputInstance and formulaOutputInstance.modelDocument:
+                expectedInstance = ModelXbrl.load(self.modelXbrl.modelManager, 
+                                           modelTestcaseVariation.resultXbrlInstanceUri,
+                                           _("loading expected result XBRL instance"), 
+                                           base=baseForElement,
+                                           useFileSource=self.useFileSource,
+                                           errorCaptureLevel=errorCaptureLevel)
+                if expectedInstance.modelDocument is None:
+                    self.modelXbrl.error("arelle:notLoaded",
+                        _("Testcase %(id)s %(name)s expected result instance not loaded: %(file)s"),
+                        modelXbrl=testcase, id=modelTestcaseVariation.id, name=modelTestcaseVariation.name, 
+                        file=os.path.basename(modelTestcaseVariation.resultXbrlInstance))
+                    modelTestcaseVariation.status = "result not loadable"
+                else:   # compare facts
+                    if len(expectedInstance.facts) != len(formulaOutputInstance.facts):
+                        formulaOutputInstance.error("formula:resultFactCounts",
+                            _("Formula output %(countFacts)s facts, expected %(expectedFacts)s facts"),
+                            modelXbrl=modelXbrl, countFacts=len(formulaOutputInstance.facts),
+                                 expectedFacts=len(expectedInstance.facts))
+                    else:
+                        for fact in expectedInstance.facts:
+                            unmatchedFactsStack = []
+                            if formulaOutputInstance.matchFact(fact, unmatchedFactsStack) is None:
+                                if unmatchedFactsStack: # get missing nested tuple fact, if possible
+                                    missingFact = unmatchedFactsStack[-1]
+                                else:
+                                    missingFact = fact
+                                formulaOutputInstance.error("formula:expectedFactMissing",
+                                    _("Formula output missing expected fact %(fact)s"),
+                                    modelXbrl=missingFact, fact=missingFact.qname)
+                    # for debugging uncomment next line to save generated instance document
+                    # formulaOutputInstance.saveInstance(r"c:\temp\test-out-inst.xml")
+                expectedInstance.close()
+                del expectedInstance # dereference
+                self.determineTestStatus(modelTestcaseVariation, formulaOutputInstance)
+                formulaOutputInstance.close()
+                del formulaOutputInstance
+        # update ui thread via modelManager (running in background here)
+        self.modelXbrl.modelManager.viewModelObject(self.modelXbrl, modelTestcaseVariation.objectId())
+            
     def noErrorCodes(self, modelTestcaseVariation):
         return not any(not isinstance(actual,dict) for actual in modelTestcaseVariation)
                 
@@ -384,6 +519,147 @@ class Validate:
             status = "pass"
         modelTestcaseVariation.status = status
                 
+def validationWorkerSettings(modelManager):
+    """Returns the validation, web cache and caching settings of modelManager, for testcase and RSS item
+    worker processes to be set up as this process"""
+    cntlr = modelManager.cntlr
+    logger = cntlr.logger
+    webCache = cntlr.webCache
+    return {"disclosureSystem": modelManager.disclosureSystem.name if modelManager.validateDisclosureSystem else None,
+            "utrUrl": modelManager.disclosureSystem.utrUrl,
+            "validateCalcLB": modelManager.validateCalcLB,
+            "validateInferDecimals": modelManager.validateInferDecimals,
+            "validateCalcsByNetwork": modelManager.validateCalcsByNetwork,
+            "validateInfoset": modelManager.validateInfoset,
+            "validateUtr": modelManager.validateUtr,
+            "abortOnMajorError": modelManager.abortOnMajorError,
+            "formulaOptions": modelManager.formulaOptions,
+            "workOffline": webCache.workOffline,
+            "webCacheTimeout": webCache._timeout,
+            "webCacheMaxAgeSeconds": webCache.maxAgeSeconds,
+            "prefetchThreads": webCache.prefetchThreads,
+            "proxySettings": cntlr.config.get("proxySettings"),
+            "username": getattr(cntlr, "username", None),
+            "password": getattr(cntlr, "password", None),
+            "xpathProgCache": modelManager.xpathProgCache is not None,
+            "dtsClosureCache": modelManager.dtsClosureCache is not None,
+            "sharedTaxonomies": modelManager.sharedTaxonomies is not None,
+            "pluginConfig": PluginManager.pluginConfig,
+            "logLevel": logging.getLevelName(logger.level) if logger is not None else None,
+            "messageCodeFilter": getattr(logger, "messageCodeFilter", None),
+            "messageLevelFilter": getattr(logger, "messageLevelFilter", None)}
+
+workerCntlr = None # controller of a testcase or RSS item worker process
+workerTestcase = None # (uri, modelXbrl, Validate) of testcase last loaded by a worker process
+workerRssFeed = None # (modelXbrl, Validate) of RSS feed loaded by an RSS item worker process
+
+def initValidationWorker(settings):
+    """Testcase and RSS item worker process initializer, sets up the worker's controller per the main process's settings"""
+    global workerCntlr
+    from arelle import CntlrBatch
+    workerCntlr = cntlr = CntlrBatch.startWorkerCntlr(settings["logLevel"])
+    modelManager = cntlr.modelManager
+    if settings["disclosureSystem"]:
+        modelManager.validateDisclosureSystem = True
+        modelManager.disclosureSystem.select(settings["disclosureSystem"])
+    else:
+        modelManager.validateDisclosureSystem = False
+        modelManager.disclosureSystem.select(None) # just load ordinary mappings
+    modelManager.disclosureSystem.utrUrl = settings["utrUrl"]
+    for name in ("validateCalcLB", "validateInferDecimals", "validateCalcsByNetwork", "validateInfoset", "validateUtr", 
+                 "abortOnMajorError", "formulaOptions"):
+        setattr(modelManager, name, settings[name])
+    webCache = cntlr.webCache
+    webCache.workOffline = settings["workOffline"]
+    webCache.timeout = settings["webCacheTimeout"]
+    webCache.maxAgeSeconds = settings["webCacheMaxAgeSeconds"]
+    webCache.prefetchThreads = settings["prefetchThreads"]
+    if settings["proxySettings"] is not None:
+        webCache.resetProxies(settings["proxySettings"])
+    cntlr.username = settings["username"]
+    cntlr.password = settings["password"]
+    if settings["xpathProgCache"]:
+        from arelle.XPathProgCache import XPathProgCache
+        modelManager.xpathProgCache = XPathProgCache(modelManager)
+    if settings["dtsClosureCache"]:
+        from arelle.DtsClosureCache import DtsClosureCache
+        modelManager.dtsClosureCache = DtsClosureCache(modelManager)
+    if settings["sharedTaxonomies"]:
+        from arelle.SharedTaxonomies import SharedTaxonomies
+        modelManager.sharedTaxonomies = SharedTaxonomies(modelManager)
+    # plug-ins of the main process (including those activated for its command line) are loaded when used
+    PluginManager.pluginConfig = settings["pluginConfig"]
+    PluginManager.reset()
+    cntlr.logger.messageCodeFilter = settings["messageCodeFilter"]
+    cntlr.logger.messageLevelFilter = settings["messageLevelFilter"]
+
+def validateTestcaseVariationInWorker(task):
+    """Validates one testcase variation in a worker process, keeping its testcase loaded for the
+    worker's next variations of the same testcase
+
+    :returns: tuple -- (status, actual, assertions, [(level, messageCode, message, refs)])
+    """
+    global workerTestcase
+    from arelle import CntlrBatch
+    testcaseUri, variationIndex = task
+    if workerTestcase is None or workerTestcase[0] != testcaseUri:
+        if workerTestcase is not None:
+            workerTestcase[2].close()
+            workerTestcase[1].close()
+        testcaseXbrl = ModelXbrl.load(workerCntlr.modelManager, testcaseUri, _("validating"))
+        workerTestcase = (testcaseUri, testcaseXbrl, Validate(testcaseXbrl))
+    testcaseXbrl, validate = workerTestcase[1:]
+    status, actual, assertions = "not loadable", [], None
+    testcase = testcaseXbrl.modelDocument
+    if testcase is not None and variationIndex < len(getattr(testcase, "testcaseVariations", ())):
+        modelTestcaseVariation = testcase.testcaseVariations[variationIndex]
+        try:
+            validate.validateTestcaseVariation(testcase, modelTestcaseVariation)
+        except Exception as err:
+            testcaseXbrl.error("exception",
+                _("Testcase validation exception: %(error)s, testcase: %(testcase)s"),
+                modelXbrl=testcaseXbrl,
+                testcase=testcase.basename, error=err,
+                exc_info=True)
+            modelTestcaseVariation.status = "fail"
+        status, actual, assertions = (modelTestcaseVariation.status, modelTestcaseVariation.actual, 
+                                      modelTestcaseVariation.assertions)
+    return (status, actual, assertions, CntlrBatch.workerLogEntries(workerCntlr))
+
+def initRssItemWorker(settings, rssFeedUri, rssFeedAttributes):
+    """RSS item worker process initializer, sets up the worker's controller per the main process's
+    settings and loads the RSS feed, with the attributes of the main process's feed model for plug-ins"""
+    global workerRssFeed
+    initValidationWorker(settings)
+    rssFeedXbrl = ModelXbrl.load(workerCntlr.modelManager, rssFeedUri, _("validating"))
+    for name, value in rssFeedAttributes.items():
+        setattr(rssFeedXbrl, name, value)
+    # the feed may have changed since loaded by the main process, items are found by their identity
+    rssItems = dict(((rssItem.accessionNumber, rssItem.zippedUrl), rssItem)
+                    for rssItem in getattr(rssFeedXbrl.modelDocument, "rssItems", ()))
+    workerRssFeed = (rssFeedXbrl, Validate(rssFeedXbrl), rssItems)
+
+def validateRssItemInWorker(rssItemKey):
+    """Validates one RSS item in a worker process
+
+    :param rssItemKey: (accessionNumber, zippedUrl) of the item
+    :type rssItemKey: tuple
+    :returns: tuple -- (status, results, assertions, assertionUnsuccessful, [(level, messageCode, message, refs)]),
+    results is None if the item was not validated
+    """
+    from arelle import CntlrBatch
+    rssFeedXbrl, validate, rssItems = workerRssFeed
+    rssItem = rssItems.get(rssItemKey)
+    if rssItem is None:
+        accessionNumber, zippedUrl = rssItemKey
+        rssFeedXbrl.error("arelle:rssItemNotFound",
+            _("RSS item %(accessionNumber)s not found in the feed as loaded by the worker process, instance: %(instance)s"),
+            modelXbrl=rssFeedXbrl, accessionNumber=accessionNumber, instance=zippedUrl)
+        return (None, None, None, False, CntlrBatch.workerLogEntries(workerCntlr))
+    validate.validateRssItem(rssItem)
+    return (rssItem.status, rssItem.results, rssItem.assertions, getattr(rssItem, "assertionUnsuccessful", False),
+            CntlrBatch.workerLogEntries(workerCntlr))
+
 import logging
 class ValidationLogListener(logging.Handler):
     def __init__(self, logView):
@@ -6,8 +6,8 @@ Created on Oct 17, 2010
 '''
 #import xml.sax, xml.sax.handler
 from lxml.etree import XML, DTD, SubElement, XMLSyntaxError
-import os, re, io
-from arelle import XbrlConst
+import os, re, io, mmap
+from arelle import XbrlConst, XmlUtil
 from arelle.ModelObject import ModelObject
 
 XMLdeclaration = re.compile(r"<\?xml.*\?>", re.DOTALL)
@@ -15,6 +15,8 @@ XMLpattern = re.compile(r".*(<|&lt;|&#x3C;|&#60;)[A-Za-z_]+[A-Za-z0-9_:]*[^>]*(/
 CDATApattern = re.compile(r"<!\[CDATA\[(.+)\]\]")
 #EFM table 5-1 and all &xxx; patterns
 docCheckPattern = re.compile(r"&\w+;|[^0-9A-Za-z`~!@#$%&\*\(\)\.\-+ \[\]\{\}\|\\:;\"'<>,_?/=\t\n\r\m\f]") # won't match &#nnn;
+# docCheckPattern for the bytes of ascii-compatible encodings, matching runs of non-ascii bytes (to be decoded)
+docCheckBytesPattern = re.compile(br"&\w+;|[\x80-\xff]+|[^0-9A-Za-z`~!@#$%&\*\(\)\.\-+ \[\]\{\}\|\\:;\"'<>,_?/=\t\n\r\f]")
 namedEntityPattern = re.compile("&[_A-Za-z\xC0-\xD6\xD8-\xF6\xF8-\xFF\u0100-\u02FF\u0370-\u037D\u037F-\u1FFF\u200C-\u200D\u2070-\u218F\u2C00-\u2FEF\u3001-\uD7FF\uF900-\uFDCF\uFDF0-\uFFFD]"
                                 r"[_\-\.:" 
                                 "\xB7A-Za-z0-9\xC0-\xD6\xD8-\xF6\xF8-\xFF\u0100-\u02FF\u0370-\u037D\u037F-\u1FFF\u200C-\u200D\u2070-\u218F\u2C00-\u2FEF\u3001-\uD7FF\uF900-\uFDCF\uFDF0-\uFFFD\u0300-\u036F\u203F-\u2040]*;")
@@ -382,43 +384,71 @@ xhtmlEntities = {
     }
 
 def checkfile(modelXbrl, filepath):
-    result = []
+    # checks for disallowed characters and entity codes in one pass over the file bytes (memory mapped if a
+    # local file), returning the unchanged bytes as file to parse (lxml decodes per the xml declaration)
+    stream = modelXbrl.fileSource.file(filepath, binary=True)[0]
+    if isinstance(stream, io.BytesIO): # archive member or server cached file, already in memory
+        file = stream
+        fileBytes = stream.getvalue()
+    else:
+        try:
+            fileBytes = file = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+        except (AttributeError, EnvironmentError, ValueError, io.UnsupportedOperation): # empty or not a local file
+            fileBytes = stream.read()
+            file = io.BytesIO(fileBytes)
+        stream.close() # mapping remains valid after closing the file
+    encoding = XmlUtil.encoding(fileBytes[0:120])
+    if encoding.lower().replace("-","").replace("_","") in ("utf16", "utf32"): # not ascii-compatible
+        text = fileBytes[:].decode(encoding)
+        pattern = docCheckPattern
+        newline = "\n"
+        start = 0
+    else:
+        text = fileBytes
+        pattern = docCheckBytesPattern
+        newline = b"\n"
+        start = 3 if fileBytes[0:3] == b'\xef\xbb\xbf' else 0 # byte order mark isn't checked
     lineNum = 1
-    foundXmlDeclaration = False
-    file, encoding = modelXbrl.fileSource.file(filepath)
-    with file as f:
-        while True:
-            line = f.readline()
-            if line == "":
-                break;
-            # check for disallowed characters or entity codes
-            for match in docCheckPattern.finditer(line):
-                text = match.group()
-                if text.startswith("&"):
-                    if not text in xhtmlEntities:
-                        modelXbrl.error(("EFM.5.02.02.06", "GFM.1.01.02"),
-                            _("Disallowed entity code %(text)s in file %(file)s line %(line)s column %(column)s"),
-                            modelDocument=filepath, text=text, file=os.path.basename(filepath), line=lineNum, column=match.start())
-                elif modelXbrl.modelManager.disclosureSystem.EFM:
-                    modelXbrl.error("EFM.5.02.01.01",
-                        _("Disallowed character '%(text)s' in file %(file)s at line %(line)s col %(column)s"),
-                        modelDocument=filepath, text=text, file=os.path.basename(filepath), line=lineNum, column=match.start())
-            if lineNum == 1:
-                xmlDeclarationMatch = XMLdeclaration.search(line)
-                if xmlDeclarationMatch: # remove it for lxml
-                    start,end = xmlDeclarationMatch.span()
-                    line = line[0:start] + line[end:]
-                    foundXmlDeclaration = True
-            result.append(line)
-            lineNum += 1
-    result = ''.join(result)
-    if not foundXmlDeclaration: # may be multiline, try again
-        xmlDeclarationMatch = XMLdeclaration.search(result)
+    lineStart = 0
+    lineCountedTo = 0 # line and column are advanced from the prior match, over the text between matches
+    column = 0
+    for match in pattern.finditer(text, start):
+        matchStart = match.start()
+        priorText = text[lineCountedTo:matchStart] # (mmap has no count)
+        newlines = priorText.count(newline)
+        if newlines:
+            lineNum += newlines
+            lineStart = lineCountedTo + priorText.rfind(newline) + 1
+            priorText = text[lineStart:matchStart]
+            column = 0
+        lineCountedTo = matchStart
+        matchText = match.group()
+        if pattern is docCheckBytesPattern:
+            # column in characters, as in decoded line
+            column += len(priorText.decode(encoding, "replace"))
+            matchText = matchText.decode(encoding, "replace")
+        else:
+            column = matchStart - lineStart
+        if matchText.startswith("&"):
+            if not matchText in xhtmlEntities:
+                modelXbrl.error(("EFM.5.02.02.06", "GFM.1.01.02"),
+                    _("Disallowed entity code %(text)s in file %(file)s line %(line)s column %(column)s"),
+                    modelDocument=filepath, text=matchText, file=os.path.basename(filepath), line=lineNum, column=column)
+        elif modelXbrl.modelManager.disclosureSystem.EFM:
+            for i, char in enumerate(matchText): # each non-ascii character of a matched run
+                modelXbrl.error("EFM.5.02.01.01",
+                    _("Disallowed character '%(text)s' in file %(file)s at line %(line)s col %(column)s"),
+                    modelDocument=filepath, text=char, file=os.path.basename(filepath), line=lineNum, column=column + i)
+    if pattern is docCheckBytesPattern:
+        file.seek(0)
+    else: # parse decoded text without its encoding declaration
+        xmlDeclarationMatch = XMLdeclaration.search(text)
         if xmlDeclarationMatch: # remove it for lxml
             start,end = xmlDeclarationMatch.span()
-            result = result[0:start] + result[end:]
-            foundXmlDeclaration = True
-    return (io.StringIO(initial_value=result), encoding)
+            text = text[0:start] + text[end:]
+        file.close()
+        file = io.StringIO(initial_value=text)
+    return (file, encoding)
 
 def loadDTD(modelXbrl):
     global edbodyDTD
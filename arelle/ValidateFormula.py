@@ -671,6 +671,8 @@ def validate(val, xpathContext=None, parametersOnly=False, statusMsg='', compile
     val.modelXbrl.profileActivity("... instances scopes and setup", minTimeToShow=1.0)
 
     val.modelXbrl.profileStat(_("formulaValidation"))
+    if val.modelXbrl.modelManager.xpathProgCache is not None:
+        val.modelXbrl.modelManager.xpathProgCache.save()
     if (initialErrorCount < val.modelXbrl.logCount.get(logging.getLevelName('ERROR'), 0) or
         compileOnly or 
         getattr(val, "validateFormulaCompileOnly", False)):
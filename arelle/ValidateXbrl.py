@@ -61,6 +61,7 @@ class ValidateXbrl:
         self.validateXmlLang = self.validateDisclosureSystem and self.disclosureSystem.xmlLangPattern
         self.validateCalcLB = modelXbrl.modelManager.validateCalcLB
         self.validateInferDecimals = modelXbrl.modelManager.validateInferDecimals
+        self.validateCalcsByNetwork = modelXbrl.modelManager.validateCalcsByNetwork
         self.validateUTR = (modelXbrl.modelManager.validateUtr or
                             (self.parameters and self.parameters.get(qname("forceUtrValidation",noPrefixIsNoNamespace=True),(None,"false"))[1] == "true") or
                             (self.validateEFM and 
@@ -496,7 +497,7 @@ class ValidateXbrl:
         
         if self.validateCalcLB:
             modelXbrl.modelManager.showStatus(_("Validating instance calculations"))
-            ValidateXbrlCalcs.validate(modelXbrl, inferDecimals=self.validateInferDecimals)
+            ValidateXbrlCalcs.validate(modelXbrl, inferDecimals=self.validateInferDecimals, byNetwork=self.validateCalcsByNetwork)
             modelXbrl.profileStat(_("validateCalculations"))
             
         if self.validateUTR:
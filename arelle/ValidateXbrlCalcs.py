@@ -17,13 +17,17 @@ NaN = decimal.Decimal("NaN")
 floatNaN = float("NaN")
 floatINF = float("INF")
 
-def validate(modelXbrl, inferDecimals=False):
-    ValidateXbrlCalcs(modelXbrl, inferDecimals).validate()
+def validate(modelXbrl, inferDecimals=False, byNetwork=False):
+    ValidateXbrlCalcs(modelXbrl, inferDecimals, byNetwork).validate()
     
 class ValidateXbrlCalcs:
-    def __init__(self, modelXbrl, inferDecimals=False):
+    def __init__(self, modelXbrl, inferDecimals=False, byNetwork=False):
         self.modelXbrl = modelXbrl
         self.inferDecimals = inferDecimals
+        # byNetwork binds only the facts of each network's concepts, one network at a time, 
+        # releasing the bindings before the next network, instead of binding all facts up front
+        self.byNetwork = byNetwork
+        self.factAncestors = {} # byNetwork: tuple ancestors of facts nested in tuples
         self.mapContext = {}
         self.mapUnit = {}
         self.sumFacts = defaultdict(list)
@@ -37,6 +41,8 @@ class ValidateXbrlCalcs:
         self.conceptsInEssencesAlias = set()
         self.requiresElementFacts = defaultdict(list)
         self.conceptsInRequiresElement = set()
+        self.roundedFactValues = {} # rounded value by fact, each fact is rounded once
+        self.itemFactsSums = {} # by item calcKey, (rounded sum, non-duplicated facts, has duplicated facts)
         
     def validate(self):
         if not self.modelXbrl.contexts and not self.modelXbrl.facts:
@@ -82,8 +88,13 @@ class ValidateXbrlCalcs:
                             conceptsSet.add(concept)
         self.modelXbrl.profileActivity("... identify requires-element and esseance-aliased concepts", minTimeToShow=1.0)
 
-        self.bindFacts(self.modelXbrl.facts,[self.modelXbrl.modelDocument.xmlRootElement])
-        self.modelXbrl.profileActivity("... bind facts", minTimeToShow=1.0)
+        self.rootAncestors = [self.modelXbrl.modelDocument.xmlRootElement]
+        if self.byNetwork:
+            self.bindTupleAncestors(self.modelXbrl.facts, self.rootAncestors)
+            self.modelXbrl.profileActivity("... identify tuple ancestors", minTimeToShow=1.0)
+        else:
+            self.bindFacts(self.modelXbrl.facts, self.rootAncestors)
+            self.modelXbrl.profileActivity("... bind facts", minTimeToShow=1.0)
         
         # identify calcluation & essence-alias base sets (by key)
         for baseSetKey in self.modelXbrl.baseSets.keys():
@@ -91,6 +102,8 @@ class ValidateXbrlCalcs:
             if ELR and linkqname and arcqname:
                 if arcrole in (XbrlConst.summationItem, XbrlConst.essenceAlias, XbrlConst.requiresElement):
                     relsSet = self.modelXbrl.relationshipSet(arcrole,ELR,linkqname,arcqname)
+                    if self.byNetwork:
+                        self.bindNetworkFacts(relsSet)
                     if arcrole == XbrlConst.summationItem:
                         fromRelationships = relsSet.fromModelObjects()
                         for sumConcept, modelRels in fromRelationships.items():
@@ -111,12 +124,12 @@ class ValidateXbrlCalcs:
                                     ancestor, contextHash, unit = itemBindKey
                                     factKey = (itemConcept, ancestor, contextHash, unit)
                                     if factKey in self.itemFacts:
-                                        for fact in self.itemFacts[factKey]:
-                                            if fact in self.duplicatedFacts:
-                                                dupBindingKeys.add(itemBindKey)
-                                            else:
-                                                boundSums[itemBindKey] += roundFact(fact, self.inferDecimals) * weight
-                                                boundSummationItems[itemBindKey].append(fact)
+                                        itemsSum, itemFacts, hasDuplicates = self.itemFactsSum(factKey)
+                                        if hasDuplicates:
+                                            dupBindingKeys.add(itemBindKey)
+                                        if itemFacts:
+                                            boundSums[itemBindKey] += itemsSum * weight
+                                            boundSummationItems[itemBindKey].extend(itemFacts)
                             for sumBindKey in boundSumKeys:
                                 ancestor, contextHash, unit = sumBindKey
                                 factKey = (sumConcept, ancestor, contextHash, unit)
@@ -126,9 +139,9 @@ class ValidateXbrlCalcs:
                                         if fact in self.duplicatedFacts:
                                             dupBindingKeys.add(sumBindKey)
                                         elif sumBindKey not in dupBindingKeys:
-                                            roundedSum = roundFact(fact, self.inferDecimals)
+                                            roundedSum = self.roundedFactValue(fact)
                                             roundedItemsSum = roundFact(fact, self.inferDecimals, vDecimal=boundSums[sumBindKey])
-                                            if roundedItemsSum  != roundFact(fact, self.inferDecimals):
+                                            if roundedItemsSum  != roundedSum:
                                                 d = inferredDecimals(fact)
                                                 if isnan(d) or isinf(d): d = 4
                                                 self.modelXbrl.log('INCONSISTENCY', "xbrl.5.2.5.2:calcInconsistency",
@@ -177,50 +190,109 @@ class ValidateXbrlCalcs:
                                         modelObject=sourceConcept, 
                                         requiringConcept=sourceConcept.qname, requiredConcept=requiredConcept.qname, 
                                         linkrole=ELR)
+                    if self.byNetwork:
+                        self.unbindFacts()
         self.modelXbrl.profileActivity("... find inconsistencies", minTimeToShow=1.0)
         self.modelXbrl.profileActivity() # reset
     
     def bindFacts(self, facts, ancestors):
+        for f in facts:
+            self.bindFact(f, ancestors)
+            concept = f.concept
+            if concept is not None and concept.isTuple:
+                self.bindFacts(f.modelTupleFacts, ancestors + [f])
+                
+    def bindTupleAncestors(self, facts, ancestors):
         for f in facts:
             concept = f.concept
+            if concept is not None and concept.isTuple:
+                tupleAncestors = ancestors + [f]
+                for tupleFact in f.modelTupleFacts:
+                    self.factAncestors[tupleFact] = tupleAncestors
+                self.bindTupleAncestors(f.modelTupleFacts, tupleAncestors)
+                
+    def bindNetworkFacts(self, relsSet):
+        # bind, in document order, only facts of concepts in this network
+        factsByQname = self.modelXbrl.factsByQname
+        networkFacts = set()
+        for concept in set(c for modelRel in relsSet.modelRelationships
+                           for c in (modelRel.fromModelObject, modelRel.toModelObject)):
             if concept is not None:
-                # index facts by their calc relationship set
-                if concept.isNumeric:
-                    for ancestor in ancestors:
-                        # tbd: uniqify context and unit
-                        context = self.mapContext.get(f.context,f.context)
-                        # must use nonDimAwareHash to achieve s-equal comparison of contexts
-                        contextHash = context.contextNonDimAwareHash if context is not None else hash(None)
-                        unit = self.mapUnit.get(f.unit,f.unit)
-                        calcKey = (concept, ancestor, contextHash, unit)
-                        if not f.isNil:
-                            self.itemFacts[calcKey].append(f)
-                            bindKey = (ancestor, contextHash, unit)
-                            self.itemConceptBindKeys[concept].add(bindKey)
-                    if not f.isNil:
-                        self.sumFacts[calcKey].append(f) # sum only for immediate parent
-                        self.sumConceptBindKeys[concept].add(bindKey)
-                    # calcKey is the last ancestor added (immediate parent of fact)
-                    if calcKey in self.duplicateKeyFacts:
-                        self.duplicatedFacts.add(f)
-                        self.duplicatedFacts.add(self.duplicateKeyFacts[calcKey])
-                    else:
-                        self.duplicateKeyFacts[calcKey] = f
-                elif concept.isTuple:
-                    self.bindFacts(f.modelTupleFacts, ancestors + [f])
-
-                # index facts by their essence alias relationship set
-                if concept in self.conceptsInEssencesAlias and not f.isNil:
-                    ancestor = ancestors[-1]    # only care about direct parent
+                networkFacts |= factsByQname.get(concept.qname, set())
+        for f in sorted(networkFacts, key=lambda f: f.objectIndex):
+            self.bindFact(f, self.factAncestors.get(f, self.rootAncestors))
+            
+    def unbindFacts(self):
+        # release the bindings of a network before binding the next one
+        for bindings in (self.sumFacts, self.sumConceptBindKeys, self.itemFacts, self.itemConceptBindKeys,
+                         self.duplicateKeyFacts, self.duplicatedFacts, self.esAlFacts, self.esAlConceptBindKeys,
+                         self.requiresElementFacts):
+            bindings.clear()
+        self.roundedFactValues.clear()
+        self.itemFactsSums.clear()
+            
+    def roundedFactValue(self, fact):
+        try:
+            return self.roundedFactValues[fact]
+        except KeyError:
+            vRounded = self.roundedFactValues[fact] = roundFact(fact, self.inferDecimals)
+            return vRounded
+        
+    def itemFactsSum(self, calcKey):
+        # items of a calcKey are summed once, though contributing to sums of several concepts and networks
+        try:
+            return self.itemFactsSums[calcKey]
+        except KeyError:
+            itemsSum = ZERO
+            itemFacts = []
+            hasDuplicates = False
+            for fact in self.itemFacts[calcKey]:
+                if fact in self.duplicatedFacts:
+                    hasDuplicates = True
+                else:
+                    itemsSum += self.roundedFactValue(fact)
+                    itemFacts.append(fact)
+            result = self.itemFactsSums[calcKey] = (itemsSum, itemFacts, hasDuplicates)
+            return result
+            
+    def bindFact(self, f, ancestors):
+        concept = f.concept
+        if concept is not None:
+            # index facts by their calc relationship set
+            if concept.isNumeric:
+                for ancestor in ancestors:
+                    # tbd: uniqify context and unit
                     context = self.mapContext.get(f.context,f.context)
+                    # must use nonDimAwareHash to achieve s-equal comparison of contexts
                     contextHash = context.contextNonDimAwareHash if context is not None else hash(None)
-                    esAlKey = (concept, ancestor, contextHash)
-                    self.esAlFacts[esAlKey].append(f)
-                    bindKey = (ancestor, contextHash)
-                    self.esAlConceptBindKeys[concept].add(bindKey)
-                # index facts by their requires element usage
-                if concept in self.conceptsInRequiresElement:
-                    self.requiresElementFacts[concept].append(f)
+                    unit = self.mapUnit.get(f.unit,f.unit)
+                    calcKey = (concept, ancestor, contextHash, unit)
+                    if not f.isNil:
+                        self.itemFacts[calcKey].append(f)
+                        bindKey = (ancestor, contextHash, unit)
+                        self.itemConceptBindKeys[concept].add(bindKey)
+                if not f.isNil:
+                    self.sumFacts[calcKey].append(f) # sum only for immediate parent
+                    self.sumConceptBindKeys[concept].add(bindKey)
+                # calcKey is the last ancestor added (immediate parent of fact)
+                if calcKey in self.duplicateKeyFacts:
+                    self.duplicatedFacts.add(f)
+                    self.duplicatedFacts.add(self.duplicateKeyFacts[calcKey])
+                else:
+                    self.duplicateKeyFacts[calcKey] = f
+
+            # index facts by their essence alias relationship set
+            if concept in self.conceptsInEssencesAlias and not f.isNil:
+                ancestor = ancestors[-1]    # only care about direct parent
+                context = self.mapContext.get(f.context,f.context)
+                contextHash = context.contextNonDimAwareHash if context is not None else hash(None)
+                esAlKey = (concept, ancestor, contextHash)
+                self.esAlFacts[esAlKey].append(f)
+                bindKey = (ancestor, contextHash)
+                self.esAlConceptBindKeys[concept].add(bindKey)
+            # index facts by their requires element usage
+            if concept in self.conceptsInRequiresElement:
+                self.requiresElementFacts[concept].append(f)
 
 def roundFact(fact, inferDecimals=False, vDecimal=None):
     if vDecimal is None:
@@ -322,12 +322,119 @@ def checkContext(val, cntx):
                 modelObject=logDimAndFacts(modelDimValue), contextID=cntx.id, dimension=modelDimValue.dimensionQname)
             
 def checkFact(val, f, otherFacts=None):
-    if not isFactDimensionallyValid(val, f, otherFacts):
+    if not isFactDimensionallyValid(val, f, otherFacts=otherFacts):
         val.modelXbrl.error("xbrldie:PrimaryItemDimensionallyInvalidError",
             _("Fact %(fact)s context %(contextID)s dimensionally not valid"),
             modelObject=f, fact=f.qname, contextID=f.context.id)
 
 def isFactDimensionallyValid(val, f, setPrototypeContextElements=False, otherFacts=None):
+    context = f.context
+    if isinstance(context, ContextPrototype):
+        return isFactPrototypeDimensionallyValid(val, f, setPrototypeContextElements, otherFacts)
+    # validity is memoized by primary item and context dimension signature, shared by many facts
+    try:
+        factDimensionalValidity = val.factDimensionalValidity
+    except AttributeError:
+        factDimensionalValidity = val.factDimensionalValidity = {}
+    key = (f.concept, contextDimensionSignature(val, context))
+    try:
+        return factDimensionalValidity[key]
+    except KeyError:
+        isValid = factDimensionalValidity[key] = isDimensionSignatureValid(val, f.concept, key[1])
+        return isValid
+    
+def contextDimensionSignature(val, context):
+    # (segment dimension members, segment has non-dimensional content, and same for scenario) of context
+    try:
+        contextDimensionSignatures = val.contextDimensionSignatures
+    except AttributeError:
+        contextDimensionSignatures = val.contextDimensionSignatures = {}
+    try:
+        return contextDimensionSignatures[context]
+    except KeyError:
+        signature = contextDimensionSignatures[context] = tuple(
+            signaturePart
+            for contextElement in ("segment", "scenario")
+            for signaturePart in (frozenset((dimConcept, modelDimValue.member)
+                                            for dimConcept, modelDimValue in context.dimValues(contextElement).items()),
+                                  len(context.nonDimValues(contextElement)) > 0))
+        return signature
+    
+def isDimensionSignatureValid(val, priItem, signature):
+    # check a primary item and context dimension signature against the compiled DRS of the primary item
+    segDims, segHasNonDims, scenDims, scenHasNonDims = signature
+    contextElementDimMems = {"segment": (dict(segDims), segHasNonDims),
+                             "scenario": (dict(scenDims), scenHasNonDims)}
+    dimensionDefaultConcepts = val.modelXbrl.dimensionDefaultConcepts
+    hasElrHc = False
+    for ELR, hcConstraints in drsElrConstraints(val, priItem):
+        hasElrHc = True
+        elrValid = True
+        for hcContextElement, hcIsClosed, hcNegating, hcDims in hcConstraints:
+            dimMems, hasNonDims = contextElementDimMems.get(hcContextElement, ({}, False))
+            hcValid = True
+            if hcIsClosed and hasNonDims:
+                hcValid = False
+            else:
+                for dimConcept, usableMembers in hcDims.items():
+                    if dimConcept in dimMems:
+                        memConcept = dimMems[dimConcept]
+                    elif dimConcept in dimensionDefaultConcepts:
+                        memConcept = dimensionDefaultConcepts[dimConcept]
+                    else:
+                        hcValid = False
+                        break
+                    if usableMembers is not None and memConcept not in usableMembers:
+                        hcValid = False
+                        break
+            if hcValid and hcIsClosed and any(dimConcept not in hcDims
+                                              for dimConcept in dimMems.keys()):
+                hcValid = False # has extra stuff in the context element
+            if hcNegating:
+                hcValid = not hcValid
+            if not hcValid:
+                elrValid = False
+                break
+        if elrValid:
+            return True # meets hypercubes in this ELR
+    if hasElrHc:
+        # no ELR hypercubes fully met
+        return False
+    return True
+
+def drsElrConstraints(val, priItem):
+    """Compiled DRS of a primary item, built once per primary item: list of (ELR, hypercube constraints), 
+    with a hypercube constraint for each has-hypercube relationship of the ELR, (contextElement, isClosed, 
+    isNegating, dimension constraints), of which the dimension constraints are a dict by dimension concept 
+    of the set of usable members of the dimension's domain (None for a typed dimension)"""
+    try:
+        drsElrConstraintsCache = val.drsElrConstraints
+    except AttributeError:
+        drsElrConstraintsCache = val.drsElrConstraints = {}
+    try:
+        return drsElrConstraintsCache[priItem]
+    except KeyError:
+        pass
+    elrConstraints = []
+    for ELR, hcRels in priItemElrHcRels(val, priItem).items():
+        hcConstraints = []
+        for hasHcRel in hcRels:
+            dimELR = (hasHcRel.targetRole or ELR)
+            hcDims = {}
+            for hcDimRel in val.modelXbrl.relationshipSet(
+                                XbrlConst.hypercubeDimension, dimELR).fromModelObject(hasHcRel.toModelObject):
+                dimConcept = hcDimRel.toModelObject
+                if dimConcept is None or dimConcept.isTypedDimension:
+                    hcDims[dimConcept] = None
+                else:
+                    hcDims[dimConcept] = dimensionUsableMembers(val, dimConcept, (hcDimRel.targetRole or dimELR))
+            hcConstraints.append((hasHcRel.contextElement, hasHcRel.isClosed, 
+                                  hasHcRel.arcrole == XbrlConst.notAll, hcDims))
+        elrConstraints.append((ELR, hcConstraints))
+    drsElrConstraintsCache[priItem] = elrConstraints
+    return elrConstraints
+    
+def isFactPrototypeDimensionallyValid(val, f, setPrototypeContextElements=False, otherFacts=None):
     hasElrHc = False
     for ELR, hcRels in priItemElrHcRels(val, f.concept).items():
         hasElrHc = True
@@ -455,13 +562,16 @@ def checkFactElrHcs(val, f, ELR, hcRels, setPrototypeContextElements=False):
     return elrValid
                             
 def dimensionMemberUsable(val, dimConcept, memConcept, domELR):
+    return memConcept in dimensionUsableMembers(val, dimConcept, domELR)
+    
+def dimensionUsableMembers(val, dimConcept, domELR):
     try:
         dimensionMembersUsable = val.dimensionMembersUsable
     except AttributeError:
         dimensionMembersUsable = val.dimensionMembersUsable = {}
     key = (dimConcept, domELR)
     try:
-        return memConcept in dimensionMembersUsable[key]
+        return dimensionMembersUsable[key]
     except KeyError:
         usableMembers = set()
         unusableMembers = set()
@@ -470,7 +580,7 @@ def dimensionMemberUsable(val, dimConcept, memConcept, domELR):
         findUsableMembersInDomainELR(val, val.modelXbrl.relationshipSet(XbrlConst.dimensionDomain, domELR).fromModelObject(dimConcept),
                                      domELR, usableMembers, unusableMembers, defaultdict(set))
         usableMembers -= unusableMembers
-        return memConcept in usableMembers
+        return usableMembers
     
 def findUsableMembersInDomainELR(val, rels, ELR, usableMembers, unusableMembers, toConceptELRs):
     for rel in rels:
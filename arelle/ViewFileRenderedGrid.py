@@ -160,7 +160,11 @@ class ViewRenderedGrid(ViewFile.View):
                             for varName, varValue in structuralNode.variables.items():
                                     modelElt.addprevious(etree.Comment("   variable ${0}: {1}".format(varName, varValue)))
                             
+                    # aspects of x structural nodes and candidate facts of cells are shared by all rows of this table
+                    self.structuralNodesAspects = {}
+                    self.cellCandidateFacts = {}
                     self.bodyCells(self.dataFirstRow, yTopStructuralNode, xStructuralNodes, zAspects, self.yAxisChildrenFirst.get())
+                    self.structuralNodesAspects = self.cellCandidateFacts = None # dereference
                 # find next choice structural node
                 moreDiscriminators = False
                 for zStrNodeWithChoices in self.zStrNodesWithChoices:
@@ -590,7 +594,59 @@ class ViewRenderedGrid(ViewFile.View):
             return (nestedBottomRow, row)
             
     
+    def structuralNodeAspects(self, structuralNode):
+        # structural nodes by aspect (or dimension) covered by the structural node, computed once per table
+        try:
+            return self.structuralNodesAspects[structuralNode]
+        except KeyError:
+            pass
+        aspects = defaultdict(set)
+        for aspect in aspectModels[self.aspectModel]:
+            for ruleAspect in aspectRuleAspects.get(aspect, (aspect,)):
+                if structuralNode.hasAspect(ruleAspect):
+                    if ruleAspect == Aspect.DIMENSIONS:
+                        for dim in (structuralNode.aspectValue(Aspect.DIMENSIONS) or emptyList):
+                            aspects[dim].add(structuralNode)
+                    else:
+                        aspects[ruleAspect].add(structuralNode)
+        self.structuralNodesAspects[structuralNode] = aspects
+        return aspects
+    
+    def cellFacts(self, priItemQname, matchableAspects, cellAspectValues):
+        # reduce set of matchable facts to those with pri item qname and have dimension aspects,
+        # hashed by the pri item and dimension member key of the cell, so cells with the same key share the join
+        dimMemQnames = []
+        for aspect in matchableAspects:  # trim down facts with explicit dimensions match or just present
+            if isinstance(aspect, QName):
+                aspectValue = cellAspectValues.get(aspect, None)
+                if isinstance(aspectValue, ModelDimensionValue):
+                    if aspectValue.isExplicit:
+                        dimMemQname = aspectValue.memberQname # match facts with this explicit value
+                    else:
+                        dimMemQname = None  # match facts that report this dimension
+                elif isinstance(aspectValue, QName): 
+                    dimMemQname = aspectValue  # match facts that have this explicit value
+                else:
+                    dimMemQname = None # match facts that report this dimension
+                dimMemQnames.append((aspect, dimMemQname))
+        cellKey = (priItemQname, frozenset(dimMemQnames))
+        try:
+            return self.cellCandidateFacts[cellKey]
+        except KeyError:
+            pass
+        factSets = [self.modelXbrl.factsByDimMemQname(dim, dimMemQname)
+                    for dim, dimMemQname in dimMemQnames]
+        factSets.append(self.modelXbrl.factsByQname[priItemQname] if priItemQname else self.modelXbrl.factsInInstance)
+        if len(factSets) == 1:
+            facts = factSets[0]
+        else:
+            factSets.sort(key=len) # intersect starting from the smallest set
+            facts = factSets[0].intersection(*factSets[1:])
+        self.cellCandidateFacts[cellKey] = facts
+        return facts
+        
     def bodyCells(self, row, yParentStructuralNode, xStructuralNodes, zAspects, yChildrenFirst):
+        from arelle.ValidateXbrlDimensions import isFactDimensionallyValid
         if yParentStructuralNode is not None:
             rendrCntx = getattr(self.modelXbrl, "rendrCntx", None) # none for EU 2010 tables
             dimDefaults = self.modelXbrl.qnameDimensionDefaults
@@ -601,27 +657,11 @@ class ViewRenderedGrid(ViewFile.View):
                     if self.type == XML:
                         self.xCells = etree.SubElement(self.yCells, tableModelQName("cells"),
                                                        attrib={"disposition": "x"})
-                    yAspects = defaultdict(set)
-                    for aspect in aspectModels[self.aspectModel]:
-                        for ruleAspect in aspectRuleAspects.get(aspect, (aspect,)):
-                            if yStructuralNode.hasAspect(ruleAspect):
-                                if ruleAspect == Aspect.DIMENSIONS:
-                                    for dim in (yStructuralNode.aspectValue(Aspect.DIMENSIONS) or emptyList):
-                                        yAspects[dim].add(yStructuralNode)
-                                else:
-                                    yAspects[ruleAspect].add(yStructuralNode)
+                    yAspects = self.structuralNodeAspects(yStructuralNode)
                     # data for columns of rows
                     ignoreDimValidity = self.ignoreDimValidity.get()
                     for i, xStructuralNode in enumerate(xStructuralNodes):
-                        xAspects = defaultdict(set)
-                        for aspect in aspectModels[self.aspectModel]:
-                            for ruleAspect in aspectRuleAspects.get(aspect, (aspect,)):
-                                if xStructuralNode.hasAspect(ruleAspect):
-                                    if ruleAspect == Aspect.DIMENSIONS:
-                                        for dim in (xStructuralNode.aspectValue(Aspect.DIMENSIONS) or emptyList):
-                                            xAspects[dim].add(xStructuralNode)
-                                    else:
-                                        xAspects[ruleAspect].add(xStructuralNode)
+                        xAspects = self.structuralNodeAspects(xStructuralNode)
                         cellAspectValues = {}
                         matchableAspects = set()
                         for aspect in _DICT_SET(xAspects.keys()) | _DICT_SET(yAspects.keys()) | _DICT_SET(zAspects.keys()):
@@ -634,28 +674,13 @@ class ViewRenderedGrid(ViewFile.View):
                             
                         concept = self.modelXbrl.qnameConcepts.get(priItemQname)
                         conceptNotAbstract = concept is None or not concept.isAbstract
-                        from arelle.ValidateXbrlDimensions import isFactDimensionallyValid
                         fact = None
                         value = None
                         objectId = None
                         justify = None
                         fp = FactPrototype(self, cellAspectValues)
                         if conceptNotAbstract:
-                            # reduce set of matchable facts to those with pri item qname and have dimension aspects
-                            facts = self.modelXbrl.factsByQname[priItemQname] if priItemQname else self.modelXbrl.factsInInstance
-                            for aspect in matchableAspects:  # trim down facts with explicit dimensions match or just present
-                                if isinstance(aspect, QName):
-                                    aspectValue = cellAspectValues.get(aspect, None)
-                                    if isinstance(aspectValue, ModelDimensionValue):
-                                        if aspectValue.isExplicit:
-                                            dimMemQname = aspectValue.memberQname # match facts with this explicit value
-                                        else:
-                                            dimMemQname = None  # match facts that report this dimension
-                                    elif isinstance(aspectValue, QName): 
-                                        dimMemQname = aspectValue  # match facts that have this explicit value
-                                    else:
-                                        dimMemQname = None # match facts that report this dimension
-                                    facts = facts & self.modelXbrl.factsByDimMemQname(aspect, dimMemQname)
+                            facts = self.cellFacts(priItemQname, matchableAspects, cellAspectValues)
                             for fact in facts:
                                 if (all(aspectMatches(rendrCntx, fact, fp, aspect) 
                                         for aspect in matchableAspects) and
@@ -5,7 +5,8 @@ Created on Nov 28, 2010
 (c) Copyright 2010 Mark V Systems Limited, All rights reserved.
 '''
 from arelle import ModelDocument, ViewFile
-import os
+from arelle.UrlUtil import relativeUri
+import os, io, csv, json
 
 def viewTests(modelXbrl, outfile, cols=None):
     modelXbrl.modelManager.showStatus(_("viewing Tests"))
@@ -13,6 +14,57 @@ def viewTests(modelXbrl, outfile, cols=None):
     view.viewTestcaseIndexElement(modelXbrl.modelDocument)
     view.close()
     
+def priorTestResults(modelXbrl, reportFile):
+    """Reads a test report saved by viewTests, in csv, xml or json, which must have Testcase and ID columns
+    
+    :returns: dict -- (status, actual) of each variation, by (testcase uri relative to the index, variation ID)
+    """
+    rows = [] # dict of each row's column values, by column element name (e.g., testcase, iD, status)
+    try:
+        if reportFile.endswith(".xml"):
+            from lxml import etree
+            for rowElt in etree.parse(reportFile).getroot().iterchildren():
+                if rowElt.tag == "testcase" and len(rowElt) == 0: # testcase is only column
+                    rows.append({"testcase": rowElt.text})
+                elif rowElt.tag in ("testcase", "variation"):
+                    rows.append(dict((colElt.tag, colElt.text) for colElt in rowElt.iterchildren()))
+        elif reportFile.endswith(".json"):
+            with io.open(reportFile, "rt", encoding="utf-8") as fh:
+                for entries in json.load(fh).values():
+                    for entry in entries: # [rowName, rowAttrs, content], rowName missing for index row
+                        rowName, content = entry[0], entry[-1]
+                        if rowName == "testcase" and not isinstance(content, dict): # testcase is only column
+                            rows.append({"testcase": content})
+                        elif rowName in ("testcase", "variation"):
+                            rows.append(content)
+        else:
+            with open(reportFile, ViewFile.csvOpenMode.replace('w','r'), newline=ViewFile.csvOpenNewline) as fh:
+                colNames = None
+                for cols in csv.reader(fh):
+                    if colNames is None: # header row
+                        colNames = [col[0].lower() + col[1:] for col in cols]
+                    else:
+                        rows.append(dict(zip(colNames, cols)))
+    except (EnvironmentError, ValueError, SyntaxError) as err: # SyntaxError is lxml's parsing error superclass
+        modelXbrl.error("arelle:testReportRerunFailures",
+                        _("Prior test report %(file)s could not be read: %(error)s"),
+                        modelXbrl=modelXbrl, file=reportFile, error=err)
+        return {}
+    results = {}
+    testcase = None
+    for row in rows:
+        if row.get("iD"):
+            if testcase:
+                results[(testcase, row["iD"])] = (row.get("status") or "", row.get("actual") or "")
+        elif row.get("testcase"):
+            testcase = row["testcase"]
+    return results
+
+def testcaseReportUri(modelXbrl, testcase):
+    """Testcase uri relative to the loaded testcases index (or testcase), as in the Testcase column"""
+    return relativeUri(modelXbrl.modelDocument.uri, testcase.uri)
+
+
 class ViewTests(ViewFile.View):
     def __init__(self, modelXbrl, outfile, cols):
         super(ViewTests, self).__init__(modelXbrl, outfile, "Tests")
@@ -62,7 +114,7 @@ class ViewTests(ViewFile.View):
         cols = []
         for col in self.cols:
             if col == "Testcase":
-                cols.append(os.path.basename(modelDocument.uri))
+                cols.append(testcaseReportUri(self.modelXbrl, modelDocument))
                 break
             else:
                 cols.append("")
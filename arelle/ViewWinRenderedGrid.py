@@ -595,8 +595,8 @@ class ViewRenderedGrid(ViewWinGrid.ViewGrid):
                             # new context
                         if concept.isNumeric:
                             if concept.isMonetary:
-                                unitMeasure = qname(XbrlConst.iso4217, self.newFactItemOptions.monetaryUnit)
-                                unitMeasure.prefix = "iso4217"  # want to save with a recommended prefix
+                                # want to save with a recommended prefix
+                                unitMeasure = qname(XbrlConst.iso4217, "iso4217:" + self.newFactItemOptions.monetaryUnit)
                                 decimals = self.newFactItemOptions.monetaryDecimals
                             elif concept.isShares:
                                 unitMeasure = XbrlConst.qnXbrliShares
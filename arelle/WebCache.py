@@ -4,23 +4,32 @@ Created on Oct 5, 2010
 @author: Mark V Systems Limited
 (c) Copyright 2010 Mark V Systems Limited, All rights reserved.
 '''
-import os, posixpath, sys, re, shutil, time, calendar, io, json
+import os, posixpath, sys, re, shutil, time, calendar, io, json, threading
 if sys.version[0] >= '3':
     from urllib.parse import quote, unquote
     from urllib.error import URLError, HTTPError, ContentTooShortError
     from urllib import request
     from urllib import request as proxyhandlers
+    from http.client import HTTPConnection, HTTPSConnection, HTTPException
+    import queue
 else: # python 2.7.2
     from urllib import quote, unquote
     from urllib import ContentTooShortError
     from urllib2 import URLError, HTTPError
     import urllib2 as proxyhandlers
+    from httplib import HTTPConnection, HTTPSConnection, HTTPException
+    import Queue as queue
 from arelle.FileSource import SERVER_WEB_CACHE
 from arelle.UrlUtil import isHttpUrl
 addServerWebCache = None
     
 DIRECTORY_INDEX_FILE = "!~DirectoryIndex~!"
 
+# cache manifest entry by url: [check time (seconds since epoch), ETag, Last-Modified]
+MANIFEST_CHECK_TIME = 0
+MANIFEST_ETAG = 1
+MANIFEST_LAST_MODIFIED = 2
+
 def proxyDirFmt(httpProxyTuple):
     if isinstance(httpProxyTuple,(tuple,list)) and len(httpProxyTuple) == 5:
         useOsProxy, urlAddr, urlPort, user, password = httpProxyTuple
@@ -61,6 +70,13 @@ def lastModifiedTime(headers):
             if hdrTime:
                 return time.mktime(hdrTime)
     return None
+
+def urlHost(url):
+    return url.partition("://")[2].partition("/")[0]
+
+class HeadRequest(proxyhandlers.Request):
+    def get_method(self):
+        return "HEAD"
     
 
 class WebCache:
@@ -95,16 +111,31 @@ class WebCache:
         self.decodeFileChars = re.compile(r'\^[0-9]{3}')
         self.workOffline = False
         self.maxAgeSeconds = 60.0 * 60.0 * 24.0 * 7.0 # seconds before checking again for file
+        self.revalidateThreads = 8 # concurrent freshness checks of a host's expired cached urls
+        self.revalidatedHosts = {} # host: time of its last sweep of expired cached urls
+        self.staleUrls = set() # cached urls found to have changed on the web
+        self.cachedUrlManifest = {}
+        self.cachedUrlManifestModified = False
         if cntlr.hasFileSystem:
-            self.urlCheckJsonFile = cntlr.userAppDir + os.sep + "cachedUrlCheckTimes.json"
+            self.urlManifestJsonFile = cntlr.userAppDir + os.sep + "cachedUrlManifest.json"
             try:
-                with io.open(self.urlCheckJsonFile, 'rt', encoding='utf-8') as f:
-                    self.cachedUrlCheckTimes = json.load(f)
+                with io.open(self.urlManifestJsonFile, 'rt', encoding='utf-8') as f:
+                    self.cachedUrlManifest = json.load(f)
             except Exception:
-                self.cachedUrlCheckTimes = {}
-        else:
-            self.cachedUrlCheckTimes = {}
-        self.cachedUrlCheckTimesModified = False
+                try: # convert check time strings of prior versions
+                    with io.open(cntlr.userAppDir + os.sep + "cachedUrlCheckTimes.json", 'rt', encoding='utf-8') as f:
+                        for url, checkTimeStr in json.load(f).items():
+                            self.cachedUrlManifest[url] = [calendar.timegm(time.strptime(checkTimeStr, '%Y-%m-%dT%H:%M:%S UTC')), 
+                                                           None, None]
+                    self.cachedUrlManifestModified = True
+                except Exception:
+                    pass
+        # background prefetching of discovered web files, when prefetchThreads is set
+        self.prefetchThreads = None
+        self.prefetchQueue = None
+        self.cacheLock = threading.Lock()
+        self.prefetchRequestedUrls = set()
+        self.prefetchingUrls = {} # url: threading.Event set when its prefetch is finished
             
 
     @property
@@ -116,11 +147,109 @@ class WebCache:
         self._timeout = seconds
 
     def saveUrlCheckTimes(self):
-        if self.cachedUrlCheckTimesModified:
-            with io.open(self.urlCheckJsonFile, 'wt', encoding='utf-8') as f:
-                jsonStr = _STR_UNICODE(json.dumps(self.cachedUrlCheckTimes, ensure_ascii=False, indent=0)) # might not be unicode in 2.7
+        if self.cachedUrlManifestModified:
+            with self.cacheLock: # prefetch and revalidation threads may be updating the manifest
+                jsonStr = _STR_UNICODE(json.dumps(self.cachedUrlManifest, ensure_ascii=False, separators=(',',':'))) # might not be unicode in 2.7
+            with io.open(self.urlManifestJsonFile, 'wt', encoding='utf-8') as f:
                 f.write(jsonStr)  # 2.7 gets unicode this way
-        self.cachedUrlCheckTimesModified = False
+        self.cachedUrlManifestModified = False
+        
+    def cachedUrlRetrieved(self, url, headers):
+        # record manifest entry of a newly retrieved url
+        entry = [time.time(), None, None]
+        if headers:
+            entry[MANIFEST_ETAG] = headers.get("etag")
+            entry[MANIFEST_LAST_MODIFIED] = headers.get("last-modified")
+        with self.cacheLock:
+            self.cachedUrlManifest[url] = entry
+            self.cachedUrlManifestModified = True
+            self.staleUrls.discard(url)
+            
+    def revalidate(self, urls):
+        """Checks, concurrently, whether cached urls have changed on the web, by conditional HEAD 
+        requests with their manifest ETag and Last-Modified values.  Unchanged urls get a new check
+        time, changed urls are added to staleUrls (to be retrieved again by getfilename).
+        
+        :param urls: cached urls to check
+        :type urls: iterable of str
+        """
+        urlQueue = queue.Queue()
+        for url in urls:
+            urlQueue.put(url)
+        def revalidateWorker():
+            while True:
+                try:
+                    url = urlQueue.get_nowait()
+                except queue.Empty:
+                    return
+                isStale = self.isStale(url)
+                with self.cacheLock:
+                    if isStale:
+                        self.staleUrls.add(url)
+                    elif url in self.cachedUrlManifest:
+                        self.cachedUrlManifest[url][MANIFEST_CHECK_TIME] = time.time()
+                    else:
+                        self.cachedUrlManifest[url] = [time.time(), None, None]
+                    self.cachedUrlManifestModified = True
+        threads = [threading.Thread(target=revalidateWorker) 
+                   for i in range(min(self.revalidateThreads or 1, urlQueue.qsize()))]
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+        for thread in threads:
+            thread.join()
+            
+    def revalidateHost(self, url):
+        # batched freshness check of all expired cached urls on the host of url, swept again when the
+        # host's last sweep has itself expired, otherwise url (which expired since or wasn't cached then) is checked alone
+        host = urlHost(url)
+        timeNow = time.time()
+        with self.cacheLock:
+            sweepTime = self.revalidatedHosts.get(host)
+            isSweep = sweepTime is None or timeNow - sweepTime > self.maxAgeSeconds
+            if isSweep:
+                self.revalidatedHosts[host] = timeNow
+                expiredUrls = set(cachedUrl
+                                  for cachedUrl, entry in self.cachedUrlManifest.items()
+                                  if urlHost(cachedUrl) == host and timeNow - entry[MANIFEST_CHECK_TIME] > self.maxAgeSeconds)
+        if not isSweep:
+            self.revalidate((url,))
+            return
+        expiredUrls.add(url)
+        self.cntlr.showStatus(_("web cache checking {0} files of {1}").format(len(expiredUrls), host))
+        self.revalidate(url
+                        for url in expiredUrls
+                        if os.path.exists(self.urlToCacheFilepath(url)))
+        
+    def isStale(self, url):
+        # True if the cached file of url has changed on the web
+        filepath = self.urlToCacheFilepath(url)
+        entry = self.cachedUrlManifest.get(url)
+        etag = entry and entry[MANIFEST_ETAG]
+        lastModified = entry and entry[MANIFEST_LAST_MODIFIED]
+        urlScheme, schemeSep, urlSchemeSpecificPart = url.partition("://")
+        requestHeaders = {}
+        if etag:
+            requestHeaders["If-None-Match"] = etag
+        if lastModified:
+            requestHeaders["If-Modified-Since"] = lastModified
+        try: # no provision here for proxy authentication!!!
+            fp = self.opener.open(HeadRequest(urlScheme + schemeSep + quote(urlSchemeSpecificPart, '/?=&'), 
+                                              headers=requestHeaders),
+                                  timeout=self.timeout)
+            headers = fp.info()
+            fp.close()
+        except HTTPError as err:
+            return False # 304 (not modified), or for now, forget about authentication here
+        except Exception:
+            return False
+        if etag and headers.get("etag"):
+            return headers.get("etag") != etag
+        remoteFileTime = lastModifiedTime(headers)
+        try:
+            return bool(remoteFileTime and remoteFileTime > os.path.getmtime(filepath))
+        except EnvironmentError:
+            return False
         
     def resetProxies(self, httpProxyTuple):
         try:
@@ -233,27 +362,23 @@ class WebCache:
                 filepath = filepath.replace('/', '\\')
             if self.workOffline or filenameOnly:
                 return filepath
+            prefetching = self.prefetchingUrls.get(url)
+            if prefetching is not None: # being downloaded in background, wait for it
+                prefetching.wait()
             filepathtmp = filepath + ".tmp"
             timeNow = time.time()
-            timeNowStr = time.strftime('%Y-%m-%dT%H:%M:%S UTC', time.gmtime(timeNow))
-            if not reload and os.path.exists(filepath):
-                if url in self.cachedUrlCheckTimes and not checkModifiedTime:
-                    cachedTime = calendar.timegm(time.strptime(self.cachedUrlCheckTimes[url], '%Y-%m-%dT%H:%M:%S UTC'))
+            if not reload and os.path.exists(filepath) and url not in self.staleUrls:
+                if url in self.cachedUrlManifest and not checkModifiedTime:
+                    cachedTime = self.cachedUrlManifest[url][MANIFEST_CHECK_TIME]
                 else:
                     cachedTime = 0
                 if timeNow - cachedTime > self.maxAgeSeconds:
                     # weekly check if newer file exists
-                    newerOnWeb = False
-                    try: # no provision here for proxy authentication!!!
-                        remoteFileTime = lastModifiedTime( self.getheaders(quotedUrl) )
-                        if remoteFileTime and remoteFileTime > os.path.getmtime(filepath):
-                            newerOnWeb = True
-                    except:
-                        pass # for now, forget about authentication here
-                    if not newerOnWeb:
-                        # update ctime by copying file and return old file
-                        self.cachedUrlCheckTimes[url] = timeNowStr
-                        self.cachedUrlCheckTimesModified = True
+                    if checkModifiedTime:
+                        self.revalidate((url,))
+                    else: # check all expired files of this url's host at once
+                        self.revalidateHost(url)
+                    if url not in self.staleUrls:
                         return filepath
                 else:
                     return filepath
@@ -331,8 +456,7 @@ class WebCache:
                 webFileTime = lastModifiedTime(headers)
                 if webFileTime: # set mtime to web mtime
                     os.utime(filepath,(webFileTime,webFileTime))
-                self.cachedUrlCheckTimes[url] = timeNowStr
-                self.cachedUrlCheckTimesModified = True
+                self.cachedUrlRetrieved(url, headers)
                 return filepath
         
         if url.startswith("file://"): url = url[7:]
@@ -341,6 +465,112 @@ class WebCache:
             url = url.replace('/', '\\')
         return url
     
+    def prefetch(self, urls):
+        """Starts background retrieval into the cache of web urls which are not yet cached, using a 
+        pool of prefetchThreads threads (each keeping its server connections alive), so that a 
+        subsequent getfilename of the url finds it cached (or waits for its retrieval in progress).
+        
+        Prefetch failures are silent, getfilename retries and reports as usual.
+        
+        :param urls: normalized urls, such as of schemaRef, linkbaseRef and import hrefs of a document being loaded
+        :type urls: iterable of str
+        """
+        if not self.prefetchThreads or self.workOffline or self.cacheDir == SERVER_WEB_CACHE:
+            return
+        with self.cacheLock:
+            for url in urls:
+                if url and isHttpUrl(url) and url not in self.prefetchRequestedUrls:
+                    self.prefetchRequestedUrls.add(url)
+                    if not os.path.exists(self.urlToCacheFilepath(url)):
+                        if self.prefetchQueue is None:
+                            self.prefetchQueue = queue.Queue()
+                            for i in range(self.prefetchThreads):
+                                thread = threading.Thread(target=self.prefetchWorker, name="webCachePrefetch{0}".format(i))
+                                thread.daemon = True
+                                thread.start()
+                        self.prefetchingUrls[url] = threading.Event()
+                        self.prefetchQueue.put(url)
+                        
+    def prefetchWorker(self):
+        connections = {} # kept-alive connections of this thread, by (scheme, host:port)
+        while True:
+            url = self.prefetchQueue.get()
+            try:
+                self.prefetchUrl(url, connections)
+            except Exception:
+                pass # leave retrieval and its error reporting to getfilename
+            finally:
+                self.prefetchingUrls.pop(url).set()
+                
+    def prefetchUrl(self, url, connections):
+        filepath = self.urlToCacheFilepath(url)
+        if self.workOffline or os.path.exists(filepath):
+            return
+        filedir = os.path.dirname(filepath)
+        if not os.path.exists(filedir):
+            try:
+                os.makedirs(filedir)
+            except OSError:
+                pass # made by another thread
+        urlScheme, schemeSep, urlSchemeSpecificPart = url.partition("://")
+        quotedUrl = urlScheme + schemeSep + quote(urlSchemeSpecificPart, '/?=&')
+        filepathtmp = "{0}.{1}.tmp".format(filepath, threading.current_thread().name) # unique to this thread
+        try:
+            headers = None
+            if urlScheme not in self.proxy_handler.proxies: # direct connection to server
+                headers = self.retrieveKeepAlive(quotedUrl, filepathtmp, connections)
+            if headers is None: # redirected, authenticated or proxied, use opener
+                savedfile, headers = self.retrieve(quotedUrl, filename=filepathtmp)
+            if os.path.exists(filepath): # retrieved meanwhile by getfilename
+                os.remove(filepathtmp)
+                return
+            os.rename(filepathtmp, filepath)
+        except Exception:
+            if os.path.exists(filepathtmp):
+                os.remove(filepathtmp)
+            raise
+        webFileTime = lastModifiedTime(headers)
+        if webFileTime: # set mtime to web mtime
+            os.utime(filepath,(webFileTime,webFileTime))
+        self.cachedUrlRetrieved(url, headers)
+        
+    def retrieveKeepAlive(self, url, filename, connections):
+        # retrieves url to filename on a connection kept alive for further urls of its server, returning
+        # response headers, or None if response isn't the file (e.g., redirection or authentication needed)
+        scheme, sep, schemeSpecificPart = url.partition("://")
+        hostport, sep, path = schemeSpecificPart.partition("/")
+        hostport = unquote(hostport) # quoted with the url, e.g., port separator
+        if "@" in hostport: # user credentials are for opener's authentication handlers
+            return None
+        key = (scheme, hostport)
+        for attempt in range(2): # a kept-alive connection may have been closed by the server
+            connection = connections.get(key)
+            if connection is None:
+                connection = connections[key] = (HTTPSConnection if scheme == "https" else HTTPConnection)(
+                                                    hostport, timeout=self.timeout)
+            try:
+                connection.request("GET", "/" + path, headers={"Connection": "keep-alive"})
+                response = connection.getresponse()
+                if response.status != 200:
+                    response.read()
+                    return None
+                with open(filename, 'wb') as f:
+                    while True:
+                        block = response.read(1024*8)
+                        if not block:
+                            break
+                        f.write(block)
+                if response.will_close:
+                    connection.close()
+                    del connections[key]
+                return response.msg
+            except (HTTPException, EnvironmentError):
+                connection.close()
+                del connections[key]
+                if attempt:
+                    raise
+        return None
+
     def reportProgress(self, blockCount, blockSize, totalSize):
         if totalSize > 0:
             self.cntlr.showStatus(_("web caching {0}: {1:.0f} of {2:.0f} KB").format(
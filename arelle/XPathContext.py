@@ -14,6 +14,7 @@ from arelle.ModelValue import (qname,QName,dateTime, DateTime, DATEUNION, DATE,
 from arelle.XmlValidate import UNKNOWN, VALID, validate
 from arelle.PluginManager import pluginClassMethods
 from lxml import etree
+import operator
 
 class XPathException(Exception):
     def __init__(self, progStep, code, message):
@@ -126,6 +127,9 @@ class XPathContext:
         return self.modelXbrl.modelManager.formulaOptions
         
     def evaluate(self, exprStack, contextItem=None, resultStack=None, parentOp=None):
+        if (resultStack is None and parentOp is None and exprStack and 
+            isinstance(exprStack[0], ProgHeader) and exprStack[0].compiledProg is not None):
+            return exprStack[0].compiledProg(self, contextItem, [])
         if resultStack is None: resultStack =  []
         if contextItem is None: contextItem = self.contextItem
         setProgHeader = False
@@ -573,12 +577,15 @@ class XPathContext:
             targetSequence.extend(targetNodes)
         return targetSequence
         
-    def predicate(self, p, sourceSequence):
+    def predicate(self, p, sourceSequence, compiledArgs=None):
         targetSequence = []
         sourcePosition = 0
         for item in sourceSequence:
             sourcePosition += 1
-            predicateResult = self.evaluate(p.args, contextItem=item)
+            if compiledArgs is not None:
+                predicateResult = compiledArgs(self, item, [])
+            else:
+                predicateResult = self.evaluate(p.args, contextItem=item)
             if len(predicateResult) == 1: predicateResult = predicateResult[0] # first result
             if len(predicateResult) == 1 and isinstance(predicateResult[0],_NUM_TYPES):
                 result = predicateResult[0]
@@ -725,4 +732,326 @@ class XPathContext:
             return x.modelXbrl
         return None
         
-        
\ No newline at end of file
+        
+# compiled programs: each parsed program (expression stack) is compiled once, when parsed, into closures
+# that perform the steps XPathContext.evaluate would perform for each item of the expression stack, with
+# all dispatching on item types, operator names and function namespaces resolved at compile time
+
+VALUE_OP_FUNCTIONS = {'+': operator.add, '-': operator.sub, '*': operator.mul, 
+                      'div': operator.truediv, 'idiv': operator.floordiv, 'mod': operator.mod,
+                      'gt': operator.gt, 'ge': operator.ge, 'eq': operator.eq, 'ne': operator.ne,
+                      'lt': operator.lt, 'le': operator.le,
+                      'to': lambda op1, op2: _RANGE( _INT(op1), _INT(op2) + 1 )}
+GENERALCOMPARISON_OP_FUNCTIONS = {'>': operator.gt, '>=': operator.ge, '=': operator.eq, 
+                                  '!=': operator.ne, '<': operator.lt, '<=': operator.le}
+KIND_TEST_FUNCTIONS = {'attribute', 'comment', 'document-node', 'element', 'item', 'node', 
+                       'processing-instruction', 'schema-attribute', 'schema-element', 'text'}
+
+def compileProg(exprStack):
+    """Returns the compiled program of a parsed expression stack, a function of (xpCtx, contextItem, 
+    resultStack) which returns the same result stack as XPathContext.evaluate, or None if the 
+    expression stack can not be compiled (and is to be interpreted by XPathContext.evaluate).
+    
+    :param exprStack: program produced by XPathParser.parse
+    :type exprStack: list
+    """
+    try:
+        return compileSteps(exprStack, None)
+    except Exception:
+        return None # interpret program
+    
+def compileSteps(exprStack, parentOp):
+    steps = []
+    setsProgHeader = False
+    for p in exprStack:
+        if isinstance(p,QNameDef) or (p == '*' and parentOp in ('/', '//')): # path step QName or wildcard
+            steps.append(compileStepAxis(p, parentOp))
+        elif isinstance(p,_STR_NUM_TYPES):
+            steps.append(compileLiteral(p))
+        elif isinstance(p,VariableRef):
+            steps.append(compileVariableRef(p))
+        elif isinstance(p,OperationDef):
+            steps.append(compileOperation(p, parentOp))
+        elif isinstance(p,ProgHeader):
+            steps.append(compileProgHeader(p))
+            setsProgHeader = True
+    steps = tuple(step for step in steps if step is not None)
+    def evaluateSteps(xpCtx, contextItem, resultStack):
+        if contextItem is None: contextItem = xpCtx.contextItem
+        for step in steps:
+            result = step(xpCtx, contextItem, resultStack)
+            if result is not None:   # note: result can be False which gets appended to resultStack
+                resultStack.append( xpCtx.flattenSequence( result ) )
+        if setsProgHeader:
+            xpCtx.progHeader = None
+        return resultStack
+    return evaluateSteps
+
+def compileProgHeader(p):
+    from arelle.ModelFormulaObject import Trace
+    setsTraceType = p.traceType not in (Trace.MESSAGE, Trace.CUSTOM_FUNCTION)
+    def progHeader(xpCtx, contextItem, resultStack):
+        xpCtx.progHeader = p
+        if setsTraceType: 
+            xpCtx.traceType = p.traceType
+    return progHeader
+
+def compileLiteral(p):
+    def literal(xpCtx, contextItem, resultStack):
+        return p
+    return literal
+
+def compileVariableRef(p):
+    name = p.name
+    def variableRef(xpCtx, contextItem, resultStack):
+        inScopeVars = xpCtx.inScopeVars
+        if name in inScopeVars:
+            return inScopeVars[name]
+    return variableRef
+
+def compileStepAxis(p, parentOp):
+    def stepAxis(xpCtx, contextItem, resultStack):
+        if len(resultStack) == 0 or not xpCtx.isNodeSequence(resultStack[-1]):
+            resultStack.append( [ contextItem, ] )
+        return xpCtx.stepAxis(parentOp, p, resultStack.pop() )
+    return stepAxis
+
+def compileInterpretedStep(p, parentOp):
+    # operations which are seldom used in formula expressions are left to the interpreter
+    exprStack = (p,)
+    def interpretedStep(xpCtx, contextItem, resultStack):
+        xpCtx.evaluate(exprStack, contextItem=contextItem, resultStack=resultStack, parentOp=parentOp)
+    return interpretedStep
+
+def compileOperation(p, parentOp):
+    op = p.name
+    if isinstance(op, QNameDef): # function call
+        return compileFunctionCall(p, parentOp)
+    elif op in VALUE_OPS:
+        return compileValueOp(p)
+    elif op in GENERALCOMPARISON_OPS:
+        return compileGeneralComparison(p)
+    elif op in LOGICAL_OPS:
+        return compileLogicalOp(p)
+    elif op in UNARY_OPS:
+        return compileUnaryOp(p)
+    elif op == 'sequence':
+        return compileSequence(p)
+    elif op == 'predicate':
+        return compilePredicate(p)
+    elif op in FORSOMEEVERY_OPS: # for, some, every
+        return compileForSomeEvery(p)
+    elif op == 'if':
+        return compileIf(p)
+    elif op in PATH_OPS:
+        return compilePath(p)
+    elif op in NODECOMPARISON_OPS or op in COMBINING_OPS or op in ('instance', '.', '..'):
+        return compileInterpretedStep(p, parentOp)
+    return None # not an operation producing a result
+
+def compileFunctionCall(p, parentOp):
+    from arelle import (FunctionXs, FunctionFn, FunctionXfi, FunctionIxt, FunctionCustom)
+    op = p.name
+    ns = op.namespaceURI; localname = op.localName
+    args = compileSteps(p.args, None)
+    if op.unprefixed and localname in KIND_TEST_FUNCTIONS:
+        def call(xpCtx, contextItem, resultStack, args):
+            # step axis operation
+            if len(resultStack) == 0 or not xpCtx.isNodeSequence(resultStack[-1]):
+                if isinstance(contextItem, (tuple,list)):
+                    resultStack.append( contextItem )
+                else:
+                    resultStack.append( [ contextItem, ] )
+            return xpCtx.stepAxis(parentOp, p, resultStack.pop() )
+    elif op.unprefixed or ns == XbrlConst.fn:
+        def call(xpCtx, contextItem, resultStack, args):
+            return FunctionFn.call(xpCtx, p, localname, contextItem, args)
+    elif ns == XbrlConst.xfi or ns == XbrlConst.xff:
+        def call(xpCtx, contextItem, resultStack, args):
+            return FunctionXfi.call(xpCtx, p, localname, args)
+    elif ns == XbrlConst.xsd:
+        def call(xpCtx, contextItem, resultStack, args):
+            return FunctionXs.call(xpCtx, p, localname, args)
+    elif ns in FunctionIxt.ixtNamespaceURIs:
+        def call(xpCtx, contextItem, resultStack, args):
+            return FunctionIxt.call(xpCtx, p, localname, args)
+    else:
+        def call(xpCtx, contextItem, resultStack, args):
+            raise XPathException(p, 'err:XPST0017', _('Function call not identified: {0}.').format(op))
+    def functionCall(xpCtx, contextItem, resultStack):
+        argValues = args(xpCtx, contextItem, [])
+        try:
+            if op in xpCtx.modelXbrl.modelCustomFunctionSignatures:
+                return FunctionCustom.call(xpCtx, p, op, contextItem, argValues)
+            return call(xpCtx, contextItem, resultStack, argValues)
+        except FunctionNumArgs:
+            raise XPathException(p, 'err:XPST0017', _('Number of arguments do not match signature arity: {0}').format(op))
+        except FunctionArgType as err:
+            raise XPathException(p, err.errCode, _('Argument {0} does not match expected type {1} for {2} {3}.')
+                                 .format(err.argNum, err.expectedType, op, err.foundObject))
+        except FunctionNotAvailable:
+            raise XPathException(p, 'arelle:functDeferred', _('Function {0} is not available in this build.').format(op))
+    return functionCall
+
+def compileValueOp(p):
+    from arelle.FunctionUtil import (testTypeCompatiblity)
+    op = p.name
+    opFunction = VALUE_OP_FUNCTIONS[op]
+    isDivision = op in ('div', 'idiv', 'mod')
+    args = compileSteps(p.args, None)
+    def valueOp(xpCtx, contextItem, resultStack):
+        # binary arithmetic operations and value comparisons
+        s1 = xpCtx.atomize( p, resultStack.pop() ) if len(resultStack) > 0 else []
+        s2 = xpCtx.atomize( p, args(xpCtx, contextItem, []) )
+        if len(s1) > 1 or len(s2) > 1:
+            raise XPathException(p, 'err:XPTY0004', _("Value operation '{0}' sequence length error").format(op))
+        if len(s1) == 0 or len(s2) == 0:
+            return []
+        op1 = s1[0]
+        op2 = s2[0]
+        testTypeCompatiblity( xpCtx, p, op, op1, op2 )
+        if isDivision:
+            try:
+                return opFunction(op1, op2)
+            except ZeroDivisionError:
+                raise XPathException(p, 'err:FOAR0001', _('Attempt to divide by zero: {0} {1} {2}.')
+                                     .format(op1, op, op2))
+        return opFunction(op1, op2)
+    return valueOp
+
+def compileGeneralComparison(p):
+    opFunction = GENERALCOMPARISON_OP_FUNCTIONS[p.name]
+    args = compileSteps(p.args, None)
+    def generalComparison(xpCtx, contextItem, resultStack):
+        s1 = xpCtx.atomize( p, resultStack.pop() ) if len(resultStack) > 0 else []
+        s2 = xpCtx.atomize( p, args(xpCtx, contextItem, []) )
+        result = []
+        for op1 in s1:
+            for op2 in s2:
+                result = opFunction(op1, op2)
+                if result:
+                    return result
+        return result
+    return generalComparison
+
+def compileLogicalOp(p):
+    isAnd = p.name == 'and'
+    args = compileSteps(p.args, None)
+    def logicalOp(xpCtx, contextItem, resultStack):
+        if len(resultStack) == 0:
+            return []
+        op1 = xpCtx.effectiveBooleanValue( p, resultStack.pop() )
+        op2 = xpCtx.effectiveBooleanValue( p, args(xpCtx, contextItem, []) )
+        if isAnd:
+            return op1 and op2
+        return op1 or op2
+    return logicalOp
+
+def compileUnaryOp(p):
+    isMinus = p.name == 'u-'
+    args = compileSteps(p.args, None)
+    def unaryOp(xpCtx, contextItem, resultStack):
+        s1 = xpCtx.atomize( p, args(xpCtx, contextItem, []) )
+        if len(s1) > 1:
+            raise XPathException(p, 'err:XPTY0004', _('Unary expression sequence length error'))
+        if len(s1) == 0:
+            return []
+        if isMinus:
+            return -s1[0]
+        return s1[0]
+    return unaryOp
+
+def compileSequence(p):
+    args = compileSteps(p.args, None)
+    def sequence(xpCtx, contextItem, resultStack):
+        return args(xpCtx, contextItem, [])
+    return sequence
+
+def compilePredicate(p):
+    args = compileSteps(p.args, None)
+    def predicate(xpCtx, contextItem, resultStack):
+        return xpCtx.predicate(p, resultStack.pop(), args) if len(resultStack) > 0 else []
+    return predicate
+
+def compileForSomeEvery(p):
+    rangeVars = compileRangeVars(p.name, p.args[0], p.args[1:])
+    def forSomeEvery(xpCtx, contextItem, resultStack):
+        result = []
+        rangeVars(xpCtx, contextItem, result)
+        return result
+    return forSomeEvery
+
+def compileRangeVars(op, p, args):
+    if isinstance(p, RangeDecl):
+        bindingSeq = compileSteps(p.bindingSeq, None)
+        nextRangeVars = compileRangeVars(op, args[0], args[1:])
+        rvQname = p.rangeVar.name
+        def rangeVars(xpCtx, contextItem, result):
+            r = bindingSeq(xpCtx, contextItem, [])
+            if len(r) == 1: # should be an expr single
+                r = r[0]
+                if isinstance(r, (tuple,list,set)):
+                    if len(r) == 1 and isinstance(r[0],_RANGE):
+                        r = r[0]
+                    hasPrevValue = rvQname in xpCtx.inScopeVars
+                    if hasPrevValue: 
+                        prevValue = xpCtx.inScopeVars[rvQname]
+                    for rv in r:
+                        xpCtx.inScopeVars[rvQname] = rv 
+                        nextRangeVars(xpCtx, contextItem, result)
+                        if op != 'for' and len(result) > 0:
+                            break    # short circuit evaluation
+                    if op == 'every' and len(result) == 0:
+                        result.append( True )   # true if no false result returned during iteration
+                    if hasPrevValue: 
+                        xpCtx.inScopeVars[rvQname] = prevValue
+        return rangeVars
+    elif isinstance(p, Expr):
+        expr = compileSteps(p.expr, None)
+        if p.name == 'return':
+            def returnExpr(xpCtx, contextItem, result):
+                result.append( expr(xpCtx, contextItem, []) )
+            return returnExpr
+        elif p.name == 'satisfies':
+            def satisfiesExpr(xpCtx, contextItem, result):
+                boolresult = xpCtx.effectiveBooleanValue(p, expr(xpCtx, contextItem, []))
+                if (op == 'every') != boolresult:
+                    # stop short circuit eval
+                    result.append( boolresult )
+            return satisfiesExpr
+    def noRangeVars(xpCtx, contextItem, result):
+        pass
+    return noRangeVars
+
+def compileIf(p):
+    test = compileSteps(p.args[0].expr[0], None)
+    thenExpr = compileSteps(p.args[1].args, None)
+    elseExpr = compileSteps(p.args[2].args, None)
+    def ifExpr(xpCtx, contextItem, resultStack):
+        if xpCtx.effectiveBooleanValue( p, test(xpCtx, contextItem, []) ):
+            return thenExpr(xpCtx, contextItem, [])
+        return elseExpr(xpCtx, contextItem, [])
+    return ifExpr
+
+def compilePath(p):
+    op = p.name
+    isRootStep = op in ('rootChild', 'rootDescendant')
+    if op == 'rootChild':
+        op = '/'
+    elif op == 'rootDescendant':
+        op = '//'
+    # contains QNameDefs and predicates
+    args = compileSteps(p.args, op)
+    def path(xpCtx, contextItem, resultStack):
+        if isRootStep:
+            # fix up for multi-instance
+            resultStack.append( [xpCtx.inputXbrlInstance.xmlDocument,] )
+        if len(resultStack) > 0:
+            innerFocusNodes = resultStack.pop()
+        else:
+            innerFocusNodes = contextItem
+        navSequence = []
+        for innerFocusNode in xpCtx.flattenSequence(innerFocusNodes):
+            navSequence += args(xpCtx, innerFocusNode, [])
+        return xpCtx.documentOrderedNodes(xpCtx.flattenSequence(navSequence))
+    return path
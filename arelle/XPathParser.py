@@ -32,6 +32,7 @@ exprStack = []
 xmlElement = None
 modelXbrl = None
 xbrlResource = None
+isCacheable = False # parsed program may be reused from (and saved to) XPathProgCache
 
 class ProgHeader:
     def __init__(self, modelObject, name, element, sourceStr, traceType):
@@ -40,9 +41,15 @@ class ProgHeader:
         self.element = element
         self.sourceStr = sourceStr
         self.traceType = traceType
+        self.compiledProg = None # set when parsed, by XPathContext.compileProg
     def __repr__(self):
         return ("ProgHeader({0},{1})".format(self.name,self.modelObject))
 
+def parseError(*args, **kwargs):
+    global isCacheable
+    isCacheable = False # static errors are reported each time the expression is parsed
+    modelXbrl.error(*args, **kwargs)
+
 def pushFirst( sourceStr, loc, toks ):
     exprStack.append( toks[0] )
 
@@ -71,7 +78,9 @@ class QNameDef(ModelValue.QName):
         self.loc = loc
         self.axis = (axis or None) # store "" from rpartition of step as None
     def __hash__(self):
-        return self.qnameValueHash
+        return self.qnameId
+    def __reduce__(self): # id is reassigned when unpickled (ids vary by process)
+        return (QNameDef, (self.loc, self.prefix, self.namespaceURI, self.localName, self.isAttribute, self.axis))
     def __repr__(self):
         return ("{0}QName({1})".format('@' if self.isAttribute else '',str(self)))
     def __eq__(self,other):
@@ -95,7 +104,7 @@ def pushQName( sourceStr, loc, toks ):
     step = toks[0]
     axis, sep, qname = step.rpartition("::") # axes are not splitting correctly
     if axis not in axesSupported:
-        modelXbrl.error("err:XPST0010",
+        parseError("err:XPST0010",
             _("Axis %(axis)s is not supported in %(step)s"),
             modelObject=xmlElement,
             axis=axis, step=step)
@@ -112,7 +121,7 @@ def pushQName( sourceStr, loc, toks ):
                     if len(exprStack) == 0 or exprStack[-1] != q:
                         exprStack.append( q )
                     return q
-                modelXbrl.error("err:XPST0081",
+                parseError("err:XPST0081",
                     _("QName prefix not defined for %(name)s"),
                     modelObject=xmlElement,
                     name=qname)
@@ -120,7 +129,7 @@ def pushQName( sourceStr, loc, toks ):
             
         if (nsLocalname == (XbrlConst.xff,"uncovered-aspect","xff") and
             xmlElement.localName not in ("formula", "consistencyAssertion", "valueAssertion", "message")):
-                modelXbrl.error("xffe:invalidFunctionUse",
+                parseError("xffe:invalidFunctionUse",
                     _("Function %(name)s cannot be used on an XPath expression associated with a %(name2)s"),
                     modelObject=xmlElement,
                     name=qname, name2=xmlElement.localName)
@@ -180,7 +189,7 @@ class OperationDef:
                     prefix = toks1[:-2]
                     ns = XmlUtil.xmlns(xmlElement, prefix)
                     if ns is None:
-                        modelXbrl.error("err:XPST0081",
+                        parseError("err:XPST0081",
                             _("wildcard prefix not defined for %(token)s"),
                             modelObject=xmlElement,
                             token=toks1)
@@ -230,6 +239,7 @@ def pushUnaryOperation( sourceStr, loc, toks ):
     return operation
 
 def pushFunction( sourceStr, loc, toks ):
+    global isCacheable
     name = toks[0]
     operation = OperationDef(sourceStr, loc, name, toks, True)
     exprStack[exprStack.index(toks[0]):] = [operation]  # replace tokens with production
@@ -238,8 +248,9 @@ def pushFunction( sourceStr, loc, toks ):
         if (not name.unprefixed and 
             ns not in {XbrlConst.fn, XbrlConst.xfi, XbrlConst.xff, XbrlConst.xsd} and
             not ns.startswith("http://www.xbrl.org/inlineXBRL/transformation")):
+            isCacheable = False # custom function signatures depend on the DTS
             if name not in modelXbrl.modelCustomFunctionSignatures:
-                modelXbrl.error("xbrlve:noCustomFunctionSignature",
+                parseError("xbrlve:noCustomFunctionSignature",
                     _("No custom function signature for %(custFunction)s in %(resource)s"),
                     modelObject=xmlElement,
                     resource=xmlElement.localName,
@@ -290,7 +301,7 @@ class VariableRef:
 def pushVarRef( sourceStr, loc, toks ):
     qname = ModelValue.qname(xmlElement, toks[0][1:], noPrefixIsNoNamespace=True)
     if qname is None:
-        modelXbrl.error("err:XPST0081",
+        parseError("err:XPST0081",
             _("QName prefix not defined for variable reference $%(variable)s"),
             modelObject=xmlElement,
             variable=toks[0][1:])
@@ -630,18 +641,27 @@ def normalizeExpr(expr):
 isInitialized = False
 
 def initializeParser(modelManager):
-    global isInitialized
+    if not isInitialized:
+        if modelManager.xpathProgCache is not None:
+            return False # grammar is initialized by parse if an expression is not in the cache
+        initializeGrammar(modelManager)
+        return True # was initialized on this call
+    return False # had already been initialized
+
+def initializeGrammar(modelManager):
+    global isInitialized, exprStack
     if not isInitialized:
         modelManager.showStatus(_("initializing formula xpath2 grammar"))
         startedAt = time.time()
+        parsingExprStack = exprStack # may be initialized while parsing an expression which isn't cached
+        exprStack = []
         xpathExpr.parseString( "0", parseAll=True )
+        exprStack = parsingExprStack
         modelManager.addToLog(format_string(modelManager.locale, 
                                     _("Formula xpath2 grammar initialized in %.2f secs"), 
                                     time.time() - startedAt))
         modelManager.showStatus(None)
         isInitialized = True
-        return True # was initialized on this call
-    return False # had already been initialized
 
 def exceptionErrorIndication(exception):
     errorAt = exception.column
@@ -681,6 +701,7 @@ def parse(modelObject, xpathExpression, element, name, traceType):
     exprStack = []
     global xmlElement
     xmlElement = element
+    global isCacheable
     returnProg = None
 
     # throws ParseException
@@ -705,7 +726,17 @@ def parse(modelObject, xpathExpression, element, name, traceType):
                 source=normalizedExpr)
             exprStack.append( ProgHeader(modelObject,name,element,normalizedExpr,traceType) )
 
-            L = xpathExpr.parseString( normalizedExpr, parseAll=True )
+            progCache = modelXbrl.modelManager.xpathProgCache
+            progKey = progCache.key(normalizedExpr, element) if progCache is not None else None
+            cachedProg = progCache.get(progKey) if progKey is not None else None
+            if cachedProg is not None:
+                exprStack.extend(cachedProg)
+            else:
+                initializeGrammar(modelXbrl.modelManager)
+                isCacheable = progKey is not None
+                L = xpathExpr.parseString( normalizedExpr, parseAll=True )
+                if isCacheable:
+                    progCache.add(progKey, exprStack[1:])
             
             #modelXbrl.error( _("AST {0} {1}").format(name, L),
             #    "info", "formula:trace")
@@ -734,17 +765,10 @@ def parse(modelObject, xpathExpression, element, name, traceType):
                 error=err, 
                 source=normalizedExpr)
         
-        '''
-        code = []
-        compile(exprStack, code)
-        pyCode = ''.join(code)
-        val.modelXbrl.error(
-            _("PyCode {0} {1}").format(
-                 name,
-                 pyCode),
-            "info", "formula:trace")
-        return pyCode
-        '''
+        # compile to closures once, so evaluations don't interpret the expression stack
+        if exprStack and isinstance(exprStack[0], ProgHeader):
+            from arelle.XPathContext import compileProg
+            exprStack[0].compiledProg = compileProg(exprStack)
         returnProg = exprStack
     exprStack = [] # dereference
     xmlElement = None
@@ -783,11 +807,49 @@ def variableReferences(exprStack, varRefSet, element, rangeVars=None):
         if localRangeVar in rangeVars:
             rangeVars.remove(localRangeVar)
 
+# fn functions whose value depends only on their arguments (when they have arguments)
+argumentsOnlyFunctions = {"QName", "concat", "string-join", "dateTime", "substring", "upper-case", "lower-case",
+                          "true", "false"}
+
+def isContextItemIndependent(exprStack):
+    """True if the expression's value does not depend on the context item, such as a literal, a 
+    constructor of a literal, or an operation of variable references and literals.  (Conservative,
+    any path step or function not known to be argument-only is context dependent.)
+    """
+    for p in exprStack:
+        if isinstance(p, (ProgHeader, VariableRef, OpDef, _STR_BASE, _NUM_TYPES)):
+            continue
+        elif isinstance(p, QNameDef): # name test of a path step
+            return False
+        elif isinstance(p, OperationDef):
+            if isinstance(p.name, QNameDef): # function call
+                if not ((p.name.namespaceURI == XbrlConst.xsd and p.args) or
+                        (p.name.namespaceURI in (XbrlConst.fn, None) and p.name.localName in argumentsOnlyFunctions and
+                         (p.args or p.name.localName in ("true", "false")))):
+                    return False
+            elif p.name in (".", "..", "contextItem", "contextItemParent", "rootChild", "rootDescendant", "/", "//", "predicate"):
+                return False
+            if not isContextItemIndependent(p.args):
+                return False
+        elif isinstance(p, Expr):
+            if not isContextItemIndependent(p.expr):
+                return False
+        elif isinstance(p, RangeDecl):
+            if not isContextItemIndependent(p.bindingSeq):
+                return False
+        elif hasattr(p, '__iter__'):
+            if not isContextItemIndependent(p):
+                return False
+        else:
+            return False
+    return True
+
 def clearProg(exprStack):
     if exprStack:
         for p in exprStack:
             if isinstance(p, ProgHeader):
                 p.element = None
+                p.compiledProg = None
                 break
         del exprStack[:]
     
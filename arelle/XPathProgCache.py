@@ -0,0 +1,111 @@
+'''
+Created on Oct 18, 2026
+
+Persistent cache of parsed XPath programs, so that unchanged formula linkbases load without parsing
+their expressions (and without initializing the XPath 2 grammar, when every expression is cached).
+
+Programs are keyed by their normalized expression text, the namespace bindings in scope of the
+expression's element, and the element's local name (which determines some static errors), and are
+only cached if they parsed with no errors and call no custom functions (whose signatures depend on
+the loaded DTS).  The cache is versioned by the parser module, so a changed parser reparses all.
+
+@author: Mark V Systems Limited
+(c) Copyright 2026 Mark V Systems Limited, All rights reserved.
+'''
+import os, io, pickle
+from arelle import Version
+
+XPATH_PROG_CACHE_VERSION = 1
+
+def parserVersion():
+    from arelle import XPathParser
+    try:
+        parserFile = XPathParser.__file__
+        return (XPATH_PROG_CACHE_VERSION, Version.version, os.path.getmtime(parserFile), os.path.getsize(parserFile))
+    except (AttributeError, EnvironmentError):
+        return (XPATH_PROG_CACHE_VERSION, Version.version)
+
+class XPathProgCache:
+    """
+    .. class:: XPathProgCache(modelManager)
+
+    Parsed XPath programs (expression stacks without their program header), by expression key,
+    persisted in the user application directory as xpathProgCache.pickle.
+
+        .. attribute:: progs
+
+        Dict by expression key of pickled expression stack
+    """
+    def __init__(self, modelManager):
+        self.modelManager = modelManager
+        cntlr = modelManager.cntlr
+        self.progs = {}
+        self.isModified = False
+        self.version = parserVersion()
+        if cntlr.hasFileSystem:
+            self.cachePickleFile = cntlr.userAppDir + os.sep + "xpathProgCache.pickle"
+            try:
+                with io.open(self.cachePickleFile, 'rb') as f:
+                    cache = pickle.load(f)
+                if cache.get("version") == self.version:
+                    self.progs = cache.get("progs", {})
+            except Exception:
+                pass # no cache or cache of an unreadable format, start a new one
+        else:
+            self.cachePickleFile = None
+
+    @staticmethod
+    def key(normalizedExpr, element):
+        """Returns the cache key of an expression, or None if its element's namespace bindings aren't known
+
+        :param normalizedExpr: expression text, after end of line normalization
+        :type normalizedExpr: str
+        :param element: element of the expression (providing its in-scope namespace prefixes)
+        :type element: ModelObject
+        """
+        nsmap = getattr(element, "nsmap", None)
+        if nsmap is None:
+            return None
+        return "{0}\n{1}\n{2}".format(element.localName if hasattr(element, "localName") else "",
+                                      sorted((prefix or "", ns) for prefix, ns in nsmap.items()),
+                                      normalizedExpr)
+
+    def get(self, key):
+        """Returns a new copy of the cached expression stack (without program header) for key, or None
+
+        :param key: expression key
+        :type key: str
+        :returns: list -- expression stack objects or None if not cached
+        """
+        pickledProg = self.progs.get(key)
+        if pickledProg is not None:
+            try:
+                return pickle.loads(pickledProg)
+            except Exception:
+                del self.progs[key] # not loadable by this parser version
+                self.isModified = True
+        return None
+
+    def add(self, key, exprStack):
+        """Adds a parsed expression stack (without program header)
+
+        :param key: expression key
+        :type key: str
+        :param exprStack: expression stack objects following the program header
+        :type exprStack: list
+        """
+        try:
+            self.progs[key] = pickle.dumps(exprStack, pickle.HIGHEST_PROTOCOL)
+            self.isModified = True
+        except Exception:
+            pass # expression has an object which can't be cached, parse it each time
+
+    def save(self):
+        if self.isModified and self.cachePickleFile:
+            with io.open(self.cachePickleFile, 'wb') as f:
+                pickle.dump({"version": self.version, "progs": self.progs}, f, pickle.HIGHEST_PROTOCOL)
+        self.isModified = False
+
+    def clear(self):
+        self.progs.clear()
+        self.isModified = True
@@ -75,6 +75,11 @@ predefinedAttributeTypes = {
 
 xAttributesSharedEmptyDict = {}
 
+# memoized valid (facets, xValid, xValue, sValue, normalized value) by (baseXsdType, id(facets), lexical value)
+VALIDATED_VALUES_CACHE_SIZE = 65536
+validatedValues = {}
+elementDependentXsdTypes = {"QName"} # value depends on the element's in-scope namespaces
+
 def xhtmlValidate(modelXbrl, elt):
     from lxml.etree import DTD, XMLSyntaxError
     # copy xhtml elements to fresh tree
@@ -264,168 +269,54 @@ def validateValue(modelXbrl, elt, attrTag, baseXsdType, value, isNillable=False,
                 baseXsdType not in ("anyType", "string", "normalizedString", "token", "NMTOKEN", "anyURI", "noContent")):
                 raise ValueError("missing value for not nillable element")
             '''
-            xValid = VALID
-            whitespaceReplace = (baseXsdType == "normalizedString")
-            whitespaceCollapse = (not whitespaceReplace and baseXsdType != "string")
-            pattern = baseXsdTypePatterns.get(baseXsdType)
-            if facets:
-                if "pattern" in facets:
-                    pattern = facets["pattern"]
-                    # note multiple patterns are or'ed togetner, which isn't yet implemented!
-                if "whiteSpace" in facets:
-                    whitespaceReplace, whitespaceCollapse = {"preserve":(False,False), "replace":(True,False), "collapse":(False,True)}[facets["whiteSpace"]]
-            if whitespaceReplace:
-                value = normalizeWhitespacePattern.sub(' ', value)
-            elif whitespaceCollapse:
-                value = collapseWhitespacePattern.sub(' ', value.strip())
-            if baseXsdType == "noContent":
-                if len(value) > 0 and not value.isspace():
-                    raise ValueError("value content not permitted")
-                xValue = sValue = None
-            elif not value and isNil and isNillable: # rest of types get None if nil/empty value
-                xValue = sValue = None
+            # valid values of types not dependent on the element are memoized by type, facets and lexical value
+            # (cache entries hold their facets, so a facets id is not reused while its entry exists)
+            if isNil or baseXsdType in elementDependentXsdTypes:
+                cacheKey = cachedValue = None
+            else:
+                cacheKey = (baseXsdType, id(facets), value)
+                cachedValue = validatedValues.get(cacheKey)
+            if cachedValue is not None:
+                xValid, xValue, sValue, value = cachedValue[1:]
             else:
-                if pattern is not None and pattern.match(value) is None:
-                        raise ValueError("pattern facet " + facets["pattern"].pattern if facets and "pattern" in facets else "pattern mismatch")
+                whitespaceReplace = (baseXsdType == "normalizedString")
+                whitespaceCollapse = (not whitespaceReplace and baseXsdType != "string")
+                pattern = baseXsdTypePatterns.get(baseXsdType)
                 if facets:
-                    if "enumeration" in facets and value not in facets["enumeration"]:
-                        raise ValueError("{0} is not in {1}".format(value, facets["enumeration"]))
-                    if "length" in facets and len(value) != facets["length"]:
-                        raise ValueError("length {0}, expected {1}".format(len(value), facets["length"]))
-                    if "minLength" in facets and len(value) < facets["minLength"]:
-                        raise ValueError("length {0}, minLength {1}".format(len(value), facets["minLength"]))
-                    if "maxLength" in facets and len(value) > facets["maxLength"]:
-                        raise ValueError("length {0}, maxLength {1}".format(len(value), facets["maxLength"]))
-                if baseXsdType in {"string", "normalizedString", "language", "token", "NMTOKEN","Name","NCName","IDREF","ENTITY"}:
-                    xValue = sValue = value
-                elif baseXsdType == "ID":
-                    xValue = sValue = value
-                    xValid = VALID_ID
-                elif baseXsdType == "anyURI":
-                    if value:  # allow empty strings to be valid anyURIs
-                        if UrlUtil.relativeUrlPattern.match(value) is None:
-                            raise ValueError("IETF RFC 2396 4.3 syntax")
-                    # encode PSVI xValue similarly to Xerces and other implementations
-                    xValue = anyURI(UrlUtil.anyUriQuoteForPSVI(value))
-                    sValue = value
-                elif baseXsdType in ("decimal", "float", "double"):
-                    xValue = sValue = float(value)
-                    if facets:
-                        if "totalDigits" in facets and len(value.replace(".","")) > facets["totalDigits"]:
-                            raise ValueError("totalDigits facet {0}".format(facets["totalDigits"]))
-                        if "fractionDigits" in facets and ( '.' in value and
-                            len(value[value.index('.') + 1:]) > facets["fractionDigits"]):
-                            raise ValueError("fraction digits facet {0}".format(facets["fractionDigits"]))
-                        if "maxInclusive" in facets and xValue > facets["maxInclusive"]:
-                            raise ValueError(" > maxInclusive {0}".format(facets["maxInclusive"]))
-                        if "maxExclusive" in facets and xValue >= facets["maxExclusive"]:
-                            raise ValueError(" >= maxInclusive {0}".format(facets["maxExclusive"]))
-                        if "minInclusive" in facets and xValue < facets["minInclusive"]:
-                            raise ValueError(" < minInclusive {0}".format(facets["minInclusive"]))
-                        if "minExclusive" in facets and xValue <= facets["minExclusive"]:
-                            raise ValueError(" <= minExclusive {0}".format(facets["minExclusive"]))
-                elif baseXsdType in {"integer",
-                                     "nonPositiveInteger","negativeInteger","nonNegativeInteger","positiveInteger",
-                                     "long","unsignedLong",
-                                     "int","unsignedInt",
-                                     "short","unsignedShort",
-                                     "byte","unsignedByte"}:
-                    xValue = sValue = _INT(value)
-                    if ((baseXsdType in {"nonNegativeInteger","unsignedLong","unsignedInt"} 
-                         and xValue < 0) or
-                        (baseXsdType == "nonPositiveInteger" and xValue > 0) or
-                        (baseXsdType == "positiveInteger" and xValue <= 0) or
-                        (baseXsdType == "byte" and not -128 <= xValue < 127) or
-                        (baseXsdType == "unsignedByte" and not 0 <= xValue < 255) or
-                        (baseXsdType == "short" and not -32768 <= xValue < 32767) or
-                        (baseXsdType == "unsignedShort" and not 0 <= xValue < 65535) or
-                        (baseXsdType == "positiveInteger" and xValue <= 0)):
-                        raise ValueError("{0} is not {1}".format(value, baseXsdType))
-                    if facets:
-                        if "totalDigits" in facets and len(value.replace(".","")) > facets["totalDigits"]:
-                            raise ValueError("totalDigits facet {0}".format(facets["totalDigits"]))
-                        if "fractionDigits" in facets and ( '.' in value and
-                            len(value[value.index('.') + 1:]) > facets["fractionDigits"]):
-                            raise ValueError("fraction digits facet {0}".format(facets["fractionDigits"]))
-                        if "maxInclusive" in facets and xValue > facets["maxInclusive"]:
-                            raise ValueError(" > maxInclusive {0}".format(facets["maxInclusive"]))
-                        if "maxExclusive" in facets and xValue >= facets["maxExclusive"]:
-                            raise ValueError(" >= maxInclusive {0}".format(facets["maxExclusive"]))
-                        if "minInclusive" in facets and xValue < facets["minInclusive"]:
-                            raise ValueError(" < minInclusive {0}".format(facets["minInclusive"]))
-                        if "minExclusive" in facets and xValue <= facets["minExclusive"]:
-                            raise ValueError(" <= minExclusive {0}".format(facets["minExclusive"]))
-                elif baseXsdType == "boolean":
-                    if value in ("true", "1"):  
-                        xValue = sValue = True
-                    elif value in ("false", "0"): 
-                        xValue = sValue = False
-                    else: raise ValueError
-                elif baseXsdType == "QName":
-                    xValue = qname(elt, value, castException=ValueError, prefixException=ValueError)
-                    sValue = value
-                    ''' not sure here, how are explicitDimensions validated, but bad units not?
-                    if xValue.namespaceURI in modelXbrl.namespaceDocs:
-                        if (xValue not in modelXbrl.qnameConcepts and 
-                            xValue not in modelXbrl.qnameTypes and
-                            xValue not in modelXbrl.qnameAttributes and
-                            xValue not in modelXbrl.qnameAttributeGroups):
-                            raise ValueError("qname not defined " + str(xValue))
-                    '''
-                elif baseXsdType in ("XBRLI_DECIMALSUNION", "XBRLI_PRECISIONUNION"):
-                    xValue = sValue = value if value == "INF" else _INT(value)
-                elif baseXsdType in ("XBRLI_NONZERODECIMAL"):
-                    xValue = sValue = _INT(value)
-                    if xValue == 0:
-                        raise ValueError("invalid value")
-                elif baseXsdType == "XBRLI_DATEUNION":
-                    xValue = dateTime(value, type=DATEUNION, castException=ValueError)
-                    sValue = value
-                elif baseXsdType == "dateTime":
-                    xValue = dateTime(value, type=DATETIME, castException=ValueError)
-                    sValue = value
-                elif baseXsdType == "date":
-                    xValue = dateTime(value, type=DATE, castException=ValueError)
-                    sValue = value
-                elif baseXsdType == "regex-pattern":
-                    # for facet compiling
-                    try:
-                        sValue = value
-                        if value in xmlSchemaPatterns:
-                            xValue = xmlSchemaPatterns[value]
-                        else:
-                            if r"\i" in value or r"\c" in value:
-                                value = value.replace(r"\i", iNameChar).replace(r"\c", cNameChar)
-                            xValue = re.compile(value + "$") # must match whole string
-                    except Exception as err:
-                        raise ValueError(err)
+                    if "pattern" in facets:
+                        pattern = facets["pattern"]
+                        # note multiple patterns are or'ed togetner, which isn't yet implemented!
+                    if "whiteSpace" in facets:
+                        whitespaceReplace, whitespaceCollapse = {"preserve":(False,False), "replace":(True,False), "collapse":(False,True)}[facets["whiteSpace"]]
+                if whitespaceReplace:
+                    value = normalizeWhitespacePattern.sub(' ', value)
+                elif whitespaceCollapse:
+                    value = collapseWhitespacePattern.sub(' ', value.strip())
+                if baseXsdType == "noContent":
+                    if len(value) > 0 and not value.isspace():
+                        raise ValueError("value content not permitted")
+                    xValid = VALID
+                    xValue = sValue = None
+                elif not value and isNil and isNillable: # rest of types get None if nil/empty value
+                    xValid = VALID
+                    xValue = sValue = None
                 else:
-                    if baseXsdType in lexicalPatterns:
-                        match = lexicalPatterns[baseXsdType].match(value)
-                        if match is None:
-                            raise ValueError("lexical pattern mismatch")
-                        if baseXsdType == "gMonthDay":
-                            month, day, zSign, zHrMin, zHr, zMin = match.groups()
-                            if int(day) > {2:29, 4:30, 6:30, 9:30, 11:30, 1:31, 3:31, 5:31, 7:31, 8:31, 10:31, 12:31}[int(month)]:
-                                raise ValueError("invalid day {0} for month {1}".format(day, month))
-                            xValue = gMonthDay(month, day)
-                        elif baseXsdType == "gYearMonth":
-                            year, month, zSign, zHrMin, zHr, zMin = match.groups()
-                            xValue = gYearMonth(year, month)
-                        elif baseXsdType == "gYear":
-                            year, zSign, zHrMin, zHr, zMin = match.groups()
-                            xValue = gYear(year)
-                        elif baseXsdType == "gMonth":
-                            month, zSign, zHrMin, zHr, zMin = match.groups()
-                            xValue = gMonth(month)
-                        elif baseXsdType == "gDay":
-                            day, zSign, zHrMin, zHr, zMin = match.groups()
-                            xValue = gDay(day)
-                        else:
-                            xValue = value
-                    else: # no lexical pattern, forget compiling value
-                        xValue = value
-                    sValue = value
+                    if pattern is not None and pattern.match(value) is None:
+                            raise ValueError("pattern facet " + facets["pattern"].pattern if facets and "pattern" in facets else "pattern mismatch")
+                    if facets:
+                        if "enumeration" in facets and value not in facets["enumeration"]:
+                            raise ValueError("{0} is not in {1}".format(value, facets["enumeration"]))
+                        if "length" in facets and len(value) != facets["length"]:
+                            raise ValueError("length {0}, expected {1}".format(len(value), facets["length"]))
+                        if "minLength" in facets and len(value) < facets["minLength"]:
+                            raise ValueError("length {0}, minLength {1}".format(len(value), facets["minLength"]))
+                        if "maxLength" in facets and len(value) > facets["maxLength"]:
+                            raise ValueError("length {0}, maxLength {1}".format(len(value), facets["maxLength"]))
+                    xValid, xValue, sValue = baseXsdTypeValidators.get(baseXsdType, validateLexicalValue)(elt, baseXsdType, value, facets)
+                if cacheKey is not None:
+                    if len(validatedValues) >= VALIDATED_VALUES_CACHE_SIZE:
+                        validatedValues.clear()
+                    validatedValues[cacheKey] = (facets, xValid, xValue, sValue, value)
         except ValueError as err:
             if ModelInlineFact is not None and isinstance(elt, ModelInlineFact):
                 errElt = "{0} fact {1}".format(elt.elementQname, elt.qname)
@@ -465,6 +356,161 @@ def validateValue(modelXbrl, elt, attrTag, baseXsdType, value, isNillable=False,
         elt.xValue = xValue
         elt.sValue = sValue
 
+def validateStringValue(elt, baseXsdType, value, facets):
+    return VALID, value, value
+
+def validateIDValue(elt, baseXsdType, value, facets):
+    return VALID_ID, value, value
+
+def validateAnyURIValue(elt, baseXsdType, value, facets):
+    if value:  # allow empty strings to be valid anyURIs
+        if UrlUtil.relativeUrlPattern.match(value) is None:
+            raise ValueError("IETF RFC 2396 4.3 syntax")
+    # encode PSVI xValue similarly to Xerces and other implementations
+    return VALID, anyURI(UrlUtil.anyUriQuoteForPSVI(value)), value
+
+def validateNumericFacets(value, xValue, facets):
+    if facets:
+        if "totalDigits" in facets and len(value.replace(".","")) > facets["totalDigits"]:
+            raise ValueError("totalDigits facet {0}".format(facets["totalDigits"]))
+        if "fractionDigits" in facets and ( '.' in value and
+            len(value[value.index('.') + 1:]) > facets["fractionDigits"]):
+            raise ValueError("fraction digits facet {0}".format(facets["fractionDigits"]))
+        if "maxInclusive" in facets and xValue > facets["maxInclusive"]:
+            raise ValueError(" > maxInclusive {0}".format(facets["maxInclusive"]))
+        if "maxExclusive" in facets and xValue >= facets["maxExclusive"]:
+            raise ValueError(" >= maxInclusive {0}".format(facets["maxExclusive"]))
+        if "minInclusive" in facets and xValue < facets["minInclusive"]:
+            raise ValueError(" < minInclusive {0}".format(facets["minInclusive"]))
+        if "minExclusive" in facets and xValue <= facets["minExclusive"]:
+            raise ValueError(" <= minExclusive {0}".format(facets["minExclusive"]))
+
+def validateFloatValue(elt, baseXsdType, value, facets):
+    xValue = float(value)
+    validateNumericFacets(value, xValue, facets)
+    return VALID, xValue, xValue
+
+def validateIntegerValue(elt, baseXsdType, value, facets):
+    xValue = _INT(value)
+    if ((baseXsdType in {"nonNegativeInteger","unsignedLong","unsignedInt"} 
+         and xValue < 0) or
+        (baseXsdType == "nonPositiveInteger" and xValue > 0) or
+        (baseXsdType == "positiveInteger" and xValue <= 0) or
+        (baseXsdType == "byte" and not -128 <= xValue < 127) or
+        (baseXsdType == "unsignedByte" and not 0 <= xValue < 255) or
+        (baseXsdType == "short" and not -32768 <= xValue < 32767) or
+        (baseXsdType == "unsignedShort" and not 0 <= xValue < 65535) or
+        (baseXsdType == "positiveInteger" and xValue <= 0)):
+        raise ValueError("{0} is not {1}".format(value, baseXsdType))
+    validateNumericFacets(value, xValue, facets)
+    return VALID, xValue, xValue
+
+def validateBooleanValue(elt, baseXsdType, value, facets):
+    if value in ("true", "1"):  
+        return VALID, True, True
+    elif value in ("false", "0"): 
+        return VALID, False, False
+    raise ValueError
+
+def validateQNameValue(elt, baseXsdType, value, facets):
+    xValue = qname(elt, value, castException=ValueError, prefixException=ValueError)
+    ''' not sure here, how are explicitDimensions validated, but bad units not?
+    if xValue.namespaceURI in modelXbrl.namespaceDocs:
+        if (xValue not in modelXbrl.qnameConcepts and 
+            xValue not in modelXbrl.qnameTypes and
+            xValue not in modelXbrl.qnameAttributes and
+            xValue not in modelXbrl.qnameAttributeGroups):
+            raise ValueError("qname not defined " + str(xValue))
+    '''
+    return VALID, xValue, value
+
+def validateDecimalsUnionValue(elt, baseXsdType, value, facets):
+    xValue = value if value == "INF" else _INT(value)
+    return VALID, xValue, xValue
+
+def validateNonZeroDecimalValue(elt, baseXsdType, value, facets):
+    xValue = _INT(value)
+    if xValue == 0:
+        raise ValueError("invalid value")
+    return VALID, xValue, xValue
+
+def validateDateUnionValue(elt, baseXsdType, value, facets):
+    return VALID, dateTime(value, type=DATEUNION, castException=ValueError), value
+
+def validateDateTimeValue(elt, baseXsdType, value, facets):
+    return VALID, dateTime(value, type=DATETIME, castException=ValueError), value
+
+def validateDateValue(elt, baseXsdType, value, facets):
+    return VALID, dateTime(value, type=DATE, castException=ValueError), value
+
+def validateRegexPatternValue(elt, baseXsdType, value, facets):
+    # for facet compiling
+    try:
+        sValue = value
+        if value in xmlSchemaPatterns:
+            xValue = xmlSchemaPatterns[value]
+        else:
+            if r"\i" in value or r"\c" in value:
+                value = value.replace(r"\i", iNameChar).replace(r"\c", cNameChar)
+            xValue = re.compile(value + "$") # must match whole string
+    except Exception as err:
+        raise ValueError(err)
+    return VALID, xValue, sValue
+
+def validateLexicalValue(elt, baseXsdType, value, facets):
+    if baseXsdType in lexicalPatterns:
+        match = lexicalPatterns[baseXsdType].match(value)
+        if match is None:
+            raise ValueError("lexical pattern mismatch")
+        if baseXsdType == "gMonthDay":
+            month, day, zSign, zHrMin, zHr, zMin = match.groups()
+            if int(day) > {2:29, 4:30, 6:30, 9:30, 11:30, 1:31, 3:31, 5:31, 7:31, 8:31, 10:31, 12:31}[int(month)]:
+                raise ValueError("invalid day {0} for month {1}".format(day, month))
+            xValue = gMonthDay(month, day)
+        elif baseXsdType == "gYearMonth":
+            year, month, zSign, zHrMin, zHr, zMin = match.groups()
+            xValue = gYearMonth(year, month)
+        elif baseXsdType == "gYear":
+            year, zSign, zHrMin, zHr, zMin = match.groups()
+            xValue = gYear(year)
+        elif baseXsdType == "gMonth":
+            month, zSign, zHrMin, zHr, zMin = match.groups()
+            xValue = gMonth(month)
+        elif baseXsdType == "gDay":
+            day, zSign, zHrMin, zHr, zMin = match.groups()
+            xValue = gDay(day)
+        else:
+            xValue = value
+    else: # no lexical pattern, forget compiling value
+        xValue = value
+    return VALID, xValue, value
+
+# validator by base xsd type, returning (xValid, xValue, sValue) of a whitespace-normalized value, other types are validated lexically
+baseXsdTypeValidators = {
+    "ID": validateIDValue,
+    "anyURI": validateAnyURIValue,
+    "boolean": validateBooleanValue,
+    "QName": validateQNameValue,
+    "XBRLI_DECIMALSUNION": validateDecimalsUnionValue,
+    "XBRLI_PRECISIONUNION": validateDecimalsUnionValue,
+    "XBRLI_NONZERODECIMAL": validateNonZeroDecimalValue,
+    "XBRLI_DATEUNION": validateDateUnionValue,
+    "dateTime": validateDateTimeValue,
+    "date": validateDateValue,
+    "regex-pattern": validateRegexPatternValue}
+for _baseXsdType in ("string", "normalizedString", "language", "token", "NMTOKEN", "Name", "NCName", "IDREF", "ENTITY"):
+    baseXsdTypeValidators[_baseXsdType] = validateStringValue
+for _baseXsdType in ("decimal", "float", "double"):
+    baseXsdTypeValidators[_baseXsdType] = validateFloatValue
+for _baseXsdType in ("integer",
+                     "nonPositiveInteger","negativeInteger","nonNegativeInteger","positiveInteger",
+                     "long","unsignedLong",
+                     "int","unsignedInt",
+                     "short","unsignedShort",
+                     "byte","unsignedByte"):
+    baseXsdTypeValidators[_baseXsdType] = validateIntegerValue
+del _baseXsdType
+
 def validateFacet(typeElt, facetElt):
     facetName = facetElt.localName
     value = facetElt.get("value")
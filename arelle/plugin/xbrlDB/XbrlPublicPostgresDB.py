@@ -37,9 +37,20 @@ windows
    arelleCmdLine --plugin "+xbrlDB|show"
    arelleCmdLine -f http://sec.org/somewhere/some.rss -v --store-to-XBRL-DB "myserver.com,portnumber,pguser,pgpasswd,database,timeoutseconds"
 
+Tables of many rows (such as facts, contexts and their dimensions) are bulk loaded by COPY into
+temporary staging tables, from which their new rows are inserted and ids resolved by set-based
+statements.  An optional seventh connection string parameter, chunkSize, loads such tables in
+chunks of that many rows, committing each chunk (otherwise the accession is one transaction).
+
+The items of an RSS feed validated in worker processes are stored on a connection kept open by each
+worker process for its next items, and the ids of taxonomy-level rows (uris, qnames, documents, elements and resources) are kept with the connection, so that rows
+shared by filings are only inserted (or looked up) once per connection.  A filing conflicting with
+the same rows being inserted concurrently by another connection is rolled back and stored again, in
+one transaction, unless chunks of it had already been committed.
+
 '''
 
-import os, sys, io, re, time, datetime
+import os, sys, io, re, time, datetime, atexit
 from math import isnan, isinf
 from pg8000 import DBAPI
 from pg8000.errors import CursorClosedError, ConnectionClosedError, InterfaceError, ProgrammingError
@@ -52,22 +63,56 @@ from arelle import XbrlConst
 TRACESQLFILE = None
 #TRACESQLFILE = r"c:\temp\sqltrace.log"  # uncomment to trace SQL on connection (very big file!!!)
 
+COPY_MIN_ROWS = 100 # tables of at least this many rows are loaded by COPY into a staging table
+
+UNIQUE_VIOLATION = '23505' # SQLSTATE of rows inserted concurrently by another connection
+
+keptConnections = {} # (host, port, user, database): connection kept open for subsequent filings
+
 def insertIntoDB(modelXbrl, 
                  user=None, password=None, host=None, port=None, database=None, timeout=None,
-                 rssItem=None):
-    xpgdb = None
-    try:
-        xpgdb = XbrlPostgresDatabaseConnection(modelXbrl, user, password, host, port, database, timeout)
-        xpgdb.verifyTables()
-        xpgdb.insertXbrl(rssItem=rssItem)
-        xpgdb.close()
-    except Exception as ex:
-        if xpgdb is not None:
-            try:
-                xpgdb.close(rollback=True)
-            except Exception as ex2:
-                pass
-        raise # reraise original exception with original traceback    
+                 rssItem=None, chunkSize=None, keepOpen=False):
+    connectionKey = (host, port, user, database)
+    for retry in (False, True):
+        xpgdb = None
+        try:
+            xpgdb = keptConnections.pop(connectionKey, None)
+            if xpgdb is None:
+                xpgdb = XbrlPostgresDatabaseConnection(modelXbrl, user, password, host, port, database, timeout, chunkSize)
+                xpgdb.verifyTables()
+            else:
+                xpgdb.modelXbrl = modelXbrl
+            if retry:
+                xpgdb.chunkSize = None # stored again in one transaction, nothing is committed unless all is
+            xpgdb.insertXbrl(rssItem=rssItem)
+            xpgdb.modelXbrl = None # don't keep the filing's model with a kept connection
+            if keepOpen:
+                xpgdb.chunkSize = chunkSize
+                if not keptConnections:
+                    atexit.register(closeKeptConnections)
+                keptConnections[connectionKey] = xpgdb
+            else:
+                xpgdb.close()
+            return
+        except Exception as ex:
+            chunksCommitted = xpgdb is None or xpgdb.chunksCommitted
+            if xpgdb is not None:
+                try:
+                    xpgdb.close(rollback=True)
+                except Exception as ex2:
+                    pass
+            if (not retry and not chunksCommitted and 
+                isinstance(ex, ProgrammingError) and UNIQUE_VIOLATION in ex.args):
+                continue # nothing of the filing was committed, rows committed by the other connection are found when stored again
+            raise # reraise original exception with original traceback    
+        
+def closeKeptConnections():
+    for xpgdb in keptConnections.values():
+        try:
+            xpgdb.close()
+        except Exception:
+            pass
+    keptConnections.clear()
     
 def isDBPort(host, port, timeout=10):
     # determine if postgres port
@@ -125,6 +170,42 @@ def dbNum(num):
         return num
     return None 
 
+def copyValue(col):
+    # column value in COPY text format
+    if isinstance(col, bool):
+        return 't' if col else 'f'
+    elif isinstance(col, (int,float)):
+        col = dbNum(col) # NaN and INF are NULL, as by dbNum in VALUES statements
+    if col is None:
+        return '\\N'
+    elif isinstance(col, (int,float)):
+        return str(col)
+    return str(col).replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+
+class CopyRowsStream():
+    # file-like reader of rows in COPY text format, formatted as they are read (so rows
+    # may be generated while being sent), up to maxRows rows if specified
+    def __init__(self, rows, maxRows=None):
+        self.rows = rows
+        self.maxRows = maxRows
+        self.rowCount = 0
+        self.buffer = b''
+        
+    def read(self, size=-1):
+        while ((size is None or size < 0 or len(self.buffer) < size) and 
+               (not self.maxRows or self.rowCount < self.maxRows)):
+            try:
+                row = next(self.rows)
+            except StopIteration:
+                break
+            self.buffer += ('\t'.join(copyValue(col) for col in row) + '\n').encode('utf-8')
+            self.rowCount += 1
+        if size is None or size < 0:
+            data, self.buffer = self.buffer, b''
+        else:
+            data, self.buffer = self.buffer[:size], self.buffer[size:]
+        return data
+
 class XPDBException(Exception):
     def __init__(self, code, message, **kwargs ):
         self.code = code
@@ -137,7 +218,7 @@ class XPDBException(Exception):
 
 
 class XbrlPostgresDatabaseConnection():
-    def __init__(self, modelXbrl, user, password, host, port, database, timeout):
+    def __init__(self, modelXbrl, user, password, host, port, database, timeout, chunkSize=None):
         self.modelXbrl = modelXbrl
         self.disclosureSystem = modelXbrl.modelManager.disclosureSystem
         self.conn = DBAPI.connect(user=user, password=password, host=host, 
@@ -145,7 +226,16 @@ class XbrlPostgresDatabaseConnection():
                                   database=database, 
                                   socket_timeout=timeout or 60)
         self.tableColTypes = {}
+        self.stagingTables = {} # (table, newCols): temporary table for COPY of rows of those columns
+        self.chunkSize = chunkSize # rows per COPY and commit, else entire table in one transaction
+        self.chunksCommitted = False # true when chunks of the filing being stored have been committed
         self.accessionId = "(None)"
+        # ids of taxonomy-level rows, kept for filings subsequently stored on this connection
+        self.uriId = {}
+        self.qnameId = {}
+        self.documentIds = {}
+        self.elementId = {}
+        self.resourceId = {}
                 
     def close(self, rollback=False):
         try:
@@ -330,7 +420,9 @@ class XbrlPostgresDatabaseConnection():
     def getTable(self, table, idCol, newCols, matchCols, data, commit=False, comparisonOperator='='):
         # note: comparison by = will never match NULL fields
         # use 'IS NOT DISTINCT FROM' to match nulls, but this is not indexed and verrrrry slooooow
-        if not data or not newCols or not matchCols:
+        if not hasattr(data, "__len__") and not hasattr(self.cursor, "copy_from"):
+            data = tuple(data) # rows of a generator are materialized for the VALUES clause
+        if (hasattr(data, "__len__") and not data) or not newCols or not matchCols:
             # nothing can be done, just return
             return () # place breakpoint here to debug
         returningCols = []
@@ -347,6 +439,10 @@ class XbrlPostgresDatabaseConnection():
             raise XPDBException("xpgDB:MissingColumnDefinition",
                                 _("Table %(table)s column definition missing: %(missingColumnName)s"),
                                 table=table, missingColumnName=str(err)) 
+        if (hasattr(self.cursor, "copy_from") and
+            (not hasattr(data, "__len__") or len(data) >= COPY_MIN_ROWS)):
+            return self.copyTable(table, newCols, matchCols, returningCols, colTypeFunction, data, 
+                                  commit, comparisonOperator)
         rowValues = []
         for row in data:
             colValues = []
@@ -408,8 +504,76 @@ WITH row_values (%(newCols)s) AS (
                            for i, colValue in enumerate(row))
                      for row in tableRows)
         
+    def stagingTable(self, table, newCols):
+        # temporary table (for the session) with the types of table's newCols
+        try:
+            return self.stagingTables[(table, newCols)]
+        except KeyError:
+            stagingTable = "staging_{0}_{1}".format(table, len(self.stagingTables))
+            self.execute("CREATE TEMPORARY TABLE %s AS SELECT %s FROM %s WITH NO DATA;" % 
+                         (stagingTable, ', '.join(newCols), table),
+                         close=False, fetch=False)
+            self.stagingTables[(table, newCols)] = stagingTable
+            return stagingTable
+        
+    def copyTable(self, table, newCols, matchCols, returningCols, colTypeFunction, data, commit, comparisonOperator):
+        # same as getTable, with rows streamed by COPY into a staging table instead of sql text
+        stagingTable = self.stagingTable(table, newCols)
+        # insert new rows, return id and cols of new and existing rows
+        sql = '''
+WITH insertions AS (
+  INSERT INTO %(table)s (%(newCols)s)
+  SELECT %(newCols)s
+  FROM %(stagingTable)s v
+  WHERE NOT EXISTS (SELECT 1 
+                    FROM %(table)s x 
+                    WHERE %(match)s)
+  RETURNING %(returningCols)s
+)
+(  SELECT %(x_returningCols)s
+   FROM %(table)s x JOIN %(stagingTable)s v ON (%(match)s)
+) UNION ( 
+   SELECT %(returningCols)s
+   FROM insertions
+);''' %     {"table": table,
+             "stagingTable": stagingTable,
+             "newCols": ', '.join(newCols),
+             "returningCols": ', '.join(returningCols),
+             "x_returningCols": ', '.join('x.{0}'.format(c) for c in returningCols),
+             "match": ' AND '.join('x.{0} {1} v.{0}'.format(col, comparisonOperator) 
+                                for col in matchCols)
+             }
+        rows = iter(data)
+        tableRows = []
+        while True:
+            self.execute("TRUNCATE %s;" % stagingTable, close=False, fetch=False)
+            stream = CopyRowsStream(rows, self.chunkSize)
+            self.cursor.copy_from(stream, query="COPY %s (%s) FROM STDIN;" % (stagingTable, ', '.join(newCols)))
+            if stream.rowCount == 0:
+                break
+            if TRACESQLFILE:
+                with io.open(TRACESQLFILE, "a", encoding='utf-8') as fh:
+                    fh.write("\n\n>>> accession {0} table {1} copied row count {2}\n"
+                             .format(self.accessionId, table, stream.rowCount))
+                    fh.write(sql)
+            chunkRows = self.execute(sql, commit=commit or bool(self.chunkSize), close=False)
+            if self.chunkSize:
+                self.chunksCommitted = True
+            if TRACESQLFILE:
+                with io.open(TRACESQLFILE, "a", encoding='utf-8') as fh:
+                    fh.write("\n\n>>> accession {0} table {1} result row count {2}\n"
+                             .format(self.accessionId, table, len(chunkRows)))
+            tableRows.extend(chunkRows)
+            if not self.chunkSize or stream.rowCount < self.chunkSize:
+                break
+        return tuple(tuple(None if colValue is None else
+                           colTypeFunction[i](colValue)  # convert to int, datetime, etc
+                           for i, colValue in enumerate(row))
+                     for row in tableRows)
+        
     def insertXbrl(self, rssItem):
         try:
+            self.chunksCommitted = False
             # must also have default dimensions loaded
             from arelle import ValidateXbrlDimensions
             ValidateXbrlDimensions.loadDimensionDefaults(self.modelXbrl)
@@ -469,14 +633,14 @@ WITH row_values (%(newCols)s) AS (
                 _DICT_SET(self.modelXbrl.arcroleTypes.keys()) |
                 _DICT_SET(XbrlConst.standardArcroleCyclesAllowed.keys()) |
                 _DICT_SET(self.modelXbrl.roleTypes.keys()) |
-                XbrlConst.standardRoles)
+                XbrlConst.standardRoles) - _DICT_SET(self.uriId.keys())
         self.showStatus("insert uris")
         table = self.getTable('uri', 'uri_id', 
                               ('uri',), 
                               ('uri',), 
                               tuple((uri,) 
                                     for uri in uris))
-        self.uriId = dict((uri, id)
+        self.uriId.update((uri, id)
                           for id, uri in table)
                      
     def insertQnames(self):
@@ -486,14 +650,14 @@ WITH row_values (%(newCols)s) AS (
                   set(measure
                       for unit in self.modelXbrl.units.values()
                       for measures in unit.measures
-                      for measure in measures))
+                      for measure in measures)) - _DICT_SET(self.qnameId.keys())
         self.showStatus("insert qnames")
         table = self.getTable('qname', 'qname_id', 
                               ('namespace', 'local_name'), 
                               ('namespace', 'local_name'), 
                               tuple((qn.namespaceURI, qn.localName) 
                                     for qn in qnames))
-        self.qnameId = dict((qname(ns, ln), id)
+        self.qnameId.update((qname(ns, ln), id)
                             for id, ns, ln in table)
                      
     def insertNamespaces(self):
@@ -512,14 +676,15 @@ WITH row_values (%(newCols)s) AS (
                               ('document_uri',), 
                               ('document_uri',), 
                               tuple((docUri,) 
-                                    for docUri in self.modelXbrl.urlDocs.keys()))
-        self.documentIds = dict((uri, id)
+                                    for docUri in self.modelXbrl.urlDocs.keys()
+                                    if docUri not in self.documentIds))
+        self.documentIds.update((uri, id)
                                 for id, uri in table)
         table = self.getTable('accession_document_association', 'accession_document_association_id', 
                               ('accession_id','document_id'), 
                               ('document_id',), 
-                              tuple((self.accessionId, docId) 
-                                    for docId in self.documentIds.values()))
+                              tuple((self.accessionId, self.documentIds[docUri]) 
+                                    for docUri in self.modelXbrl.urlDocs.keys()))
         
     def insertCustomArcroles(self):
         self.showStatus("insert arcrole types")
@@ -585,42 +750,41 @@ WITH row_values (%(newCols)s) AS (
                                      self.documentIds[concept.modelDocument.uri],
                                      concept.isNumeric,
                                      concept.isMonetary)
-                                    for concept in self.modelXbrl.qnameConcepts.values()))
-        self.elementId = dict((qnameId, id)  # indexed by qnameId, not by qname value
+                                    for concept in self.modelXbrl.qnameConcepts.values()
+                                    if self.qnameId[concept.qname] not in self.elementId))
+        self.elementId.update((qnameId, id)  # indexed by qnameId, not by qname value
                               for id, qnameId in table)
         
     def insertResources(self):
         self.showStatus("insert resources")
+        # resources not stored by prior filings on this connection, by resource key
+        newResources = dict(((self.uriId[resource.role],
+                              self.qnameId[resource.qname],
+                              self.documentIds[resource.modelDocument.uri],
+                              resource.sourceline,
+                              0), resource)
+                            for arcrole in (XbrlConst.conceptLabel, XbrlConst.conceptReference)
+                            for rel in self.modelXbrl.relationshipSet(arcrole).modelRelationships
+                            for resource in (rel.fromModelObject, rel.toModelObject)
+                            if isinstance(resource, ModelResource))
+        for resourceKey in _DICT_SET(self.resourceId.keys()) & _DICT_SET(newResources.keys()):
+            del newResources[resourceKey]
         table = self.getTable('resource', 'resource_id', 
                               ('role_uri_id', 'qname_id', 'document_id', 'document_line_number', 'document_column_number'), 
                               ('role_uri_id', 'qname_id', 'document_id', 'document_line_number', 'document_column_number'), 
-                              tuple((self.uriId[resource.role],
-                                     self.qnameId[resource.qname],
-                                     self.documentIds[resource.modelDocument.uri],
-                                     resource.sourceline,
-                                     0)
-                                    for arcrole in (XbrlConst.conceptLabel, XbrlConst.conceptReference)
-                                    for rel in self.modelXbrl.relationshipSet(arcrole).modelRelationships
-                                    for resource in (rel.fromModelObject, rel.toModelObject)
-                                    if isinstance(resource, ModelResource)))
-        self.resourceId = dict(((roleId, qnId, docId, line, offset), id)
+                              tuple(newResources.keys()))
+        self.resourceId.update(((roleId, qnId, docId, line, offset), id)
                                for id, roleId, qnId, docId, line, offset in table)
         
         self.showStatus("insert labels")
         table = self.getTable('label_resource', 'resource_id', 
                               ('resource_id', 'label', 'xml_lang'), 
                               ('resource_id',), 
-                              tuple((self.resourceId[self.uriId[resource.role],
-                                                     self.qnameId[resource.qname],
-                                                     self.documentIds[resource.modelDocument.uri],
-                                                     resource.sourceline,
-                                                     0],
+                              tuple((self.resourceId[resourceKey],
                                      resource.elementText,
                                      resource.xmlLang)
-                                    for arcrole in (XbrlConst.conceptLabel, XbrlConst.conceptReference)
-                                    for rel in self.modelXbrl.relationshipSet(arcrole).modelRelationships
-                                    for resource in (rel.fromModelObject, rel.toModelObject)
-                                    if isinstance(resource, ModelResource) and XbrlConst.isLabelRole(resource.role)))
+                                    for resourceKey, resource in newResources.items()
+                                    if XbrlConst.isLabelRole(resource.role)))
     
     def insertNetworks(self):
         self.showStatus("insert networks")
@@ -737,37 +901,37 @@ WITH row_values (%(newCols)s) AS (
                                     for cntx in self.modelXbrl.contexts.values()))
         self.cntxId = dict(((_accsId, xmlId), id)
                            for id, _accsId, xmlId in table)
-        # context_dimension
-        values = []
-        for cntx in self.modelXbrl.contexts.values():
-            for dim in cntx.qnameDims.values():
-                values.append((self.cntxId[(accsId,cntx.id)],
-                               self.qnameId[dim.dimensionQname],
-                               self.qnameId.get(dim.memberQname), # may be None
-                               self.qnameId.get(dim.typedMember.qname) if dim.isTyped else None,
-                               False, # not default
-                               dim.contextElement == "segment",
-                               dim.typedMember.innerText if dim.isTyped else None))
-            for dimQname, memQname in self.modelXbrl.qnameDimensionDefaults.items():
-                if dimQname not in cntx.qnameDims:
-                    values.append((self.cntxId[(accsId,cntx.id)],
-                                   self.qnameId[dimQname],
-                                   self.qnameId[memQname],
-                                   None,
-                                   True, # is default
-                                   True, # ambiguous and irrelevant for the XDT model
-                                   None))
+        # context_dimension (rows are generated as they are copied to the database)
+        def contextDimensionRows():
+            for cntx in self.modelXbrl.contexts.values():
+                for dim in cntx.qnameDims.values():
+                    yield (self.cntxId[(accsId,cntx.id)],
+                           self.qnameId[dim.dimensionQname],
+                           self.qnameId.get(dim.memberQname), # may be None
+                           self.qnameId.get(dim.typedMember.qname) if dim.isTyped else None,
+                           False, # not default
+                           dim.contextElement == "segment",
+                           dim.typedMember.innerText if dim.isTyped else None)
+                for dimQname, memQname in self.modelXbrl.qnameDimensionDefaults.items():
+                    if dimQname not in cntx.qnameDims:
+                        yield (self.cntxId[(accsId,cntx.id)],
+                               self.qnameId[dimQname],
+                               self.qnameId[memQname],
+                               None,
+                               True, # is default
+                               True, # ambiguous and irrelevant for the XDT model
+                               None)
         table = self.getTable('context_dimension', 'context_dimension_id', 
                               ('context_id', 'dimension_qname_id', 'member_qname_id', 'typed_qname_id', 'is_default', 'is_segment', 'typed_text_content'), 
                               ('dimension_qname_id',), 
-                              values)
-        # facts
+                              contextDimensionRows())
+        # facts (rows are generated as they are copied to the database)
         table = self.getTable('fact', 'fact_id', 
                               ('accession_id', 'context_id', 'unit_id', 'element_id', 'effective_value', 'fact_value', 
                                'xml_id', 'precision_value', 'decimals_value', 
                                'is_precision_infinity', 'is_decimals_infinity', ), 
                               ('accession_id', 'context_id', 'unit_id', 'element_id', 'fact_value'), 
-                              tuple((accsId,
+                              ((accsId,
                                      self.cntxId.get((accsId,fact.contextID)),
                                      self.unitId.get((accsId,fact.unitID)),
                                      self.elementId.get(self.qnameId.get(fact.qname)),
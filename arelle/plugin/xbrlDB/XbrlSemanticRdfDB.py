@@ -18,6 +18,10 @@ Example dialog or command line parameters for operation:
     database:  the top level path segment for the NanoSparqlServer or disk file path if rdfTurtleFile
     timeout: 
     
+Turtle of each activity is written as it is generated, in batches of about RDF_BATCH_SIZE characters,
+appended to the file or sent as chunks of one chunked HTTP request (so the server may parse it as it 
+arrives).  An activity of only one batch is sent as a single request.
+
 
 (c) Copyright 2013 Mark V Systems Limited, California US, All rights reserved.  
 Mark V copyright applies to this software, which is licensed according to the terms of Arelle(r).
@@ -40,13 +44,13 @@ rdflib pass
 
 '''
 
-import os, io, time, json, socket, logging, zlib, datetime
+import os, io, time, json, socket, logging, zlib, datetime, base64
 from math import isnan, isinf
 from arelle.ModelDtsObject import ModelConcept, ModelResource, ModelRelationship
 from arelle.ModelInstanceObject import ModelFact
 from arelle.ModelDocument import Type
 from arelle import XbrlConst, XmlUtil
-import urllib.request
+import urllib.request, http.client
 from urllib.error import HTTPError, URLError
 
 TRACERDFFILE = None
@@ -54,6 +58,8 @@ TRACERDFFILE = None
 
 RDFTURTLEFILE_HOSTNAME = "rdfTurtleFile"
 
+RDF_BATCH_SIZE = 1048576 # characters of turtle written or sent at a time
+
 def insertIntoDB(modelXbrl, 
                  user=None, password=None, host=None, port=None, database=None, timeout=None,
                  rssItem=None):
@@ -122,6 +128,110 @@ def rdfString(s): # compress long strings
 def rdfUrlSuffix(s):
     return s.replace("\\","/").replace("://", "/").replace(":/", "/").replace(" ","%20")
 
+class RdfTurtleStream():
+    # turtle of an activity (prefixed by XRDFDB_PREFIXES, and with extra indentation stripped), 
+    # written in batches of about RDF_BATCH_SIZE characters to the connection's turtle file or 
+    # as chunks of one chunked HTTP request, as it is generated
+    def __init__(self, rdfdb, activity):
+        self.rdfdb = rdfdb
+        self.activity = activity
+        self.indentation = None # spaces of extra indentation, from first indented line
+        self.batch = [XRDFDB_PREFIXES]
+        self.batchSize = len(XRDFDB_PREFIXES)
+        self.isStarted = False
+        self.file = self.httpConn = None
+        
+    def write(self, turtle):
+        # turtle may be mixture of line strings and strings with \n-separated lines
+        if isinstance(turtle, (list,tuple)):
+            for t in turtle:
+                self.write(t)
+            return
+        lines = turtle.split('\n')
+        if self.indentation is None:
+            # find first indented string and use as template to strip extra indentation
+            for line1 in lines:
+                spaces = line1.index(line1.strip())
+                if spaces:
+                    self.indentation = spaces
+                    break
+        spaces = self.indentation
+        if spaces:
+            lines = [l[spaces:] if l[0:spaces].isspace() else l.strip()
+                     for l in lines]
+        else:
+            lines = [l.strip() for l in lines]
+        turtle = '\n' + '\n'.join(lines)
+        self.batch.append(turtle)
+        self.batchSize += len(turtle)
+        if self.batchSize >= RDF_BATCH_SIZE:
+            self.flush()
+        
+    def flush(self):
+        turtle = ''.join(self.batch)
+        del self.batch[:]
+        self.batchSize = 0
+        if not turtle:
+            return
+        rdfdb = self.rdfdb
+        if TRACERDFFILE:
+            with io.open(TRACERDFFILE, "a", encoding='utf-8') as fh:
+                fh.write("{0}{1}".format("" if self.isStarted else "\n\n>>> sent: \n", turtle))
+        if rdfdb.isRdfTurtleFile:
+            if self.file is None:
+                self.file = io.open(rdfdb.turtleFile, "a", encoding='utf-8')
+            self.file.write(turtle)
+        else:
+            if self.httpConn is None:
+                self.httpConn = http.client.HTTPConnection(rdfdb.host, rdfdb.port, timeout=rdfdb.timeout)
+                self.httpConn.putrequest("POST", rdfdb.path)
+                for header, value in HTTPHEADERS.items():
+                    self.httpConn.putheader(header, value)
+                self.httpConn.putheader("Transfer-Encoding", "chunked")
+                if rdfdb.user:
+                    self.httpConn.putheader("Authorization", "Basic " + base64.b64encode(
+                        "{0}:{1}".format(rdfdb.user, rdfdb.password or "").encode('utf-8')).decode('ascii'))
+                self.httpConn.endheaders()
+            data = turtle.encode('utf-8')
+            self.httpConn.send(("%x\r\n" % len(data)).encode('ascii') + data + b"\r\n")
+        self.isStarted = True
+        
+    def close(self):
+        # completes the activity, returns results if sent to a server
+        try:
+            if self.rdfdb.isRdfTurtleFile:
+                self.flush()
+                return None
+            if not self.isStarted:  # one batch, send as a single request
+                return self.rdfdb.post(self.activity, ''.join(self.batch))
+            self.flush()
+            self.httpConn.send(b"0\r\n\r\n")
+            response = self.httpConn.getresponse()
+            results = response.read().decode('utf-8')
+            if response.status not in (200, 500): # 500: results are not successful but returned nontheless
+                raise XRDBException("xrdfDB:DatabaseError",
+                                    _("%(activity)s not successful: %(error)s"),
+                                    activity=self.activity, error="HTTP {0} {1}".format(response.status, response.reason)) 
+            return self.rdfdb.checkResults(self.activity, results)
+        finally:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+            if self.httpConn is not None:
+                self.httpConn.close()
+                self.httpConn = None
+                
+    def abort(self):
+        # abandons an incomplete activity, a chunked request is closed without its last chunk so it is not completed
+        del self.batch[:]
+        self.batchSize = 0
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        if self.httpConn is not None:
+            self.httpConn.close()
+            self.httpConn = None
+        
 class XRDBException(Exception):
     def __init__(self, code, message, **kwargs ):
         self.code = code
@@ -145,6 +255,11 @@ class XbrlSemanticRdfDatabaseConnection():
         else:
             connectionUrl = "http://{0}:{1}".format(host, port or '80')
             self.url = connectionUrl + '/' + database + "/sparql"
+            self.host = host
+            self.port = int(port or '80')
+            self.path = '/' + database + "/sparql"
+            self.user = user
+            self.password = password
             # Create an OpenerDirector with support for Basic HTTP Authentication...
             auth_handler = urllib.request.HTTPBasicAuthHandler()
             if user:
@@ -176,31 +291,25 @@ class XbrlSemanticRdfDatabaseConnection():
         # if no tables, initialize database
         pass # not sure what to do here
             
+    def turtleStream(self, activity):
+        # returns stream to write the turtle of activity to, which must be closed to complete the activity
+        return RdfTurtleStream(self, activity)
+            
     def execute(self, activity, turtle, commit=False, close=True, fetch=True):
         # turtle may be mixture of line strings and strings with \n-separated lines
-        if isinstance(turtle, (list,tuple)):
-            lines = '\n'.join(turtle)
-        else:
-            lines = turtle
-        # strip extra indentation
-        lines = lines.split('\n')
-        if lines:
-            # find first indented string and use as template to strip extra indentation
-            for line1 in lines:
-                spaces = line1.index(line1.strip())
-                if spaces:
-                    lines = [l[spaces:] if l[0:spaces].isspace() else l.strip()
-                             for l in lines]
-                    break
-        turtle = XRDFDB_PREFIXES + '\n' + '\n'.join(lines)
-
+        stream = self.turtleStream(activity)
+        try:
+            stream.write(turtle)
+        except BaseException: # don't leave the activity's file or request open
+            stream.abort()
+            raise
+        return stream.close()
+    
+    def post(self, activity, turtle):
+        # single request of (prefixed) turtle
         if TRACERDFFILE:
             with io.open(TRACERDFFILE, "a", encoding='utf-8') as fh:
                 fh.write("\n\n>>> sent: \n{0}".format(turtle))
-        if self.isRdfTurtleFile:
-            with io.open(self.turtleFile, "a", encoding='utf-8') as fh:
-                fh.write(turtle)
-            return None
         request = urllib.request.Request(self.url,
                                          data=turtle.encode('utf-8'),
                                          headers=HTTPHEADERS)
@@ -212,6 +321,9 @@ class XbrlSemanticRdfDatabaseConnection():
                 results = err.fp.read().decode('utf-8')
             else:
                 raise  # reraise any other errors
+        return self.checkResults(activity, results)
+    
+    def checkResults(self, activity, results):
         if TRACERDFFILE:
             with io.open(TRACERDFFILE, "a", encoding='utf-8') as fh:
                 fh.write("\n\n>>> received: \n{0}".format(str(results)))
@@ -614,83 +726,89 @@ class XbrlSemanticRdfDatabaseConnection():
         dimensions = [] # index by hash of dimension
         dimensionIds = {}  # index for dimension
         if self.modelXbrl.modelDocument.type in (Type.INSTANCE, Type.INLINEXBRL):
-            dataPoints = ["@prefix thisAccession: <{accessionPrefix}>."
-                          .format(accessionPrefix=self.thisAccessionPrefix)]
+            # data points are written (or sent) as they are generated
+            dataPoints = self.turtleStream("Insert data points")
+            dataPoints.write("@prefix thisAccession: <{accessionPrefix}>."
+                             .format(accessionPrefix=self.thisAccessionPrefix))
             entityIdentifiers = [] # index by (scheme, identifier)
             periods = []  # index by (instant,) or (start,end) dates
             units = []  # index by measures (qnames set) 
-            for i, fact in enumerate(self.modelXbrl.factsInInstance):
-                aspectQnamesUsed.add(fact.concept.qname)
-                dataPointObjectIndices.append(fact.objectIndex)
-                dataPoints.append("""
-                @prefix thisDataPoint: <{accessionPrefix}data_point/{i}/>.
-                thisDataPoint:
-                    :source_line {sourceLine}.
-                """.format(accessionPrefix=self.thisAccessionPrefix,
-                           i=i,
-                           sourceLine=rdfNum(fact.sourceline)))
-                if fact.id is not None:
-                    dataPoints.append("""
-                    thisDataPoint:
-                        :xml_id {xmlId}.
-                    """.format(
-                         xmlId=rdfString(fact.id)))
-                if fact.context is not None:
-                    dataPoints.append("""
+            try:
+                for i, fact in enumerate(self.modelXbrl.factsInInstance):
+                    aspectQnamesUsed.add(fact.concept.qname)
+                    dataPointObjectIndices.append(fact.objectIndex)
+                    dataPoints.write("""
+                    @prefix thisDataPoint: <{accessionPrefix}data_point/{i}/>.
                     thisDataPoint:
-                        :contextId {contextId}.
-                    """.format(
-                         contextId=rdfString(fact.contextID)))
-                    context = fact.context
-                    p = self.periodAspectValue(context)
-                    if p not in periods:
-                        periods.append(p)
-                    e = fact.context.entityIdentifier
-                    if e not in entityIdentifiers:
-                        entityIdentifiers.append(e)
-                    for dimVal in context.qnameDims.values():
-                        aspectQnamesUsed.add(dimVal.dimensionQname)
-                        if dimVal.isExplicit:
-                            aspectQnamesUsed.add(dimVal.memberQname)
-                            key = (dimVal.dimensionQname, True, dimVal.memberQname)
-                        else:
-                            key = (dimVal.dimensionQname, False, dimVal.typedMember.innerText)
-                        if key not in dimensionIds:
-                            dimensionIds[key] = len(dimensions)
-                            dimensions.append(key)
-                    if fact.isNumeric:
-                        dataPoints.append("""
+                        :source_line {sourceLine}.
+                    """.format(accessionPrefix=self.thisAccessionPrefix,
+                               i=i,
+                               sourceLine=rdfNum(fact.sourceline)))
+                    if fact.id is not None:
+                        dataPoints.write("""
                         thisDataPoint:
-                            :effective_value {effectiveValue}.
+                            :xml_id {xmlId}.
                         """.format(
-                             effectiveValue=rdfString(fact.effectiveValue)))
-                        if fact.unit is not None:
-                            u = str(fact.unit.measures)  # string for now
-                            if u not in units:
-                                units.append(u)
-                            dataPoints.append("""
-                            thisDataPoint:
-                                :unitId {unit}.
-                            """.format(
-                                 unit=rdfString(fact.unitID)))
-                        if fact.precision:
-                            dataPoints.append("""
-                            thisDataPoint:
-                                :precision {precision}.
-                            """.format(
-                                 precision=rdfString(fact.precision)))
-                        if fact.decimals:
-                            dataPoints.append("""
+                             xmlId=rdfString(fact.id)))
+                    if fact.context is not None:
+                        dataPoints.write("""
+                        thisDataPoint:
+                            :contextId {contextId}.
+                        """.format(
+                             contextId=rdfString(fact.contextID)))
+                        context = fact.context
+                        p = self.periodAspectValue(context)
+                        if p not in periods:
+                            periods.append(p)
+                        e = fact.context.entityIdentifier
+                        if e not in entityIdentifiers:
+                            entityIdentifiers.append(e)
+                        for dimVal in context.qnameDims.values():
+                            aspectQnamesUsed.add(dimVal.dimensionQname)
+                            if dimVal.isExplicit:
+                                aspectQnamesUsed.add(dimVal.memberQname)
+                                key = (dimVal.dimensionQname, True, dimVal.memberQname)
+                            else:
+                                key = (dimVal.dimensionQname, False, dimVal.typedMember.innerText)
+                            if key not in dimensionIds:
+                                dimensionIds[key] = len(dimensions)
+                                dimensions.append(key)
+                        if fact.isNumeric:
+                            dataPoints.write("""
                             thisDataPoint:
-                                :decimals {decimals}.
+                                :effective_value {effectiveValue}.
                             """.format(
-                                 decimals=rdfString(fact.decimals)))
-                    dataPoints.append("""
-                    thisDataPoint:
-                        :value {value}.
-                    """.format(
-                         value=rdfString(fact.value))) # compress if very long
-            self.execute("Insert data points", dataPoints)
+                                 effectiveValue=rdfString(fact.effectiveValue)))
+                            if fact.unit is not None:
+                                u = str(fact.unit.measures)  # string for now
+                                if u not in units:
+                                    units.append(u)
+                                dataPoints.write("""
+                                thisDataPoint:
+                                    :unitId {unit}.
+                                """.format(
+                                     unit=rdfString(fact.unitID)))
+                            if fact.precision:
+                                dataPoints.write("""
+                                thisDataPoint:
+                                    :precision {precision}.
+                                """.format(
+                                     precision=rdfString(fact.precision)))
+                            if fact.decimals:
+                                dataPoints.write("""
+                                thisDataPoint:
+                                    :decimals {decimals}.
+                                """.format(
+                                     decimals=rdfString(fact.decimals)))
+                        dataPoints.write("""
+                        thisDataPoint:
+                            :value {value}.
+                        """.format(
+                             value=rdfString(fact.value))) # compress if very long
+            except BaseException: # don't leave the activity's file or request open
+                dataPoints.abort()
+                raise
+            dataPoints.close()
                     
             self.execute("Insert entity identifiers", 
                        ["""
@@ -769,58 +887,61 @@ class XbrlSemanticRdfDatabaseConnection():
                          aspValSels)
         
         # add aspect proxy relationships
-        edges = []
-        # fact - aspect relationships
-        for i, factObjectIndex in enumerate(dataPointObjectIndices):
-            fact =  self.modelXbrl.modelObjects[factObjectIndex]
-            edges.append("@prefix thisDataPoint: <{accessionPrefix}data_point/{i}/>.".format(accessionPrefix=self.thisAccessionPrefix,
-                                                                                            i=i))
-            edges.append("""
-                thisDataPoint: 
-                    :base_item {aspectProxy}.
-                """.format(aspectProxy=self.aspectId(fact.qname)))
-            context = fact.context
-            if context is not None:
-                # entityIdentifier aspect
-                edges.append("""
-                    thisDataPoint: 
-                        :entity_identifier <{accessionPrefix}entity_identifier/{i}>.
-                    """.format(accessionPrefix=self.thisAccessionPrefix,
-                               i=entityIdentifiers.index(context.entityIdentifier)))
-                # period aspect
-                edges.append("""
+        self.showStatus("insert aspect relationship edges")
+        edges = self.turtleStream("Insert aspect relationship edges")
+        try:
+            # fact - aspect relationships
+            for i, factObjectIndex in enumerate(dataPointObjectIndices):
+                fact =  self.modelXbrl.modelObjects[factObjectIndex]
+                edges.write("@prefix thisDataPoint: <{accessionPrefix}data_point/{i}/>.".format(accessionPrefix=self.thisAccessionPrefix,
+                                                                                               i=i))
+                edges.write("""
                     thisDataPoint: 
-                        :period <{accessionPrefix}period/{i}>.
-                    """.format(accessionPrefix=self.thisAccessionPrefix,
-                               i=periods.index(self.periodAspectValue(context))))
-                # dimension aspectValueSelections
-                for dimVal in context.qnameDims.values():
-                    key = (dimVal.dimensionQname, dimVal.isExplicit,
-                           dimVal.memberQname if dimVal.isExplicit else dimVal.typedMember.innerText)
-                    edges.append("""
+                        :base_item {aspectProxy}.
+                    """.format(aspectProxy=self.aspectId(fact.qname)))
+                context = fact.context
+                if context is not None:
+                    # entityIdentifier aspect
+                    edges.write("""
                         thisDataPoint: 
-                            :aspect_value_selection <{accessionPrefix}aspect_value_selection/{i}>.
+                            :entity_identifier <{accessionPrefix}entity_identifier/{i}>.
                         """.format(accessionPrefix=self.thisAccessionPrefix,
-                                   i=dimensionIds[key]))
-            if fact.isNumeric and fact.unit is not None:
-                # unit aspect
-                u = str(fact.unit.measures)  # string for now
-                edges.append("""
-                    thisDataPoint: 
-                        :unit <{accessionPrefix}unit/{i}>.
-                    """.format(accessionPrefix=self.thisAccessionPrefix,
-                               i=units.index(u)))
-            for tupleFact in fact.modelTupleFacts:
-                # edge to tuple from item
-                edges.append("""
-                    thisDataPoint: 
-                        :tuple <{accessionPrefix}data_point/{i}>.
-                    """.format(accessionPrefix=self.thisAccessionPrefix,
-                               i=dataPointObjectIndices.index(tupleFact.objectIndex)))
+                                   i=entityIdentifiers.index(context.entityIdentifier)))
+                    # period aspect
+                    edges.write("""
+                        thisDataPoint: 
+                            :period <{accessionPrefix}period/{i}>.
+                        """.format(accessionPrefix=self.thisAccessionPrefix,
+                                   i=periods.index(self.periodAspectValue(context))))
+                    # dimension aspectValueSelections
+                    for dimVal in context.qnameDims.values():
+                        key = (dimVal.dimensionQname, dimVal.isExplicit,
+                               dimVal.memberQname if dimVal.isExplicit else dimVal.typedMember.innerText)
+                        edges.write("""
+                            thisDataPoint: 
+                                :aspect_value_selection <{accessionPrefix}aspect_value_selection/{i}>.
+                            """.format(accessionPrefix=self.thisAccessionPrefix,
+                                       i=dimensionIds[key]))
+                if fact.isNumeric and fact.unit is not None:
+                    # unit aspect
+                    u = str(fact.unit.measures)  # string for now
+                    edges.write("""
+                        thisDataPoint: 
+                            :unit <{accessionPrefix}unit/{i}>.
+                        """.format(accessionPrefix=self.thisAccessionPrefix,
+                                   i=units.index(u)))
+                for tupleFact in fact.modelTupleFacts:
+                    # edge to tuple from item
+                    edges.write("""
+                        thisDataPoint: 
+                            :tuple <{accessionPrefix}data_point/{i}>.
+                        """.format(accessionPrefix=self.thisAccessionPrefix,
+                                   i=dataPointObjectIndices.index(tupleFact.objectIndex)))
+        except BaseException: # don't leave the activity's file or request open
+            edges.abort()
+            raise
 
-        self.showStatus("insert aspect relationship edges")
-        self.execute("Insert aspect relationship edges", 
-                     edges)
+        edges.close()
         
     def relationshipSetId(self,i):
         return "<{accessionPrefix}rel_set/{i}>".format(accessionPrefix=self.thisAccessionPrefix,
@@ -14,6 +14,7 @@ and does not apply to the XBRL US Database schema and description.
 '''
 
 import time, os, io, sys, logging
+from arelle import Validate
 from arelle.Locale import format_string
 from .XbrlPublicPostgresDB import insertIntoDB as insertIntoPostgresDB, isDBPort as isPostgresPort
 from .XbrlSemanticGraphDB import insertIntoDB as insertIntoRexsterDB, isDBPort as isRexsterPort
@@ -83,7 +84,7 @@ def xbrlDBmenuEntender(cntlr, menu):
     logging.getLogger("arelle").addHandler(LogToDbHandler())    
     
 def storeIntoDB(dbConnection, modelXbrl, rssItem=None):
-    host = port = user = password = db = timeout = None
+    host = port = user = password = db = timeout = chunkSize = None
     if isinstance(dbConnection, (list, tuple)): # variable length list
         if len(dbConnection) > 0: host = dbConnection[0]
         if len(dbConnection) > 1: port = dbConnection[1]
@@ -92,10 +93,14 @@ def storeIntoDB(dbConnection, modelXbrl, rssItem=None):
         if len(dbConnection) > 4: db = dbConnection[4]
         if len(dbConnection) > 5 and dbConnection[5] and dbConnection[5].isdigit(): 
             timeout = int(dbConnection[5])
+        if len(dbConnection) > 6 and dbConnection[6] and dbConnection[6].isdigit(): 
+            chunkSize = int(dbConnection[6])
 
     startedAt = time.time()
     if isPostgresPort(host, port):
-        insertIntoPostgresDB(modelXbrl, host=host, port=port, user=user, password=password, database=db, timeout=timeout, rssItem=rssItem)
+        # RSS item worker processes keep their connection open for the feed's next items
+        insertIntoPostgresDB(modelXbrl, host=host, port=port, user=user, password=password, database=db, timeout=timeout, rssItem=rssItem, chunkSize=chunkSize,
+                             keepOpen=rssItem is not None and Validate.workerRssFeed is not None)
     elif isRexsterPort(host, port):
         insertIntoRexsterDB(modelXbrl, host=host, port=port, user=user, password=password, database=db, timeout=timeout, rssItem=rssItem)
     elif isRdfPort(host, port, db):
@@ -113,7 +118,8 @@ def xbrlDBcommandLineOptionExtender(parser):
                       action="store", 
                       dest="storeToXbrlDb", 
                       help=_("Store into XBRL DB.  "
-                             "Provides connection string: host,port,user,password,database[,timeout]. "))
+                             "Provides connection string: host,port,user,password,database[,timeout[,chunkSize]]. "
+                             "For Postgres, chunkSize commits bulk loaded tables in chunks of that many rows. "))
     logging.getLogger("arelle").addHandler(LogToDbHandler())    
 
 def xbrlDBCommandLineXbrlLoaded(cntlr, options, modelXbrl):
@@ -131,6 +137,12 @@ def xbrlDBvalidateRssItem(val, modelXbrl, rssItem):
     if hasattr(val.modelXbrl, 'xbrlDBconnection'):
         storeIntoDB(val.modelXbrl.xbrlDBconnection, modelXbrl, rssItem)
     
+def xbrlDBrssItemWorkerAttributes(val, rssFeedXbrl):
+    # RSS item worker processes store their items on their own connections
+    if hasattr(rssFeedXbrl, 'xbrlDBconnection'):
+        return {'xbrlDBconnection': rssFeedXbrl.xbrlDBconnection}
+    return None
+    
 def xbrlDBdialogRssWatchDBconnection(*args, **kwargs):
     try:
         from .DialogRssWatchExtender import dialogRssWatchDBextender
@@ -200,5 +212,6 @@ __pluginInfo__ = {
     'DialogRssWatch.ValidateChoices': xbrlDBdialogRssWatchValidateChoices,
     'RssWatch.HasWatchAction': xbrlDBrssWatchHasWatchAction,
     'RssWatch.DoWatchAction': xbrlDBrssDoWatchAction,
-    'Validate.RssItem': xbrlDBvalidateRssItem
+    'Validate.RssItem': xbrlDBvalidateRssItem,
+    'Validate.RssItem.WorkerAttributes': xbrlDBrssItemWorkerAttributes
 }
\ No newline at end of file
@@ -6,10 +6,12 @@ Use this module to start Arelle in command line modes
 @author: Mark V Systems Limited
 (c) Copyright 2011 Mark V Systems Limited, All rights reserved.
 '''
-import sys
+import sys, multiprocessing
 from arelle import CntlrCmdLine, CntlrComServer
 
-if '--COMserver' in sys.argv:
-    CntlrComServer.main()
-else:
-    CntlrCmdLine.main()
\ No newline at end of file
+if __name__ == "__main__": # guard for batch worker processes, which import this module when spawned
+    multiprocessing.freeze_support()
+    if '--COMserver' in sys.argv:
+        CntlrComServer.main()
+    else:
+        CntlrCmdLine.main()